@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- Cevap Kaydı Ayarları ---
+ANSWER_LOG_BATCH_SIZE = 50 # Bu kadar cevap biriktiğinde hemen diske yazılır
+ANSWER_LOG_FLUSH_INTERVAL = 1.0 # İlk bekleyen cevaptan en geç bu kadar saniye sonra diske yazılır
+
+INSERT_ANSWER_SQL = (
+    "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, timestamp, answer_time_seconds, session_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Kullanıcı başına toplu istatistikler cevaplarla aynı işlemde artırılır
+UPSERT_USER_STATS_SQL = """
+    INSERT INTO user_stats (user_id, answered, correct, total_time, timed_count) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        answered = answered + excluded.answered,
+        correct = correct + excluded.correct,
+        total_time = total_time + excluded.total_time,
+        timed_count = timed_count + excluded.timed_count
+"""
+UPSERT_USER_EXAM_STATS_SQL = """
+    INSERT INTO user_exam_stats (user_id, sinav_turu, answered, correct, total_time, timed_count) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, sinav_turu) DO UPDATE SET
+        answered = answered + excluded.answered,
+        correct = correct + excluded.correct,
+        total_time = total_time + excluded.total_time,
+        timed_count = timed_count + excluded.timed_count
+"""
+
+class AnswerRow(NamedTuple):
+    """Henüz veya yeni yazılmış bir 'user_answers' satırı."""
+    user_id: int
+    question_id: int
+    user_answer: str
+    is_correct: bool
+    timestamp: str # SQLite CURRENT_TIMESTAMP biçiminde (UTC)
+    answer_time_seconds: Optional[int]
+    session_id: Optional[int] = None # Cevabın ait olduğu 'quiz_sessions' satırı
+    sinav_turu: Optional[str] = None # Yalnızca istatistikler için; user_answers tablosuna yazılmaz
+
+    @property
+    def params(self) -> tuple:
+        """INSERT_ANSWER_SQL için parametreler."""
+        return self[:7]
+
+def aggregate_stats(rows) -> tuple:
+    """
+    Cevap satırlarını kullanıcı ve kullanıcı+sınav türü bazında toplar.
+    UPSERT_USER_STATS_SQL ve UPSERT_USER_EXAM_STATS_SQL için parametre listeleri döndürür.
+    """
+    per_user = {}
+    per_exam = {}
+    for row in rows:
+        timed = row.answer_time_seconds is not None
+        delta = (1, 1 if row.is_correct else 0, row.answer_time_seconds or 0, 1 if timed else 0)
+        for totals, key in ((per_user, row.user_id), (per_exam, (row.user_id, row.sinav_turu))):
+            current = totals.get(key, (0, 0, 0, 0))
+            totals[key] = tuple(a + b for a, b in zip(current, delta))
+    return (
+        [(user_id, *totals) for user_id, totals in per_user.items()],
+        [(user_id, sinav_turu, *totals) for (user_id, sinav_turu), totals in per_exam.items() if sinav_turu is not None],
+    )
+
+def current_timestamp() -> str:
+    """SQLite'ın CURRENT_TIMESTAMP biçiminde şimdiki UTC zamanını döndürür."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+class AnswerLogWriter:
+    """
+    Cevapları bellekte biriktirip toplu olarak yazan (write-behind) kayıtçı.
+    Her cevap için ayrı commit yerine, boyut veya süre eşiği aşıldığında tüm bekleyen satırlar tek
+    bir işlemde executemany ile yazılır; 'user_stats' ve 'user_exam_stats' toplamları da aynı
+    işlemde güncellenir. Okuma yolları read_for_user() ile kullanıcının henüz
+    yazılmamış cevaplarını da görür.
+
+    Bekleyen satırlar (yazılmakta olanlar, açık tampon) ikilisinde tutulur ve ikili her zaman tek
+    atamayla değiştirilir; yazılan parti commit ile aynı kilit altında listeden düşülür. Böylece
+    bir okuma, bir satırı ne iki kez (hem tabloda hem tamponda) ne de hiç görmez.
+    """
+
+    def __init__(self, db, batch_size: int = ANSWER_LOG_BATCH_SIZE, flush_interval: float = ANSWER_LOG_FLUSH_INTERVAL,
+                 on_stats_changed=None):
+        self._db = db
+        # Commit'ten sonra etkilenen kullanıcıların [(user_id, answered, correct)] toplamlarıyla çağrılır
+        self._on_stats_changed = on_stats_changed
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._state = ((), []) # (yazılmakta olan satırlar, açık tampon)
+        self._commit_lock = threading.Lock()
+        self._flush_lock = None
+        self._timer = None
+
+    @property
+    def pending_count(self) -> int:
+        inflight, open_rows = self._state
+        return len(inflight) + len(open_rows)
+
+    async def record(self, user_id: int, question_id: int, user_answer: str, is_correct: bool, answer_time_seconds: Optional[int],
+                     sinav_turu: Optional[str] = None, session_id: Optional[int] = None) -> None:
+        """Bir cevabı tampona ekler; eşik aşıldıysa tamponu yazar."""
+        self._state[1].append(AnswerRow(
+            user_id, question_id, user_answer, is_correct, current_timestamp(), answer_time_seconds, session_id, sinav_turu
+        ))
+        if len(self._state[1]) >= self._batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Bekleyen cevaplar zamanlanmış yazımda kaydedilemedi: {e}", exc_info=True)
+
+    def _write_batch(self, conn, batch: tuple) -> None:
+        user_stats, user_exam_stats = aggregate_stats(batch)
+        with self._commit_lock:
+            with conn:
+                conn.executemany(INSERT_ANSWER_SQL, [row.params for row in batch])
+                conn.executemany(UPSERT_USER_STATS_SQL, user_stats)
+                conn.executemany(UPSERT_USER_EXAM_STATS_SQL, user_exam_stats)
+                totals = self._read_totals(conn, [row[0] for row in user_stats])
+            # Commit ile aynı kilit altında yazılan partiyi bekleyenlerden düş
+            inflight, open_rows = self._state
+            self._state = (inflight[len(batch):], open_rows)
+        self._notify(totals)
+
+    def _read_totals(self, conn, user_ids: list) -> list:
+        if self._on_stats_changed is None:
+            return []
+        totals = []
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            totals += conn.execute(
+                f"SELECT user_id, answered, correct FROM user_stats WHERE user_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+        return totals
+
+    def _notify(self, totals: list) -> None:
+        if self._on_stats_changed is not None and totals:
+            try:
+                self._on_stats_changed(totals)
+            except Exception as e:
+                logger.error(f"İstatistik değişikliği bildirilemedi: {e}", exc_info=True)
+
+    async def flush(self) -> int:
+        """Bekleyen tüm cevapları tek bir işlemde yazar; yazılan satır sayısını döndürür."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            inflight, open_rows = self._state
+            if not open_rows:
+                return 0
+            batch = tuple(open_rows)
+            self._state = (inflight + batch, [])
+            try:
+                await self._db.run_write(self._write_batch, batch)
+            except Exception:
+                # Yazılamayan satırları kaybetmemek için tamponun başına geri koy
+                inflight, open_rows = self._state
+                self._state = (inflight[len(batch):], list(batch) + open_rows)
+                raise
+            logger.debug(f"{len(batch)} cevap toplu olarak kaydedildi.")
+            return len(batch)
+
+    def _pending_for(self, user_id: int) -> list:
+        inflight, open_rows = self._state
+        return [row for row in (*inflight, *open_rows) if row.user_id == user_id]
+
+    async def read_for_user(self, user_id: int, func, *args):
+        """
+        func(conn, *args) sorgusunu çalıştırır ve sonucu, kullanıcının henüz tabloda olmayan
+        cevaplarıyla (eskiden yeniye) birlikte (sonuç, bekleyen_satırlar) olarak döndürür.
+        """
+        def _read(conn):
+            with self._commit_lock:
+                return func(conn, *args), self._pending_for(user_id)
+        return await self._db.run(_read)
+
+    async def delete_user_answers(self, user_id: int) -> None:
+        """Kullanıcının bekleyen ve kaydedilmiş tüm cevaplarını, quizlerini ve toplu istatistiklerini siler."""
+        open_rows = self._state[1]
+        open_rows[:] = [row for row in open_rows if row.user_id != user_id]
+
+        def _delete(conn):
+            with conn:
+                conn.execute("DELETE FROM user_answers WHERE user_id = ?", (user_id,))
+                conn.execute("DELETE FROM quiz_sessions WHERE user_id = ?", (user_id,))
+                conn.execute("DELETE FROM user_stats WHERE user_id = ?", (user_id,))
+                conn.execute("DELETE FROM user_exam_stats WHERE user_id = ?", (user_id,))
+            self._notify([(user_id, 0, 0)])
+        # Yazılmakta olan partiler yazıcı iş parçacığında bu silmeden önce işlenir
+        await self._db.run_write(_delete)
+
+    async def close(self) -> None:
+        """Zamanlayıcıyı durdurur ve kalan cevapları yazar."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        written = await self.flush()
+        logger.info(f"Cevap kaydı kapatıldı, son {written} cevap yazıldı.")
@@ -0,0 +1,79 @@
+"""
+Sınıf çapında yük altında sürdürülebilir cevap kaydı hızını (cevap/sn) ölçer.
+
+İki mod karşılaştırılır:
+  per-answer : eski davranış; her cevap için ayrı INSERT ve commit (cevap başına bir fsync).
+  batched    : answer_log.AnswerLogWriter; cevaplar biriktirilip tek işlemde executemany ile yazılır.
+
+Her öğrenci süre boyunca art arda cevap gönderir; süre sonunda kaydedilmiş cevap sayısı raporlanır.
+fsync maliyetini gerçekçi ölçmek için veritabanının konacağı klasör --dir ile diskte seçilebilir.
+
+Kullanım: python benchmarks/bench_answer_log.py [--users 100] [--seconds 5] [--dir /var/tmp]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import Database
+from answer_log import AnswerLogWriter
+from db_copy import copy_database
+
+async def student(record, user_id: int, deadline: float, counter: list) -> None:
+    loop = asyncio.get_running_loop()
+    while loop.time() < deadline:
+        await record(user_id, random.randint(1, 65), "Rotunda", random.random() < 0.5, random.randint(2, 30))
+        counter[0] += 1
+
+async def run_mode(mode: str, users: int, seconds: float) -> dict:
+    db = Database()
+    writer = AnswerLogWriter(db)
+
+    async def record_per_answer(user_id, question_id, user_answer, is_correct, answer_time_seconds):
+        await db.execute(
+            "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
+            (user_id, question_id, user_answer, is_correct, answer_time_seconds)
+        )
+
+    record = writer.record if mode == 'batched' else record_per_answer
+    counter = [0]
+    started = time.perf_counter()
+    deadline = asyncio.get_running_loop().time() + seconds
+    await asyncio.gather(*(student(record, 20_000 + u, deadline, counter) for u in range(users)))
+    await writer.close()
+    elapsed = time.perf_counter() - started
+    stored = (await db.fetchone("SELECT COUNT(*) FROM user_answers WHERE user_id BETWEEN 20000 AND ?", (20_000 + users,)))[0]
+    await db.execute("DELETE FROM user_answers WHERE user_id BETWEEN 20000 AND ?", (20_000 + users,))
+    db.close()
+    return {
+        'mode': mode,
+        'answers': counter[0],
+        'stored': stored,
+        'elapsed_s': round(elapsed, 3),
+        'answers_per_s': round(counter[0] / elapsed, 1),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--dir', default=None, help="Geçici veritabanının oluşturulacağı klasör")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        copy_database(path).close()
+        database.DB_PATH = path
+        results = [asyncio.run(run_mode(mode, args.users, args.seconds)) for mode in ('per-answer', 'batched')]
+        for result in results:
+            print(result)
+        print(f"Hızlanma: {results[1]['answers_per_s'] / results[0]['answers_per_s']:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Çok sayıda eşzamanlı öğrencinin buton tıklamalarında yanıt süresini ölçer.
+
+İki mod karşılaştırılır:
+  blocking : eski davranış; her tıklamada yeni bağlantı açılır ve sorgular olay döngüsünde çalışır.
+  pool     : database.Database; sorgular sınırlı bir bağlantı havuzunda, döngüyü bloklamadan çalışır.
+
+Her tıklama, kullanıcı durumunu okur, soruyu çeker, cevabı yazar (commit) ve Bot API çağrısını
+temsil eden kısa bir ağ beklemesi yapar. Gecikme, tıklamanın planlanan anından işlemin bitişine
+kadar ölçülür.
+
+Kullanım: python benchmarks/bench_db_latency.py [--users 200] [--taps 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import Database
+from db_copy import copy_database
+
+NETWORK_DELAY = 0.01 # Bir Bot API çağrısının yaklaşık süresi (saniye)
+
+def tap_sync(user_id: int, question_id: int) -> None:
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute("SELECT current_question_id, state FROM users WHERE id = ?", (user_id,)).fetchone()
+    conn.execute("SELECT correct_answer, explanation FROM questions WHERE id = ?", (question_id,)).fetchone()
+    conn.execute("INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
+                 (user_id, question_id, "x", False, 3))
+    conn.commit()
+    conn.close()
+
+async def tap_blocking(db, user_id: int, question_id: int) -> None:
+    tap_sync(user_id, question_id)
+    await asyncio.sleep(NETWORK_DELAY)
+
+async def tap_pool(db, user_id: int, question_id: int) -> None:
+    await db.fetchone("SELECT current_question_id, state FROM users WHERE id = ?", (user_id,))
+    await db.fetchone("SELECT correct_answer, explanation FROM questions WHERE id = ?", (question_id,))
+    await db.execute("INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
+                     (user_id, question_id, "x", False, 3))
+    await asyncio.sleep(NETWORK_DELAY)
+
+async def student(db, tap, user_id: int, taps: int, question_ids: list, latencies: list) -> None:
+    loop = asyncio.get_running_loop()
+    for _ in range(taps):
+        think = random.uniform(0.0, 0.2)
+        planned = loop.time() + think
+        await asyncio.sleep(think)
+        await tap(db, user_id, random.choice(question_ids))
+        latencies.append(loop.time() - planned)
+
+async def run_mode(mode: str, users: int, taps: int, question_ids: list) -> dict:
+    db = Database() if mode == 'pool' else None
+    tap = tap_pool if mode == 'pool' else tap_blocking
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(student(db, tap, 10_000 + u, taps, question_ids, latencies) for u in range(users)))
+    elapsed = time.perf_counter() - started
+    if db:
+        db.close()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'mode': mode,
+        'taps': len(latencies),
+        'elapsed_s': round(elapsed, 3),
+        'taps_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p95_ms': round(quantiles[94] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--taps', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        copy_database(path).close()
+        database.DB_PATH = path
+        conn = sqlite3.connect(path)
+        question_ids = [row[0] for row in conn.execute("SELECT id FROM questions")]
+        conn.close()
+
+        for mode in ('blocking', 'pool'):
+            result = asyncio.run(run_mode(mode, args.users, args.taps, question_ids))
+            print(result)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Cevap onayında (submit_answer) değerlendirme yolunun CPU süresini karşılaştırır.
+
+  text  : seçili harfler şık metinlerine çevrilir, doğru cevap ve kullanıcı cevabı virgülden
+          bölünüp kümeler olarak karşılaştırılır (önceki check_answer).
+  mask  : oturumdaki seçim maskesi sorunun correct_mask'ı ile tek tamsayı karşılaştırması.
+  +text : mask ve cevap kaydı için answer_text() ile üretilen metin (check_answer'ın yaptığı iş).
+
+Seçimler soru bankasındaki gerçek sorular üzerinde, yarısı doğru cevap olacak şekilde üretilir.
+Cevap kaydı ve Bot API çağrısı ölçüme dahil değildir.
+
+Kullanım: python benchmarks/bench_grading.py [--answers 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_copy import copy_database
+from question_bank import QuestionBank, answer_text
+from quiz_session import QuizSession
+
+def text_grade(question, session) -> bool:
+    """Bit maskesi öncesi submit_answer + check_answer."""
+    user_answer_texts = []
+    for letter in session.selected_letters():
+        for option_full_text in question.options:
+            if option_full_text.startswith(f"{letter})"):
+                user_answer_texts.append(option_full_text[option_full_text.find(')') + 2:].strip())
+                break
+    user_answer = ",".join(user_answer_texts)
+    return set(user_answer.split(',')) == set(question.correct_answer.split(','))
+
+def mask_grade(question, session) -> bool:
+    return session.selected == question.correct_mask
+
+def mask_grade_with_text(question, session) -> bool:
+    answer_text(question.options, session.selected)
+    return session.selected == question.correct_mask
+
+def make_answers(bank: QuestionBank, count: int) -> list:
+    questions = [bank.get(question_id) for question_id in bank.ids_for_exam('Vize') + bank.ids_for_exam('Final')]
+    questions = [question for question in questions if question.correct_mask]
+    answers = []
+    for _ in range(count):
+        question = random.choice(questions)
+        session = QuizSession(question.sinav_turu, ())
+        if random.random() < 0.5:
+            session.selected = question.correct_mask
+        else:
+            session.selected = random.randint(1, (1 << len(question.options)) - 1)
+        answers.append((question, session))
+    return answers
+
+def measure(label: str, func, answers: list) -> float:
+    started = time.perf_counter()
+    for question, session in answers:
+        func(question, session)
+    per_answer = (time.perf_counter() - started) / len(answers) * 1e6
+    print(f"{label:6}: {per_answer:6.2f} µs/cevap")
+    return per_answer
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--answers', type=int, default=200000)
+    args = parser.parse_args()
+
+    bank = QuestionBank()
+    conn = copy_database()
+    bank.load(conn)
+    conn.close()
+
+    answers = make_answers(bank, args.answers)
+    mismatches = sum(text_grade(q, s) != mask_grade(q, s) for q, s in answers)
+    before = measure('text', text_grade, answers)
+    after = measure('mask', mask_grade, answers)
+    with_text = measure('+text', mask_grade_with_text, answers)
+    print(f"mask {before / after:.0f}x, metinle birlikte {before / with_text:.1f}x daha hızlı; farklı sonuç: {mismatches}")
+
+if __name__ == '__main__':
+    main()
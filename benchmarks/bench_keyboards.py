@@ -0,0 +1,83 @@
+"""
+Bir şık tıklamasının (select_option_) işleyicide harcadığı CPU süresini karşılaştırır.
+
+  rebuild : her tıklamada tüm InlineKeyboardButton'lar, klavye ve başlık yeniden üretilir.
+  cached  : keyboards.QuestionKeyboards ile klavye (soru, seçim) anahtarıyla LRU'dan, başlık
+            önceden hazırlanmış parçalardan gelir.
+
+Tıklamalar soru bankasındaki gerçek sorular üzerinde, öğrencinin 1-3 şık seçip bıraktığı
+rastgele dizilerle üretilir. Bot API çağrısı ölçüme dahil değildir.
+
+Kullanım: python benchmarks/bench_keyboards.py [--taps 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from db_copy import copy_database
+from keyboards import QuestionKeyboards
+from question_bank import QuestionBank
+from quiz_session import QuizSession
+
+def rebuild_tap(question, session, question_no: int) -> tuple:
+    """Önbellek öncesi işleyicinin şık tıklamasında yaptığı iş."""
+    updated_keyboard = []
+    for opt_text in question.options:
+        opt_letter = opt_text.split(')')[0].strip()
+        btn_text = "✅ " + opt_text if session.is_selected(opt_letter) else opt_text
+        updated_keyboard.append([InlineKeyboardButton(btn_text, callback_data=f"select_option_{opt_letter}")])
+    updated_keyboard.append([InlineKeyboardButton("Cevabı Onayla", callback_data="submit_answer")])
+    q_text_edit = f"**{question.sinav_turu} Sınavı - Soru {question_no}/{session.quiz_length}:**\n{question.text}"
+    selected_str = ", ".join(session.selected_letters()) or "Hiçbiri"
+    return f"{q_text_edit}\n\nSeçilen: *{selected_str}*", InlineKeyboardMarkup(updated_keyboard)
+
+def cached_tap(keyboards, question, session, question_no: int) -> tuple:
+    caption = keyboards.selection_caption(question, question_no, session.quiz_length, session.selected)
+    return caption, keyboards.markup(question, session.selected)
+
+def make_taps(bank: QuestionBank, count: int) -> list:
+    ids = bank.ids_for_exam('Vize') + bank.ids_for_exam('Final')
+    taps = []
+    while len(taps) < count:
+        question = bank.get(random.choice(ids))
+        letters = [option.split(')')[0].strip() for option in question.options]
+        session = QuizSession(question.sinav_turu, ids[:10])
+        for letter in random.sample(letters, random.randint(1, min(3, len(letters)))):
+            session.toggle(letter)
+            snapshot = QuizSession(question.sinav_turu, ids[:10])
+            snapshot.selected = session.selected
+            taps.append((question, snapshot, random.randint(1, 10)))
+    return taps[:count]
+
+def measure(label: str, func, taps: list) -> float:
+    started = time.perf_counter()
+    for question, session, question_no in taps:
+        func(question, session, question_no)
+    per_tap = (time.perf_counter() - started) / len(taps) * 1e6
+    print(f"{label:8}: {per_tap:7.2f} µs/tıklama")
+    return per_tap
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--taps', type=int, default=200000)
+    args = parser.parse_args()
+
+    bank = QuestionBank()
+    conn = copy_database()
+    bank.load(conn)
+    conn.close()
+
+    taps = make_taps(bank, args.taps)
+    keyboards = QuestionKeyboards()
+    before = measure('rebuild', rebuild_tap, taps)
+    after = measure('cached', lambda q, s, n: cached_tap(keyboards, q, s, n), taps)
+    print(f"{before / after:.1f}x daha hızlı; önbellek isabeti {keyboards.hits}/{keyboards.hits + keyboards.misses}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Soru normalizasyon aşamasının (question_importer.normalize_records) işlem hacmini ölçer.
+
+  linear   : önceki process_question_options; ifadeler tek tek 'in' ile, harfler iç içe döngüyle aranır.
+  compiled : önek ağacından derlenmiş tek desen ve bir kez kurulan harf haritası.
+  pool-N   : compiled aşamanın N süreçlik havuza dağıtılmış hali (--workers).
+
+Sorular sentetik üretilir; açıklamaların küçük bir kısmı ifade dosyasındaki bir ifadeyi içerir.
+--extra-phrases ile ifade listesine sentetik ifadeler eklenerek desenin ifade sayısıyla nasıl
+ölçeklendiği görülebilir.
+
+Kullanım: python benchmarks/bench_normalize.py [--questions 50000] [--extra-phrases 0] [--workers 2 4]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import question_importer
+from question_importer import compile_none_answer_matcher, load_none_answer_phrases, normalize_records
+
+def linear_process(question, phrases, rng):
+    """user-020 öncesi process_question_options'ın eşdeğeri."""
+    original_options_list = json.loads(question["options"])
+    cleaned = [opt[opt.find(')') + 2:] if ')' in opt else opt for opt in original_options_list]
+    if "Hiçbiri" not in cleaned:
+        cleaned.append("Hiçbiri")
+    rng.shuffle(cleaned)
+    question["options"] = json.dumps([f"{string.ascii_uppercase[i]}) {text}" for i, text in enumerate(cleaned)])
+    explanation_lower = question["explanation"].lower()
+    if any(phrase in explanation_lower for phrase in phrases):
+        question["correct_answer"] = "Hiçbiri"
+    converted = []
+    for part in question["correct_answer"].split(','):
+        if part == 'F':
+            converted.append("Hiçbiri")
+        elif len(part) == 1 and part in string.ascii_uppercase:
+            found = None
+            for opt in original_options_list:
+                if opt.startswith((part + ')', part.lower() + ')')):
+                    found = opt[opt.find(')') + 2:].strip()
+                    break
+            converted.append(found or part)
+        else:
+            converted.append(part)
+    question["correct_answer"] = ",".join(converted)
+    question["answer_type"] = "double_choice"
+    return question
+
+def make_records(count: int, phrases: tuple) -> list:
+    records = []
+    for i in range(count):
+        explanation = f"Soru {i} için uzun bir açıklama; dönem, sanatçı ve eser bilgileri burada yer alır. " * 3
+        if i % 20 == 0:
+            explanation += random.choice(phrases).capitalize() + "."
+        records.append((f"sentetik:{i}", {
+            "text": f"{i}) Sentetik soru {i}?", "options": [f"{letter}) Şık {letter}{i}" for letter in "ABCDE"],
+            "correct_answer": "B,D" if i % 3 == 0 else "C", "explanation": explanation,
+            "donem": "2. Dönem", "sinav_turu": "Vize",
+        }))
+    return records
+
+def measure(label: str, func, count: int) -> float:
+    started = time.perf_counter()
+    func()
+    rate = count / (time.perf_counter() - started)
+    print(f"{label:9}: {rate:8.0f} soru/sn")
+    return rate
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=50000)
+    parser.add_argument('--extra-phrases', type=int, default=0)
+    parser.add_argument('--workers', type=int, nargs='*', default=[2, 4])
+    args = parser.parse_args()
+
+    phrases = load_none_answer_phrases() + tuple(f"sentetik ifade {i} şıklarda yer almamaktadır" for i in range(args.extra_phrases))
+    matcher = compile_none_answer_matcher(phrases)
+    records = make_records(args.questions, phrases)
+    print(f"{len(phrases)} ifade, {args.questions} soru, {os.cpu_count()} CPU")
+
+    def fresh(raw):
+        return {"options": json.dumps(raw["options"]), "correct_answer": raw["correct_answer"], "explanation": raw["explanation"]}
+
+    rng = random.Random(0)
+    before = measure('linear', lambda: [linear_process(fresh(raw), phrases, rng) for _, raw in records], args.questions)
+    after = measure('compiled', lambda: [question_importer.process_question_options(fresh(raw), rng, matcher) for _, raw in records], args.questions)
+    print(f"process_question_options: {after / before:.2f}x")
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+        f.write("\n".join(phrases))
+    try:
+        for workers in [1] + args.workers:
+            label = 'stage' if workers == 1 else f'pool-{workers}'
+            measure(label, lambda: sum(1 for _ in normalize_records(records, workers, f.name)), args.questions)
+    finally:
+        os.unlink(f.name)
+
+if __name__ == '__main__':
+    main()
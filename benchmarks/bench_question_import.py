@@ -0,0 +1,88 @@
+"""
+question_importer ile büyük soru dosyalarının içe aktarım süresini ölçer.
+
+Geçici bir JSONL dosyasına --questions adet sentetik soru yazılır ve şu sırayla aktarılır:
+
+  old       : eski seed_db.py yolu; tablo boşaltılır, her soru ayrı bir execute ile eklenir.
+  import    : question_importer ile ilk içe aktarım (tüm sorular yeni).
+  reimport  : aynı dosyanın yeniden içe aktarımı (hiçbir satır yazılmamalı).
+  edit      : soruların %10'unun açıklaması değiştirilip yeniden içe aktarılır.
+
+Her adımdan sonra soru ID'lerinin korunduğu doğrulanır.
+
+Kullanım: python benchmarks/bench_question_import.py [--questions 50000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_copy import copy_database
+from question_importer import import_files, process_question_options
+
+def write_questions(path: str, count: int, edited_every: int = 0) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            explanation = f"Açıklama {i}." + (" (düzeltildi)" if edited_every and i % edited_every == 0 else "")
+            f.write(json.dumps({
+                "text": f"{i}) Sentetik soru {i}: aşağıdakilerden hangisi doğrudur?",
+                "options": [f"{letter}) Şık {letter}{i}" for letter in "ABCDE"],
+                "correct_answer": "B,D" if i % 3 == 0 else "C",
+                "explanation": explanation, "donem": "2. Dönem", "sinav_turu": "Vize" if i % 2 else "Final",
+            }, ensure_ascii=False) + "\n")
+
+def old_seed(conn, path: str) -> None:
+    """user-019 öncesi seed_db.py: soruları sil, tek tek ekle."""
+    conn.execute("DELETE FROM questions")
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            q = json.loads(line)
+            q["options"] = json.dumps(q["options"])
+            q = process_question_options(q)
+            conn.execute(
+                "INSERT INTO questions (text, image_path, answer_type, correct_answer, options, explanation, donem, sinav_turu) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (q["text"], None, q["answer_type"], q["correct_answer"], q["options"], q["explanation"], q["donem"], q["sinav_turu"])
+            )
+    conn.commit()
+
+def timed(label: str, func, count: int):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:9}: {elapsed:6.2f} sn ({count / elapsed:8.0f} soru/sn) {dict(result) if result else ''}")
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'sorular.jsonl')
+        write_questions(source, args.questions)
+        for label in ('old', 'new'):
+            db_path = os.path.join(tmp, f'{label}.db')
+            copy_database(db_path).close()
+            database.DB_PATH = db_path
+            conn = database.get_db_connection()
+            if label == 'old':
+                timed('old', lambda: old_seed(conn, source), args.questions)
+                conn.close()
+                continue
+            timed('import', lambda: import_files(conn, [source]), args.questions)
+            ids = dict(conn.execute("SELECT content_hash, id FROM questions"))
+            timed('reimport', lambda: import_files(conn, [source]), args.questions)
+            edited = os.path.join(tmp, 'duzeltilmis.jsonl')
+            write_questions(edited, args.questions, edited_every=10)
+            timed('edit', lambda: import_files(conn, [edited]), args.questions)
+            preserved = ids == dict(conn.execute("SELECT content_hash, id FROM questions"))
+            print(f"ID'ler korundu: {preserved}")
+            conn.close()
+
+if __name__ == '__main__':
+    main()
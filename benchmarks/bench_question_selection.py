@@ -0,0 +1,104 @@
+"""
+Uyarlanabilir soru seçiminin kullanıcı geçmişi büyüdükçe soru başına maliyetini ölçer.
+
+  scan  : her soruda kullanıcının user_answers geçmişi SQL ile soru başına toplanır
+          (GROUP BY question_id) ve en çok yanlış yapılan / hiç görülmemiş soru seçilir.
+  index : question_selector.AdaptiveSelector; seçim yığının tepesinden yapılır, cevap
+          record() ile indekse işlenir. Tablo yalnızca indeks kurulurken bir kez okunur.
+
+Her geçmiş boyutu için bir kullanıcıya o kadar sentetik cevap yazılır; ardından --picks soru
+seçilip cevaplanır; scan modu her seçimde bu büyüyen geçmişi okur, index modu yalnızca kurulumda.
+
+Kullanım: python benchmarks/bench_question_selection.py [--history 100 1000 10000 100000] [--picks 500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_copy import copy_database
+from question_bank import QuestionBank
+from question_selector import AdaptiveSelector, HISTORY_SQL
+
+USER_ID = 1
+EXAM = 'Vize'
+
+SCAN_SQL = (
+    "SELECT question_id, COUNT(*) - SUM(is_correct), MAX(id) FROM user_answers "
+    "WHERE user_id = ? GROUP BY question_id"
+)
+
+def scan_pick(conn, exam_ids: tuple, exclude) -> int:
+    """Geçmişi her seçimde baştan toplayan yaklaşım."""
+    stats = {question_id: (wrong, last) for question_id, wrong, last in conn.execute(SCAN_SQL, (USER_ID,))}
+    unseen = [question_id for question_id in exam_ids if question_id not in stats and question_id not in exclude]
+    if unseen:
+        return random.choice(unseen)
+    candidates = [question_id for question_id in exam_ids if question_id not in exclude]
+    return max(candidates, key=lambda question_id: (stats[question_id][0], -stats[question_id][1]))
+
+def fill_history(conn, size: int, question_ids: list) -> None:
+    conn.execute("DELETE FROM user_answers WHERE user_id = ?", (USER_ID,))
+    conn.executemany(
+        "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
+        ((USER_ID, random.choice(question_ids), "A", random.random() < 0.6, 10) for _ in range(size))
+    )
+    conn.commit()
+
+def answer(conn, question_id: int) -> bool:
+    is_correct = random.random() < 0.6
+    conn.execute(
+        "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
+        (USER_ID, question_id, "A", is_correct, 10)
+    )
+    return is_correct
+
+def measure_scan(conn, exam_ids: tuple, picks: int) -> float:
+    asked = []
+    started = time.perf_counter()
+    for _ in range(picks):
+        question_id = scan_pick(conn, exam_ids, asked[-10:])
+        asked.append(question_id)
+        answer(conn, question_id)
+    return (time.perf_counter() - started) / picks * 1e6
+
+def measure_index(conn, bank: QuestionBank, picks: int):
+    selector = AdaptiveSelector(bank)
+    started = time.perf_counter()
+    selector.load(USER_ID, conn.execute(HISTORY_SQL, (USER_ID,)).fetchall())
+    load_ms = (time.perf_counter() - started) * 1e3
+    asked = []
+    started = time.perf_counter()
+    for _ in range(picks):
+        question_id = selector.next_question(USER_ID, EXAM, asked[-10:])
+        asked.append(question_id)
+        selector.record(USER_ID, question_id, answer(conn, question_id))
+    return (time.perf_counter() - started) / picks * 1e6, load_ms
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', type=int, nargs='*', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--picks', type=int, default=500)
+    args = parser.parse_args()
+
+    bank = QuestionBank()
+    conn = copy_database()
+    bank.load(conn)
+    exam_ids = tuple(bank.ids_for_exam(EXAM))
+    question_ids = list(exam_ids)
+    print(f"'{EXAM}' sınavında {len(exam_ids)} soru, {args.picks} seçim")
+
+    for size in args.history:
+        fill_history(conn, size, question_ids)
+        scan_us = measure_scan(conn, exam_ids, args.picks)
+        fill_history(conn, size, question_ids)
+        index_us, load_ms = measure_index(conn, bank, args.picks)
+        print(f"geçmiş={size:7}: scan {scan_us:9.1f} µs/soru  index {index_us:6.1f} µs/soru "
+              f"(kurulum {load_ms:7.1f} ms)  {scan_us / index_us:6.0f}x")
+    conn.close()
+
+if __name__ == '__main__':
+    main()
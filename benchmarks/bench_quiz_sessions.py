@@ -0,0 +1,119 @@
+"""
+Quiz başlangıcının ve eski quizlerin arşivlenmesinin maliyetini ölçer.
+
+  delete : eski select_quiz_type; kullanıcının tüm cevapları ve toplamları tek işlemde silinir.
+  insert : 'quiz_sessions' tablosuna tek satır eklenir (geçmiş korunur).
+
+Her --history boyutu için kullanıcıya o kadar cevap yazılır ve quiz başlangıcı --repeat kez ölçülür
+(delete modunda her ölçümden önce geçmiş yeniden yazılır, bu süre ölçüme dahil değildir).
+Ardından --sessions adet 10 cevaplı eski quiz ve --legacy adet quize bağlı olmayan eski cevap
+quiz_archive ile arşivlenir; süre, sıcak tablonun boyutu ve arşiv dosyasının boyutu raporlanır.
+
+Kullanım: python benchmarks/bench_quiz_sessions.py [--history 100 1000 10000] [--repeat 20] [--sessions 20000] [--legacy 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_copy import copy_database
+from quiz_archive import archive_sessions, archive_unsessioned_answers
+
+USER_ID = 1
+
+def fill_history(conn, size: int) -> None:
+    with conn:
+        conn.executemany(
+            "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
+            ((USER_ID, random.randint(1, 60), "Rotunda", random.random() < 0.6, 10) for _ in range(size))
+        )
+
+def delete_start(conn) -> None:
+    with conn:
+        conn.execute("DELETE FROM user_answers WHERE user_id = ?", (USER_ID,))
+        conn.execute("DELETE FROM user_stats WHERE user_id = ?", (USER_ID,))
+        conn.execute("DELETE FROM user_exam_stats WHERE user_id = ?", (USER_ID,))
+
+def insert_start(conn) -> None:
+    with conn:
+        conn.execute("INSERT INTO quiz_sessions (user_id, sinav_turu, quiz_length) VALUES (?, ?, ?)", (USER_ID, 'Vize', 10))
+
+def measure_start(conn, size: int, repeat: int) -> tuple:
+    delete_total = 0.0
+    for _ in range(repeat):
+        fill_history(conn, size)
+        started = time.perf_counter()
+        delete_start(conn)
+        delete_total += time.perf_counter() - started
+    fill_history(conn, size)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        insert_start(conn)
+    insert_total = time.perf_counter() - started
+    delete_start(conn)
+    return delete_total / repeat * 1e3, insert_total / repeat * 1e3
+
+def fill_old_sessions(conn, count: int) -> None:
+    with conn:
+        for i in range(count):
+            session_id = conn.execute(
+                "INSERT INTO quiz_sessions (user_id, sinav_turu, quiz_length, started_at, answered, correct) "
+                "VALUES (?, 'Vize', 10, '2020-01-01 00:00:00', 10, 6)", (10_000 + i % 500,)
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, timestamp, answer_time_seconds, session_id) "
+                "VALUES (?, ?, 'Rotunda', ?, '2020-01-01 00:00:00', 10, ?)",
+                [(10_000 + i % 500, random.randint(1, 60), random.random() < 0.6, session_id) for _ in range(10)]
+            )
+
+def fill_legacy_answers(conn, count: int) -> None:
+    """Quiz oturumlarından önceki gibi session_id'si boş eski cevaplar yazar."""
+    with conn:
+        conn.executemany(
+            "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, timestamp, answer_time_seconds) "
+            "VALUES (?, ?, 'Rotunda', ?, '2020-01-01 00:00:00', 10)",
+            [(10_000 + i % 500, random.randint(1, 60), random.random() < 0.6) for i in range(count)]
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', type=int, nargs='*', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--legacy', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        copy_database(path).close()
+        database.DB_PATH = path
+        conn = database.get_db_connection()
+
+        for size in args.history:
+            delete_ms, insert_ms = measure_start(conn, size, args.repeat)
+            print(f"geçmiş={size:6}: delete {delete_ms:7.2f} ms  insert {insert_ms:5.2f} ms  ({delete_ms / insert_ms:4.1f}x)")
+
+        fill_old_sessions(conn, args.sessions)
+        fill_legacy_answers(conn, args.legacy)
+        before = conn.execute("SELECT COUNT(*) FROM user_answers").fetchone()[0]
+        archive_dir = os.path.join(tmp, 'arsiv')
+        started = time.perf_counter()
+        archived = archive_sessions(conn, directory=archive_dir)
+        elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        unsessioned = archive_unsessioned_answers(conn, directory=archive_dir)
+        unsessioned_elapsed = time.perf_counter() - started
+        after = conn.execute("SELECT COUNT(*) FROM user_answers").fetchone()[0]
+        size_kb = sum(os.path.getsize(os.path.join(archive_dir, name)) for name in os.listdir(archive_dir)) / 1024
+        print(f"arşiv: {archived} quiz {elapsed:.2f} sn ({archived / elapsed:.0f} quiz/sn); "
+              f"quiz dışı {unsessioned} cevap {unsessioned_elapsed:.2f} sn; "
+              f"user_answers {before} -> {after} satır; {len(os.listdir(archive_dir))} dosya, {size_kb:.0f} KB")
+        conn.close()
+
+if __name__ == '__main__':
+    main()
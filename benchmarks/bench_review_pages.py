@@ -0,0 +1,103 @@
+"""
+/yanlislarim sayfalamasının derinliğe göre maliyetini ve detaydan dönüşün veritabanı işini ölçer.
+
+  offset : ORDER BY timestamp DESC LIMIT n OFFSET k; derin sayfalarda atlanan satırlar yine okunur.
+  keyset : review_pages.WrongAnswerPages; (timestamp, id) imleciyle, sayfa derinliğinden bağımsız.
+
+Bir kullanıcıya --wrong adet yanlış cevap yazılır (aynı saniyede birden çok cevap dahil), ardından
+tüm sayfalar baştan sona gezilir. Ayrıca her sayfada bir detay açılıp listeye dönülür ve bu iki
+adımın kaç veritabanı okuması yaptığı sayılır.
+
+Kullanım: python benchmarks/bench_review_pages.py [--wrong 20000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from answer_log import AnswerLogWriter
+from database import Database
+from db_copy import copy_database
+from review_pages import WrongAnswerPages, REVIEW_PAGE_SIZE
+
+USER_ID = 1
+
+OFFSET_SQL = (
+    "SELECT question_id, user_answer FROM user_answers WHERE user_id = ? AND is_correct = 0 "
+    "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+)
+
+def prepare_database(path: str, wrong: int) -> None:
+    conn = copy_database(path)
+    conn.executemany(
+        "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, timestamp, answer_time_seconds) VALUES (?, ?, ?, 0, ?, 10)",
+        ((USER_ID, i % 60 + 1, "Rotunda", f"2026-01-01 {i // 3 // 3600 % 24:02}:{i // 3 // 60 % 60:02}:{i // 3 % 60:02}") for i in range(wrong))
+    )
+    conn.commit()
+    conn.close()
+
+class CountingAnswerLog(AnswerLogWriter):
+    """Veritabanı okumalarını sayan cevap kaydı."""
+    reads = 0
+
+    async def read_for_user(self, user_id, func, *args):
+        self.reads += 1
+        return await super().read_for_user(user_id, func, *args)
+
+async def walk_offset(db, pages: int) -> list:
+    timings = []
+    for page in range(pages):
+        started = time.perf_counter()
+        await db.fetchall(OFFSET_SQL, (USER_ID, REVIEW_PAGE_SIZE, page * REVIEW_PAGE_SIZE))
+        timings.append(time.perf_counter() - started)
+    return timings
+
+async def walk_keyset(review_pages: WrongAnswerPages, answer_log: CountingAnswerLog) -> tuple:
+    timings, back_reads = [], 0
+    started = time.perf_counter()
+    page = await review_pages.newest(USER_ID)
+    timings.append(time.perf_counter() - started)
+    while page.older:
+        # Detay + listeye dönüş: önbellekteki sayfadan karşılanır
+        reads = answer_log.reads
+        assert review_pages.current(USER_ID) is page and page.rows
+        back_reads += answer_log.reads - reads
+        started = time.perf_counter()
+        page = await review_pages.older(USER_ID, page.older)
+        timings.append(time.perf_counter() - started)
+    return timings, back_reads
+
+def describe(label: str, timings: list) -> None:
+    middle = timings[len(timings) // 2]
+    print(f"{label:7}: {len(timings):5} sayfa  ilk {timings[0] * 1e3:6.2f} ms  orta {middle * 1e3:6.2f} ms  "
+          f"son {timings[-1] * 1e3:6.2f} ms  toplam {sum(timings):6.2f} sn")
+
+async def run(wrong: int) -> None:
+    db = Database()
+    answer_log = CountingAnswerLog(db)
+    review_pages = WrongAnswerPages(answer_log)
+    pages = -(-wrong // REVIEW_PAGE_SIZE)
+    describe('offset', await walk_offset(db, pages))
+    timings, back_reads = await walk_keyset(review_pages, answer_log)
+    describe('keyset', timings)
+    print(f"keyset sayfa sayısı doğru: {len(timings) == pages}; detaydan dönüşlerde okuma: {back_reads} (önceden sayfa başına 2)")
+    db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wrong', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        prepare_database(path, args.wrong)
+        database.DB_PATH = path
+        asyncio.run(run(args.wrong))
+
+if __name__ == '__main__':
+    main()
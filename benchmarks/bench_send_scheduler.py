@@ -0,0 +1,99 @@
+"""
+Telegram hız sınırlarına takılan bir gönderim patlamasında send_scheduler.SendScheduler'ı ölçer.
+
+Senaryo: sınıf bir anda quizi bitirir ve --bulk öğrenciye quiz özeti (toplu mesaj) gönderilir;
+hemen ardından --students öğrenci etkileşimli yanıt bekler (her birine art arda --per-student
+mesaj). Sahte Bot API (FakeBotAPI) saniyede 30 genel ve sohbet başına saniyede 3 mesajın
+üzerinde Telegram gibi 429 döner.
+
+  none     : hız sınırlayıcı yok; 429 alan gönderimler başarısız olur.
+  fifo     : SendScheduler, tüm mesajlar aynı öncelikte.
+  priority : SendScheduler, özetler rate_limit_args=PRIORITY_BULK ile gönderilir.
+
+Her mod için teslim edilen/başarısız mesajlar, 429 sayısı ve önceliğe göre gecikmeler raporlanır.
+
+Kullanım: python benchmarks/bench_send_scheduler.py [--students 60] [--per-student 3] [--bulk 150]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram.error import RetryAfter
+from telegram.ext import ExtBot
+
+from fake_bot_api import FakeBotAPI
+from send_scheduler import SendScheduler, PRIORITY_BULK
+
+FAKE_TOKEN = "123456:SAHTE-TOKEN"
+FAKE_GLOBAL_LIMIT = 30
+FAKE_CHAT_LIMIT = 3
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[int(q) - 1] if len(values) > 1 else values[0]
+
+async def run(mode: str, students: int, per_student: int, bulk: int) -> dict:
+    fake = FakeBotAPI(global_limit=FAKE_GLOBAL_LIMIT, chat_limit=FAKE_CHAT_LIMIT)
+    scheduler = None if mode == 'none' else SendScheduler()
+    bot = ExtBot(FAKE_TOKEN, request=fake, get_updates_request=fake, rate_limiter=scheduler)
+    latencies = {'interactive': [], 'bulk': []}
+    failed = 0
+
+    async def send(kind: str, chat_id: int, text: str, **kwargs) -> None:
+        nonlocal failed
+        started = time.perf_counter()
+        try:
+            await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        except RetryAfter:
+            failed += 1
+            return
+        latencies[kind].append(time.perf_counter() - started)
+
+    async def student(chat_id: int) -> None:
+        # Aynı sohbete giden mesajlar sırayla gönderilir (onay, sıradaki soru...)
+        for i in range(per_student):
+            await send('interactive', chat_id, f"soru {i}")
+
+    async with bot:
+        fake.flood_errors = 0
+        started = time.perf_counter()
+        bulk_kwargs = {'rate_limit_args': PRIORITY_BULK} if mode == 'priority' else {}
+        summaries = [asyncio.create_task(send('bulk', 10_000 + i, "özet", **bulk_kwargs)) for i in range(bulk)]
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*(student(20_000 + i) for i in range(students)), *summaries)
+        elapsed = time.perf_counter() - started
+
+    return {
+        'delivered': sum(len(v) for v in latencies.values()),
+        'failed': failed,
+        'flood_errors': fake.flood_errors,
+        'retries': scheduler.retries if scheduler else 0,
+        'elapsed_s': elapsed,
+        'interactive_p50': percentile(latencies['interactive'], 50),
+        'interactive_p95': percentile(latencies['interactive'], 95),
+        'bulk_p95': percentile(latencies['bulk'], 95),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=60)
+    parser.add_argument('--per-student', type=int, default=3)
+    parser.add_argument('--bulk', type=int, default=150)
+    args = parser.parse_args()
+
+    total = args.students * args.per_student + args.bulk
+    print(f"{total} mesaj ({args.students}x{args.per_student} etkileşimli + {args.bulk} toplu)")
+    for mode in ('none', 'fifo', 'priority'):
+        r = asyncio.run(run(mode, args.students, args.per_student, args.bulk))
+        print(f"{mode:8}: teslim={r['delivered']:4} başarısız={r['failed']:4} 429={r['flood_errors']:4} "
+              f"yeniden deneme={r['retries']:3} süre={r['elapsed_s']:5.1f}s  "
+              f"etkileşimli p50={r['interactive_p50']:5.2f}s p95={r['interactive_p95']:5.2f}s  toplu p95={r['bulk_p95']:5.2f}s")
+
+if __name__ == '__main__':
+    main()
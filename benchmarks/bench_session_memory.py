@@ -0,0 +1,109 @@
+"""
+Aktif quiz oturumu başına bellek kullanımını karşılaştırır.
+
+  dict    : eski biçim; context.user_data[user_id] içinde serbest biçimli iç içe sözlük,
+            seçili şıklar liste olarak tutulur.
+  session : context.user_data[SESSION_KEY] içinde __slots__'lı QuizSession, seçimler bit maskesi.
+
+Her iki biçimde de Application.user_data'daki kullanıcı sözlüğü dahil edilerek oturum başına
+tracemalloc ile ölçülen bayt raporlanır. Ardından öğrencilerin bir kısmının quizi yarıda
+bıraktığı bir gün simüle edilir ve temizlik taraması ile taramasız bellekte kalan oturum sayısı
+karşılaştırılır.
+
+Kullanım: python benchmarks/bench_session_memory.py [--sessions 20000] [--abandon 0.6]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz_session import QuizSession, SessionSweeper, SESSION_KEY, SESSION_IDLE_TTL
+
+QUESTION_IDS = range(1, 66)
+
+def dict_session(user_id: int, now: float) -> dict:
+    deck = random.sample(QUESTION_IDS, 10)
+    deck.pop()
+    return {user_id: {
+        'sinav_turu': 'Vize',
+        'question_deck': deck,
+        'quiz_length': 10,
+        'current_quiz_questions_answered': 0,
+        'current_quiz_correct_answers': 0,
+        'current_quiz_start_time': now,
+        'start_time': now,
+        'last_question_message_id': 100_000 + user_id,
+        'selected_options': ['A', 'C'],
+    }}
+
+def slots_session(user_id: int, now: float) -> dict:
+    session = QuizSession('Vize', random.sample(QUESTION_IDS, 10), now)
+    session.next_question_id()
+    session.message_id = 100_000 + user_id
+    session.toggle('A')
+    session.toggle('C')
+    return {SESSION_KEY: session}
+
+def bytes_per_session(factory, count: int) -> float:
+    user_data = {}
+    now = time.time()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        user_id = 1_000_000_000 + i
+        user_data[user_id] = factory(user_id, now + i * 0.001)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+class _Application:
+    """SessionSweeper için Application.user_data ve drop_user_data taklidi."""
+
+    def __init__(self):
+        self.user_data = {}
+
+    def drop_user_data(self, user_id: int) -> None:
+        self.user_data.pop(user_id, None)
+
+def simulate_day(count: int, abandon: float) -> tuple:
+    """Gün boyunca başlayan quizlerden bitmeyenlerin gün sonunda bellekte kalan sayısı (taramasız, taramalı)."""
+    day = 24 * 3600
+    start = time.time()
+    without_sweep, with_sweep = _Application(), _Application()
+    sweeper = SessionSweeper()
+    starts = sorted(random.uniform(0, day) for _ in range(count))
+    next_sweep = 60
+    for i, offset in enumerate(starts):
+        while next_sweep < offset:
+            sweeper.sweep(with_sweep, start + next_sweep)
+            next_sweep += 60
+        user_id = 1_000_000_000 + i
+        for app in (without_sweep, with_sweep):
+            app.user_data[user_id] = slots_session(user_id, start + offset)
+        if random.random() >= abandon: # Quizi bitiren öğrencinin oturumu özetle birlikte kapanır
+            for app in (without_sweep, with_sweep):
+                app.user_data[user_id].pop(SESSION_KEY)
+    sweeper.sweep(with_sweep, start + day)
+    return len(without_sweep.user_data), len(with_sweep.user_data)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--abandon', type=float, default=0.6, help="Quizi yarıda bırakan öğrenci oranı")
+    args = parser.parse_args()
+
+    old = bytes_per_session(dict_session, args.sessions)
+    new = bytes_per_session(slots_session, args.sessions)
+    print(f"dict    : {old:7.0f} bayt/oturum")
+    print(f"session : {new:7.0f} bayt/oturum ({old / new:.1f}x daha az)")
+
+    kept_without, kept_with = simulate_day(args.sessions, args.abandon)
+    print(f"{args.sessions} quiz/gün, %{args.abandon * 100:.0f} yarıda bırakılmış: gün sonunda bellekte kalan kullanıcı kaydı "
+          f"taramasız {kept_without}, taramalı {kept_with} (boşta kalma süresi {SESSION_IDLE_TTL} sn)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+SQLite bağlantı profilinin (WAL, synchronous, önbellek, mmap...) etkisini ölçer.
+
+Aynı süre boyunca botun gerçek sorgu karışımı çalıştırılır:
+  okuyucular : kullanıcı durumu, /yanlislarim listesi, yanlış soru detayı, /istatistik, /liderler
+  yazıcı     : cevap kaydının yaptığı gibi küçük partiler halinde cevap + istatistik yazımı
+Önce SQLite'ın varsayılan ayarları (database.DEFAULT_PROFILE), sonra üretim profili
+(database.SQLITE_PROFILE) ile ölçülür. Her mod, 500 kullanıcının 50 bin cevabıyla başlayan ayrı bir
+veritabanında çalışır; böylece ilk modun yazdıkları ikinciyi etkilemez.
+
+Kullanım: python benchmarks/bench_sqlite_profile.py [--readers 8] [--seconds 5] [--dir /var/tmp]
+"""
+import argparse
+import asyncio
+import functools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import Database, get_db_connection
+from db_copy import copy_database
+from answer_log import AnswerLogWriter
+
+READ_QUERIES = [
+    ("SELECT current_question_id, state FROM users WHERE id = ?", lambda u: (u,)),
+    ("SELECT question_id, user_answer FROM user_answers WHERE user_id = ? AND is_correct = 0 ORDER BY timestamp DESC LIMIT 10", lambda u: (u,)),
+    ("SELECT user_answer FROM user_answers WHERE user_id = ? AND question_id = ? AND is_correct = 0 ORDER BY timestamp DESC LIMIT 1",
+     lambda u: (u, random.randint(1, 65))),
+    ("SELECT answered, correct, total_time, timed_count FROM user_stats WHERE user_id = ?", lambda u: (u,)),
+    ("SELECT user_id, answered, correct FROM user_stats WHERE correct > 0 ORDER BY correct DESC, answered ASC, user_id ASC LIMIT 10",
+     lambda u: ()),
+]
+USERS = 500
+
+def prepare_copy(target_path: str) -> None:
+    """Deponun veritabanını kopyalar, şemayı günceller ve örnek bir cevap geçmişi ekler."""
+    target = copy_database(target_path)
+    target.executemany(
+        "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
+        [(30_000 + random.randrange(USERS), random.randint(1, 65), "x", random.random() < 0.6, random.randint(2, 40)) for _ in range(50_000)]
+    )
+    target.commit()
+    target.close()
+
+async def reader(db, deadline: float, counter: list) -> None:
+    loop = asyncio.get_running_loop()
+    while loop.time() < deadline:
+        sql, params = random.choice(READ_QUERIES)
+        await db.fetchall(sql, params(30_000 + random.randrange(USERS)))
+        counter[0] += 1
+
+async def writer(log, deadline: float, counter: list) -> None:
+    loop = asyncio.get_running_loop()
+    while loop.time() < deadline:
+        await log.record(30_000 + random.randrange(USERS), random.randint(1, 65), "x", random.random() < 0.6, random.randint(2, 40), 'Vize')
+        counter[0] += 1
+        if counter[0] % 10 == 0:
+            await asyncio.sleep(0) # Diğer görevlerin de döngüye girmesine izin ver
+
+async def run_profile(name: str, profile: dict, readers: int, seconds: float) -> dict:
+    db = Database(connect=functools.partial(get_db_connection, profile))
+    log = AnswerLogWriter(db, batch_size=20)
+    reads, writes = [0], [0]
+    started = time.perf_counter()
+    deadline = asyncio.get_running_loop().time() + seconds
+    await asyncio.gather(writer(log, deadline, writes), *(reader(db, deadline, reads) for _ in range(readers)))
+    await log.close()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return {
+        'profile': name,
+        'reads_per_s': round(reads[0] / elapsed, 1),
+        'answers_per_s': round(writes[0] / elapsed, 1),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--dir', default=None, help="Geçici veritabanının oluşturulacağı klasör")
+    args = parser.parse_args()
+
+    source_path = database.DB_PATH
+    for name, profile in (('varsayılan', database.DEFAULT_PROFILE), ('üretim', database.SQLITE_PROFILE)):
+        with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+            database.DB_PATH = source_path
+            path = os.path.join(tmp, 'bench.db')
+            prepare_copy(path)
+            database.DB_PATH = path
+            print(asyncio.run(run_profile(name, profile, args.readers, args.seconds)))
+
+if __name__ == '__main__':
+    main()
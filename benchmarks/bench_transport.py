@@ -0,0 +1,120 @@
+"""
+Güncellemenin Telegram'a ulaşmasından işleyiciye varmasına kadar geçen süreyi,
+uzun yoklama (polling) ve webhook modlarında karşılaştırır.
+
+  polling : Application.updater, sahte Bot API'den (FakeBotAPI) getUpdates ile uzun yoklama yapar.
+  webhook : webhook.WebhookReceiver, güncellemeleri yerel HTTP POST ile alır.
+
+Her iki modda da Telegram ile bot arasındaki tek yönlü ağ gecikmesi --latency ile eklenir.
+Güncellemeler rastgele aralıklarla üretilir ve gecikme, güncellemenin üretildiği andan
+işleyicinin çalıştığı ana kadar ölçülür.
+
+Kullanım: python benchmarks/bench_transport.py [--updates 500] [--latency 0.02] [--interval 0.005]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from fake_bot_api import FakeBotAPI, callback_update
+from webhook import WebhookReceiver
+
+SECRET = 'kiyaslama-gizli-anahtari'
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+def build_application(fake: FakeBotAPI, arrivals: dict, with_updater: bool) -> Application:
+    builder = Application.builder().token('1:sahte').request(fake).get_updates_request(fake)
+    if not with_updater:
+        builder = builder.updater(None)
+    application = builder.build()
+
+    async def record_arrival(update: Update, context) -> None:
+        arrivals[update.update_id] = time.perf_counter()
+
+    application.add_handler(TypeHandler(Update, record_arrival))
+    return application
+
+def summarize(mode: str, sent: dict, arrivals: dict) -> dict:
+    latencies = [arrivals[uid] - sent[uid] for uid in sent if uid in arrivals]
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'mode': mode,
+        'delivered': f"{len(latencies)}/{len(sent)}",
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p95_ms': round(quantiles[94] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2),
+    }
+
+async def wait_for(arrivals: dict, count: int, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while len(arrivals) < count and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+
+async def run_polling(updates: int, latency: float, interval: float) -> dict:
+    fake = FakeBotAPI(latency=latency)
+    arrivals, sent = {}, {}
+    application = build_application(fake, arrivals, with_updater=True)
+    async with application:
+        await application.start()
+        await application.updater.start_polling(poll_interval=0.0, timeout=10, allowed_updates=ALLOWED_UPDATES)
+        for update_id in range(1, updates + 1):
+            await asyncio.sleep(random.uniform(0, 2 * interval))
+            sent[update_id] = time.perf_counter()
+            # Güncelleme Telegram sunucusuna ulaşır; bekleyen getUpdates yanıtı gecikmeyle döner
+            fake.updates.put_nowait(callback_update(update_id, 50_000 + update_id % 100, 'select_option_A', 1))
+        await wait_for(arrivals, updates)
+        await application.updater.stop()
+        await application.stop()
+    return summarize('polling', sent, arrivals)
+
+async def run_webhook(updates: int, latency: float, interval: float) -> dict:
+    fake = FakeBotAPI()
+    arrivals, sent = {}, {}
+    application = build_application(fake, arrivals, with_updater=False)
+    async with application:
+        await application.start()
+        receiver = WebhookReceiver(application, SECRET, '/telegram', ALLOWED_UPDATES)
+        server = await receiver.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', headers={'X-Telegram-Bot-Api-Secret-Token': SECRET}) as client:
+
+            async def deliver(update_id: int) -> None:
+                body = json.dumps(callback_update(update_id, 50_000 + update_id % 100, 'select_option_A', 1))
+                await asyncio.sleep(latency) # Telegram'dan bota tek yönlü ağ gecikmesi
+                await client.post('/telegram', content=body, headers={'Content-Type': 'application/json'})
+
+            tasks = []
+            for update_id in range(1, updates + 1):
+                await asyncio.sleep(random.uniform(0, 2 * interval))
+                sent[update_id] = time.perf_counter()
+                tasks.append(asyncio.create_task(deliver(update_id)))
+            await asyncio.gather(*tasks)
+            await wait_for(arrivals, updates)
+        server.close()
+        await server.wait_closed()
+        await application.stop()
+    return summarize('webhook', sent, arrivals)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--updates', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.02, help="Tek yönlü ağ gecikmesi (saniye)")
+    parser.add_argument('--interval', type=float, default=0.005, help="Güncellemeler arası ortalama süre (saniye)")
+    args = parser.parse_args()
+
+    print(asyncio.run(run_polling(args.updates, args.latency, args.interval)))
+    print(asyncio.run(run_webhook(args.updates, args.latency, args.interval)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Çok süreçli çalışma modunun (workers.py) işçi sayısıyla işlem hacmini ölçer.
+
+Her --workers değeri için workers.WorkerPool, aynı veritabanı dosyasını paylaşan
+o kadar işçi süreç başlatır; işçilerin Bot API çağrıları süreç içi sahte Bot API'ye (FakeBotAPI)
+gider ve gönderim hız sınırlayıcısı kapatılır. İşçiler hazır olunca --students öğrencinin tam
+quiz akışları (/start, sınav seçimi, her soru için şık seçimi + onay) dağıtıcının deliver()
+kancasına öğrenciler arasında dönüşümlü olarak verilir. Süre, ilk güncellemeden tüm işçilerin
+kuyruklarını bitirip kapanmasına kadar ölçülür. Her çalıştırmadan sonra tüm cevapların
+kaydedildiği doğrulanır (kullanıcı başına sıra bozulursa cevaplar eksik kalır).
+
+İşlem hacmi ancak makinede birden çok çekirdek varsa işçi sayısıyla artar; CPU sayısı raporlanır.
+
+Kullanım: python benchmarks/bench_workers.py [--students 200] [--workers 1 2 4]
+"""
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_copy import copy_database
+from question_bank import QuestionBank
+from fake_bot_api import FakeBotAPI, callback_update, message_update
+from workers import WorkerPool
+
+QUIZ_LENGTH = 10
+
+def prepare_database(target_path: str) -> int:
+    """Veritabanı kopyasını hazırlar; Vize quiz uzunluğunu döndürür."""
+    target = copy_database(target_path)
+    bank = QuestionBank()
+    bank.load(target)
+    target.close()
+    return min(QUIZ_LENGTH, len(bank.ids_for_exam('Vize')))
+
+def student_updates(user_id: int, quiz_length: int, update_ids) -> list:
+    updates = [
+        message_update(next(update_ids), user_id, '/start'),
+        callback_update(next(update_ids), user_id, 'start_quiz_Vize', 1),
+    ]
+    for _ in range(quiz_length):
+        for letter in random.sample('ABCDE', random.randint(1, 2)):
+            updates.append(callback_update(next(update_ids), user_id, f'select_option_{letter}', 2))
+        updates.append(callback_update(next(update_ids), user_id, 'submit_answer', 2))
+    return updates
+
+async def run(workers: int, students: int, quiz_length: int, db_path: str, first_user: int) -> dict:
+    ready = multiprocessing.get_context('spawn').Queue()
+    pool = WorkerPool(
+        workers, db_path=db_path, request_factory=FakeBotAPI,
+        overrides={'send_scheduler': None, 'METRICS_PORT': 0}, ready=ready,
+    )
+    pool.start()
+    loop = asyncio.get_running_loop()
+    for _ in range(workers):
+        await loop.run_in_executor(None, ready.get)
+
+    update_ids = itertools.count(1)
+    flows = [student_updates(first_user + i, quiz_length, update_ids) for i in range(students)]
+    # Öğrencilerin güncellemeleri dönüşümlü gelir; her öğrencinin kendi sırası korunur
+    updates = [update for step in itertools.zip_longest(*flows) for update in step if update is not None]
+    started = time.perf_counter()
+    for update in updates:
+        await pool.deliver(update)
+    await pool.stop()
+    elapsed = time.perf_counter() - started
+    return {'updates': len(updates), 'elapsed_s': elapsed, 'per_worker': pool.delivered}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        quiz_length = prepare_database(db_path)
+        print(f"{os.cpu_count()} CPU, {args.students} öğrenci x {quiz_length} soru")
+        baseline = None
+        for run_no, workers in enumerate(args.workers):
+            first_user = 100_000 * (run_no + 1)
+            r = asyncio.run(run(workers, args.students, quiz_length, db_path, first_user))
+            conn = sqlite3.connect(db_path)
+            stored = conn.execute(
+                "SELECT COUNT(*) FROM user_answers WHERE user_id BETWEEN ? AND ?", (first_user, first_user + args.students)
+            ).fetchone()[0]
+            conn.close()
+            rate = r['updates'] / r['elapsed_s']
+            baseline = baseline or rate
+            print(f"işçi={workers}: {r['updates']} güncelleme {r['elapsed_s']:6.2f} sn  {rate:7.0f} güncelleme/sn  "
+                  f"({rate / baseline:.2f}x)  işçi başına {r['per_worker']}  kaydedilen cevap {stored}/{args.students * quiz_length}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""
+Kıyaslamalar için deponun veritabanının kopyası.
+
+Kıyaslamalar deponun veritabanını (database.DB_PATH) hiçbir zaman değiştirmez: veritabanı salt
+okunur açılır, SQLite backup API'siyle hedefe kopyalanır ve şema göçleri yalnızca kopyaya
+uygulanır. Hedef verilmezse kopya bellekte tutulur.
+"""
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from migrations import migrate
+
+def copy_database(target_path: str = ":memory:") -> sqlite3.Connection:
+    """Deponun veritabanını target_path'e kopyalar, son şemaya getirir ve kopyaya açık bağlantıyı döndürür."""
+    source = sqlite3.connect(f"file:{database.DB_PATH}?mode=ro", uri=True)
+    target = sqlite3.connect(target_path)
+    source.backup(target)
+    source.close()
+    migrate(target)
+    return target
@@ -0,0 +1,150 @@
+"""
+Ağ bağlantısı olmadan botu çalıştırmak için süreç içi sahte Bot API.
+
+FakeBotAPI, python-telegram-bot'un BaseRequest arayüzünü uygular; Application.builder()
+.request(...) ve .get_updates_request(...) ile verildiğinde tüm Bot API çağrıları buraya gelir.
+Gönderilen mesajlar için geçerli Message nesneleri döner, getUpdates ise 'updates' kuyruğundan
+uzun yoklama (long polling) yapar. Her yöntemin kaç kez çağrıldığı 'calls' sayacında tutulur.
+İsteğe bağlı 'latency', her isteğe gidiş ve dönüş için eklenen tek yönlü ağ gecikmesidir.
+'global_limit' ve 'chat_limit' verilirse mesaj gönderen/düzenleyen yöntemler son bir saniyede
+bu sayıları aşınca Telegram gibi 429 (retry_after=1) döner; dönen 429'lar 'flood_errors'da sayılır.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter, defaultdict, deque
+
+from telegram.request import BaseRequest
+
+# Telegram'ın mesaj sınırlarına tabi yöntemler
+FLOOD_LIMITED_METHODS = frozenset({'sendMessage', 'sendPhoto', 'editMessageText', 'editMessageCaption', 'editMessageReplyMarkup'})
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Sahte Bot', 'username': 'sahte_bot'}
+
+def user_dict(user_id: int) -> dict:
+    return {'id': user_id, 'is_bot': False, 'first_name': f'Ogrenci{user_id}', 'username': f'ogrenci{user_id}'}
+
+def message_dict(message_id: int, chat_id: int, text: str = None, from_user: dict = None, photo: bool = False) -> dict:
+    message = {'message_id': message_id, 'date': int(time.time()), 'chat': {'id': chat_id, 'type': 'private'}}
+    if from_user:
+        message['from'] = from_user
+    if text is not None:
+        message['caption' if photo else 'text'] = text
+        if text.startswith('/') and not photo:
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+    if photo:
+        message['photo'] = [{'file_id': f'sahte-dosya-{message_id}', 'file_unique_id': f'u{message_id}', 'width': 1, 'height': 1}]
+    return message
+
+def message_update(update_id: int, user_id: int, text: str, message_id: int = 1) -> dict:
+    """Bir kullanıcının yazdığı mesaj veya komut için güncelleme JSON'u."""
+    return {'update_id': update_id, 'message': message_dict(message_id, user_id, text, user_dict(user_id))}
+
+def callback_update(update_id: int, user_id: int, data: str, message_id: int, photo: bool = False) -> dict:
+    """Bir kullanıcının inline butona tıklaması için güncelleme JSON'u."""
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id), 'from': user_dict(user_id), 'chat_instance': str(user_id), 'data': data,
+            'message': message_dict(message_id, user_id, 'soru', BOT_USER, photo=photo),
+        },
+    }
+
+class FakeBotAPI(BaseRequest):
+    """Bot API'yi süreç içinde taklit eden BaseRequest uygulaması."""
+
+    def __init__(self, latency: float = 0.0, global_limit: int = None, chat_limit: int = None):
+        self.latency = latency
+        self.updates = asyncio.Queue()
+        self.calls = Counter()
+        # yöntem adı -> sıradaki çağrılarda döndürülecek 429 retry_after değerleri
+        self.rate_limits = {}
+        self.global_limit = global_limit
+        self.chat_limit = chat_limit
+        self.flood_errors = 0
+        self._sent = deque() # Son bir saniyede kabul edilen mesajların zamanları
+        self._sent_by_chat = defaultdict(deque)
+        self._message_ids = itertools.count(1000)
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None, write_timeout=None,
+                         connect_timeout=None, pool_timeout=None):
+        api_method = url.rsplit('/', 1)[-1]
+        params = request_data.parameters if request_data else {}
+        self.calls[api_method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        pending_429 = self.rate_limits.get(api_method)
+        if pending_429 or (api_method in FLOOD_LIMITED_METHODS and self._flooded(params.get('chat_id'))):
+            retry_after = pending_429.pop(0) if pending_429 else 1
+            self.flood_errors += 1
+            payload = {'ok': False, 'error_code': 429, 'description': f'Too Many Requests: retry after {retry_after}',
+                       'parameters': {'retry_after': retry_after}}
+            return 429, json.dumps(payload).encode()
+
+        handler = getattr(self, f'_{api_method}', None)
+        result = await handler(params) if handler else True
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
+
+    def _flooded(self, chat_id) -> bool:
+        """Mesaj sınırı aşıldıysa True döner; aşılmadıysa mesajı son bir saniyenin sayımına ekler."""
+        if self.global_limit is None and self.chat_limit is None:
+            return False
+        now = time.monotonic()
+        by_chat = self._sent_by_chat[chat_id]
+        for window in (self._sent, by_chat):
+            while window and now - window[0] >= 1.0:
+                window.popleft()
+        if (self.global_limit is not None and len(self._sent) >= self.global_limit) or \
+                (self.chat_limit is not None and len(by_chat) >= self.chat_limit):
+            return True
+        self._sent.append(now)
+        by_chat.append(now)
+        return False
+
+    async def _getMe(self, params):
+        return BOT_USER
+
+    async def _getUpdates(self, params):
+        timeout = float(params.get('timeout', 0) or 0)
+        updates = []
+        try:
+            updates.append(await asyncio.wait_for(self.updates.get(), timeout) if timeout else self.updates.get_nowait())
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+            return []
+        limit = int(params.get('limit', 100) or 100)
+        while len(updates) < limit and not self.updates.empty():
+            updates.append(self.updates.get_nowait())
+        return updates
+
+    async def _getChat(self, params):
+        chat_id = int(params['chat_id'])
+        return {'id': chat_id, 'type': 'private', 'username': f'ogrenci{chat_id}', 'accent_color_id': 0, 'max_reaction_count': 0}
+
+    def _sent_message(self, params, text_key: str, photo: bool = False):
+        return message_dict(next(self._message_ids), int(params['chat_id']), params.get(text_key), BOT_USER, photo=photo)
+
+    async def _sendMessage(self, params):
+        return self._sent_message(params, 'text')
+
+    async def _sendPhoto(self, params):
+        return self._sent_message(params, 'caption', photo=True)
+
+    async def _editMessageText(self, params):
+        return message_dict(int(params['message_id']), int(params['chat_id']), params.get('text'), BOT_USER)
+
+    async def _editMessageCaption(self, params):
+        return message_dict(int(params['message_id']), int(params['chat_id']), params.get('caption'), BOT_USER, photo=True)
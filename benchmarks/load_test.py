@@ -0,0 +1,181 @@
+"""
+Gerçek işleyicilerle çevrimdışı yük testi.
+
+main.build_application() ile kurulan gerçek Application, süreç içi sahte Bot API'ye (FakeBotAPI)
+bağlanır. N öğrenci aynı anda şu akışı izler:
+    /start -> sınav seçimi -> her soru için 1-2 şık seçimi + onay -> quiz özeti -> /liderler
+    -> /yanlislarim -> detaydan yanlış listesine dönüş
+Her güncelleme türü için işlem hacmi, p50/p95/p99 gecikme, güncelleme başına SQL sorgusu ve
+Bot API çağrısı raporlanır. --edit-window ile şık düzenlemelerini birleştirme penceresi
+değiştirilebilir (0: birleştirme yok); toplam Bot API çağrıları yöntem bazında raporlanır. Sonuçlar, çalıştırmalar karşılaştırılabilsin diye JSON olarak yazılır.
+Güncellemeler botta olduğu gibi Application'ın güncelleme işlemcisinden (kullanıcı başına sıralı,
+kullanıcılar arasında eşzamanlı) geçer ve giden mesajlar botun varsayılanı gibi SendScheduler'ın
+hız sınırlarına tabidir; --no-rate-limit ile hız sınırlayıcı kapatılır.
+
+Kullanım: python benchmarks/load_test.py [--students 50] [--think 0.0] [--edit-window 0.5] [--no-rate-limit] [--output load_test_results.json]
+"""
+import argparse
+import asyncio
+import contextvars
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Update
+
+import database
+from db_copy import copy_database
+from fake_bot_api import FakeBotAPI, callback_update, message_update
+
+# İşlenmekte olan güncellemenin sayaçları; DB iş parçacıklarına contextvars ile taşınır
+current_counters = contextvars.ContextVar('current_counters', default=None)
+
+class CountingBotAPI(FakeBotAPI):
+    """Bot API çağrılarını o an işlenen güncellemeye yazan sahte Bot API."""
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        counters = current_counters.get()
+        if counters is not None:
+            counters['api_calls'] += 1
+        return await super().do_request(url, method, request_data, **kwargs)
+
+def counting_connect():
+    """Her SQL ifadesini o an işlenen güncellemeye yazan bağlantı açar."""
+    conn = database.get_db_connection()
+
+    def on_statement(sql):
+        counters = current_counters.get()
+        if counters is not None:
+            counters['db_queries'] += 1
+    conn.set_trace_callback(on_statement)
+    return conn
+
+class LoadTest:
+    def __init__(self, application, think: float):
+        self.application = application
+        self.bot = application.bot
+        self.think = think
+        self.update_ids = itertools.count(1)
+        self.samples = defaultdict(list) # tür -> [(gecikme, db_sorgu, api_çağrısı)]
+
+    async def send(self, kind: str, data: dict) -> None:
+        update = Update.de_json(data, self.bot)
+        counters = {'db_queries': 0, 'api_calls': 0}
+        started = time.perf_counter()
+
+        token = current_counters.set(counters)
+        try:
+            # Botun güncelleme işlemcisinde sıra bekleme süresi de gecikmeye dahildir
+            await self.application.update_processor.process_update(update, self.application.process_update(update))
+        finally:
+            current_counters.reset(token)
+        self.samples[kind].append((time.perf_counter() - started, counters['db_queries'], counters['api_calls']))
+        if self.think:
+            await asyncio.sleep(random.uniform(0, 2 * self.think))
+
+    async def student(self, user_id: int, quiz_length: int) -> None:
+        await self.send('start', message_update(next(self.update_ids), user_id, '/start'))
+        await self.send('select_quiz_type', callback_update(next(self.update_ids), user_id, 'start_quiz_Vize', 1))
+        for question_no in range(1, quiz_length + 1):
+            for letter in random.sample('ABCDE', random.randint(1, 2)):
+                await self.send('select_option', callback_update(next(self.update_ids), user_id, f'select_option_{letter}', 2))
+            kind = 'show_quiz_summary' if question_no == quiz_length else 'submit_answer'
+            await self.send(kind, callback_update(next(self.update_ids), user_id, 'submit_answer', 2))
+        await self.send('show_leaderboard', message_update(next(self.update_ids), user_id, '/liderler'))
+        await self.send('review_wrong', message_update(next(self.update_ids), user_id, '/yanlislarim'))
+        await self.send('review_back', callback_update(next(self.update_ids), user_id, 'review_wrong_answers_list', 3))
+
+def percentile_ms(values: list, q: int) -> float:
+    if len(values) < 2:
+        return round(values[0] * 1000, 3) if values else 0.0
+    return round(statistics.quantiles(values, n=100)[q - 1] * 1000, 3)
+
+def report(samples: dict, elapsed: float) -> dict:
+    handlers = {}
+    total_updates = 0
+    for kind, rows in samples.items():
+        latencies = [row[0] for row in rows]
+        total_updates += len(rows)
+        handlers[kind] = {
+            'count': len(rows),
+            'p50_ms': percentile_ms(latencies, 50),
+            'p95_ms': percentile_ms(latencies, 95),
+            'p99_ms': percentile_ms(latencies, 99),
+            'db_queries_per_update': round(sum(row[1] for row in rows) / len(rows), 2),
+            'api_calls_per_update': round(sum(row[2] for row in rows) / len(rows), 2),
+        }
+    return {
+        'updates': total_updates,
+        'elapsed_s': round(elapsed, 3),
+        'updates_per_s': round(total_updates / elapsed, 1),
+        'handlers': handlers,
+    }
+
+async def run(students: int, think: float, edit_window: float = None, rate_limit: bool = True) -> dict:
+    import main
+
+    fake = CountingBotAPI()
+    main.db._connect = counting_connect
+    main.METRICS_PORT = 0
+    if edit_window is not None:
+        main.edit_coalescer.window = edit_window
+    if not rate_limit:
+        main.send_scheduler = None
+    application = main.build_application(request=fake)
+
+    async with application:
+        await main.on_startup(application)
+        quiz_length = min(main.QUIZ_LENGTH, len(main.question_bank.ids_for_exam('Vize')))
+        test = LoadTest(application, think)
+        started = time.perf_counter()
+        await asyncio.gather(*(test.student(60_000 + i, quiz_length) for i in range(students)))
+        elapsed = time.perf_counter() - started
+        await main.on_stop(application)
+        await main.on_shutdown(application)
+
+    result = report(test.samples, elapsed)
+    result['bot_api_calls'] = dict(fake.calls)
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=50)
+    parser.add_argument('--think', type=float, default=0.0, help="Tıklamalar arası ortalama düşünme süresi (saniye)")
+    parser.add_argument('--edit-window', type=float, default=None, help="Şık düzenlemesi birleştirme penceresi (saniye)")
+    parser.add_argument('--no-rate-limit', dest='rate_limit', action='store_false', help="Giden mesajları SendScheduler'dan geçirme")
+    parser.add_argument('--output', default='load_test_results.json')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        copy_database(path).close()
+        database.DB_PATH = path
+        result = asyncio.run(run(args.students, args.think, args.edit_window, args.rate_limit))
+
+    result['config'] = {
+        'students': args.students, 'think_s': args.think, 'edit_window_s': args.edit_window, 'rate_limit': args.rate_limit,
+        'python': platform.python_version(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"{result['updates']} güncelleme, {result['updates_per_s']} güncelleme/sn")
+    for kind, stats in result['handlers'].items():
+        print(f"  {kind:18} n={stats['count']:5} p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms "
+              f"p99={stats['p99_ms']:8.2f}ms sql/güncelleme={stats['db_queries_per_update']:5.2f} api/güncelleme={stats['api_calls_per_update']:4.2f}")
+    print(f"Bot API çağrıları: {sum(result['bot_api_calls'].values())} {result['bot_api_calls']}")
+    print(f"Sonuçlar {args.output} dosyasına yazıldı.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import asyncio
+import contextvars
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import InstrumentedConnection
+
+logger = logging.getLogger(__name__)
+
+# --- Veritabanı Ayarları ---
+DB_PATH = 'art_history_quiz.db'
+DB_POOL_SIZE = 4 # Aynı anda açık tutulacak en fazla SQLite bağlantısı (ve DB iş parçacığı) sayısı
+
+# Her bağlantıda uygulanan SQLite ayarları (PRAGMA adı -> değer). Ayarı değiştirmek veya kapatmak
+# için bu sözlük düzenlenebilir ya da get_db_connection()'a başka bir profil verilebilir.
+SQLITE_PROFILE = {
+    'journal_mode': 'WAL', # Okuyucular ve yazıcı birbirini beklemez
+    'synchronous': 'NORMAL', # WAL ile güvenli; her commit'te değil checkpoint'te fsync yapar
+    'cache_size': -32000, # Negatif değer KiB cinsindendir (~32 MB sayfa önbelleği)
+    'mmap_size': 256 * 1024 * 1024, # Veritabanı dosyasını 256 MB'a kadar belleğe eşle
+    'busy_timeout': 5000, # Kilitli veritabanında hata vermeden önce beklenecek süre (ms)
+    'temp_store': 'MEMORY',
+}
+SQLITE_STATEMENT_CACHE = 256 # Bağlantı başına önbelleğe alınan hazır (prepared) sorgu sayısı
+
+# Karşılaştırma için SQLite'ın varsayılan ayarları
+DEFAULT_PROFILE = {}
+
+def get_db_connection(profile: dict = None):
+    """SQLite veritabanına, verilen (yoksa SQLITE_PROFILE) ayarlarıyla bir bağlantı döndürür."""
+    profile = SQLITE_PROFILE if profile is None else profile
+    # Bağlantılar havuzdaki iş parçacıklarında açılıp kullanıldığı için aynı iş parçacığı kontrolü kapatılır.
+    # Her ifadenin süresi metrics.SQL histogramlarına yazılır.
+    conn = sqlite3.connect(
+        DB_PATH, check_same_thread=False,
+        timeout=profile.get('busy_timeout', 5000) / 1000,
+        cached_statements=SQLITE_STATEMENT_CACHE if profile else 128,
+        factory=InstrumentedConnection
+    )
+    for pragma, value in profile.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+class _ReadWriteGate:
+    """
+    Yazıcıya öncelik veren basit bir okuyucu-yazıcı kilidi.
+    Varsayılan (rollback journal) modda açık bir okuma, commit'i SQLite'ın meşgul bekleme
+    döngüsüne sokar ve gecikmeyi yüzlerce milisaniyeye çıkarır. Bu kapı, aynı süreçteki okuma
+    ve yazmaların SQLite kilidine çarpmadan sırayla girmesini sağlar. WAL modunda okuyucular
+    yazıcıyı engellemediği için kapı kullanılmaz.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+class Database:
+    """
+    SQLite sorgularını olay döngüsünü bloklamadan çalıştıran asenkron veri erişim katmanı.
+    Okumalar sabit sayıda iş parçacığından oluşan bir havuzda, yazmalar ise tek bir yazıcı
+    iş parçacığında sırayla yürütülür; böylece yazıcılar SQLite kilidi için birbirini beklemez.
+    Her iş parçacığı kendi bağlantısını bir kez açar ve tekrar kullanır, bu yüzden açık bağlantı
+    sayısı en fazla havuz boyutu + 1 olur.
+    """
+
+    def __init__(self, connect=get_db_connection, pool_size: int = DB_POOL_SIZE):
+        self._connect = connect
+        self._pool_size = pool_size
+        self._executor = None
+        self._write_executor = None
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._gate = _ReadWriteGate()
+        self._use_gate = True # İlk bağlantı açıldığında günlük moduna göre belirlenir
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._pool_size, thread_name_prefix='sqlite')
+        return self._executor
+
+    def _get_write_executor(self) -> ThreadPoolExecutor:
+        if self._write_executor is None:
+            self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-writer')
+        return self._write_executor
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        """Çalışan iş parçacığına ait bağlantıyı döndürür, yoksa açar."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._use_gate = conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != 'wal'
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _call(self, func, args):
+        conn = self._thread_connection()
+        try:
+            return func(conn, *args)
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _call_read(self, func, args):
+        if not self._use_gate:
+            return self._call(func, args)
+        self._gate.acquire_read()
+        try:
+            return self._call(func, args)
+        finally:
+            self._gate.release_read()
+
+    def _call_write(self, func, args):
+        if not self._use_gate:
+            return self._call(func, args)
+        self._gate.acquire_write()
+        try:
+            return self._call(func, args)
+        finally:
+            self._gate.release_write()
+
+    async def run(self, func, *args):
+        """func(conn, *args) çağrısını okuma havuzunda çalıştırır ve sonucunu döndürür."""
+        loop = asyncio.get_running_loop()
+        # Çağıranın bağlam değişkenleri (contextvars) DB iş parçacığına taşınır
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._get_executor(), context.run, self._call_read, func, args)
+
+    async def run_write(self, func, *args):
+        """func(conn, *args) çağrısını yazıcı iş parçacığında çalıştırır; func kendi commit'ini yapmalıdır."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._get_write_executor(), context.run, self._call_write, func, args)
+
+    async def fetchone(self, sql: str, params=()):
+        """Tek satır döndüren bir sorgu çalıştırır."""
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params=()):
+        """Tüm satırları döndüren bir sorgu çalıştırır."""
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def execute(self, sql: str, params=()) -> int:
+        """Bir yazma sorgusunu çalıştırıp commit eder; etkilenen satır sayısını döndürür."""
+        def _execute(conn):
+            with conn:
+                return conn.execute(sql, params).rowcount
+        return await self.run_write(_execute)
+
+    async def insert(self, sql: str, params=()) -> int:
+        """Tek satır ekleyen bir sorguyu çalıştırıp commit eder; eklenen satırın ID'sini döndürür."""
+        def _insert(conn):
+            with conn:
+                return conn.execute(sql, params).lastrowid
+        return await self.run_write(_insert)
+
+    async def executemany(self, sql: str, seq_of_params) -> int:
+        """Aynı yazma sorgusunu birden çok parametre seti için tek bir işlemde çalıştırır."""
+        def _executemany(conn):
+            with conn:
+                return conn.executemany(sql, seq_of_params).rowcount
+        return await self.run_write(_executemany)
+
+    def close(self) -> None:
+        """Havuzu kapatır ve açık tüm bağlantıları serbest bırakır."""
+        for executor in (self._executor, self._write_executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._executor = None
+        self._write_executor = None
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+        logger.info("Veritabanı bağlantı havuzu kapatıldı.")
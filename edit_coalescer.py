@@ -0,0 +1,71 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- Düzenleme Birleştirme Ayarları ---
+EDIT_COALESCE_WINDOW = 0.5 # Aynı mesaj için iki düzenleme arasındaki en kısa süre (saniye); 0 birleştirmeyi kapatır
+
+class EditCoalescer:
+    """
+    Aynı mesaja art arda gelen düzenleme isteklerini birleştirir.
+    Pencere kapalıyken gelen ilk istek hemen gönderilir ve mesaj için bir pencere açılır;
+    pencere süresince gelen istekler yalnızca en sonuncusu saklanarak bekletilir ve pencere
+    bitiminde tek bir düzenleme olarak gönderilir. İstekler, gönderim anındaki güncel durumu
+    okuyan bir render() fonksiyonu olarak verilir; render() düzenlemeyi yapan coroutine'i döndürür.
+    """
+
+    def __init__(self, window: float = EDIT_COALESCE_WINDOW):
+        self.window = window
+        self._pending = {} # anahtar -> en son render
+        self._windows = {} # anahtar -> pencereyi yöneten görev
+        self.sent = 0
+        self.coalesced = 0
+
+    async def request(self, key, render) -> None:
+        """key (ör. (chat_id, message_id)) için bir düzenleme ister."""
+        if key in self._windows:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = render
+            return
+        if self.window > 0:
+            self._windows[key] = asyncio.create_task(self._run_window(key))
+        await self._send(render)
+
+    def discard(self, key) -> None:
+        """Mesaj için bekleyen düzenlemeyi gönderilmeden düşürür (ör. cevap onaylandığında)."""
+        if self._pending.pop(key, None) is not None:
+            self.coalesced += 1
+
+    async def _run_window(self, key) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                render = self._pending.pop(key, None)
+                if render is None:
+                    return
+                await self._send(render)
+        finally:
+            self._windows.pop(key, None)
+
+    async def _send(self, render) -> None:
+        self.sent += 1
+        try:
+            await render()
+        except Exception as e:
+            logger.error(f"Birleştirilmiş mesaj düzenlemesi gönderilemedi: {e}", exc_info=True)
+
+    async def close(self) -> None:
+        """
+        Pencereleri kapatır ve bekleyen son düzenlemeleri gönderir. Bot henüz açıkken, Application
+        durdurulduktan sonra (post_stop) çağrılmalıdır; post_shutdown'da Bot API isteği kapanmıştır.
+        """
+        tasks = list(self._windows.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._windows.clear()
+        pending, self._pending = self._pending, {}
+        for render in pending.values():
+            await self._send(render)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from http import HTTPStatus
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024 # Telegram güncellemeleri bunun çok altında kalır
+MAX_HEADER_LINES = 100
+HTTP_READ_TIMEOUT = 10 # Başlamış bir isteğin (başlıklar ve gövde) tamamının gelmesi için en uzun süre (saniye)
+HTTP_IDLE_TIMEOUT = 60 # Keep-alive bağlantısında yeni istek beklenen en uzun süre; aşılırsa bağlantı kapatılır
+
+class HTTPRequest(NamedTuple):
+    """Gelen bir HTTP isteğinin ayrıştırılmış hali; başlık adları küçük harflidir."""
+    method: str
+    path: str
+    headers: dict
+    body: bytes
+
+class HTTPResponse(NamedTuple):
+    status: int
+    body: bytes = b''
+    content_type: str = 'text/plain; charset=utf-8'
+
+class RequestTimeout(Exception):
+    """İstek başladı ama HTTP_READ_TIMEOUT içinde tamamlanmadı."""
+
+async def _read_rest(reader: asyncio.StreamReader, request_line: bytes) -> HTTPRequest:
+    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    for _ in range(MAX_HEADER_LINES + 1):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ValueError("Çok fazla başlık")
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_SIZE:
+        raise ValueError("İstek gövdesi çok büyük")
+    body = await reader.readexactly(length) if length else b''
+    return HTTPRequest(method, target.split('?', 1)[0], headers, body)
+
+async def _read_request(reader: asyncio.StreamReader):
+    """
+    Sıradaki isteği okur. Bağlantı kapandıysa ya da HTTP_IDLE_TIMEOUT içinde yeni istek başlamadıysa
+    None döndürür; başlayan istek HTTP_READ_TIMEOUT içinde tamamlanmazsa RequestTimeout yükseltir. Böylece
+    isteğin yarısını gönderip bekleyen istemciler bağlantıyı ve görevini süresiz tutamaz.
+    """
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), HTTP_IDLE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None
+    if not request_line:
+        return None
+    try:
+        return await asyncio.wait_for(_read_rest(reader, request_line), HTTP_READ_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise RequestTimeout() from None
+
+def _encode_response(response: HTTPResponse, keep_alive: bool) -> bytes:
+    reason = HTTPStatus(response.status).phrase
+    head = (
+        f"HTTP/1.1 {response.status} {reason}\r\n"
+        f"Content-Type: {response.content_type}\r\n"
+        f"Content-Length: {len(response.body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + response.body
+
+async def start_http_server(handler, host: str, port: int) -> asyncio.Server:
+    """
+    Bot içinde çalışan, bağımlılıksız küçük bir HTTP/1.1 sunucusu başlatır.
+    handler(HTTPRequest) -> HTTPResponse bir coroutine olmalıdır. Keep-alive bağlantıları desteklenir;
+    HTTP_IDLE_TIMEOUT boyunca yeni istek gelmeyen bağlantı kapatılır.
+    """
+    async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    writer.write(_encode_response(HTTPResponse(HTTPStatus.BAD_REQUEST), keep_alive=False))
+                    break
+                except RequestTimeout:
+                    writer.write(_encode_response(HTTPResponse(HTTPStatus.REQUEST_TIMEOUT), keep_alive=False))
+                    break
+                if request is None:
+                    break
+                try:
+                    response = await handler(request)
+                except Exception as e:
+                    logger.error(f"HTTP isteği işlenemedi ({request.method} {request.path}): {e}", exc_info=True)
+                    response = HTTPResponse(HTTPStatus.INTERNAL_SERVER_ERROR)
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+                writer.write(_encode_response(response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_serve, host, port)
@@ -0,0 +1,80 @@
+import asyncio
+import hashlib
+import logging
+import os
+
+from telegram.error import BadRequest
+
+logger = logging.getLogger(__name__)
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+class TelegramFileCache:
+    """
+    Resimli sorular için Telegram file_id önbelleği.
+    Bir resim ilk gönderildiğinde Telegram'ın döndürdüğü file_id, resmin yolu ve içerik özeti ile
+    'telegram_files' tablosuna yazılır; sonraki gönderimlerde dosya yeniden yüklenmez, yalnızca
+    file_id gönderilir. Dosya değişirse içerik özeti de değişeceği için resim bir kez daha yüklenir.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._hashes = {} # image_path -> (mtime_ns, size, content_hash)
+        self._file_ids = {} # (image_path, content_hash) -> file_id
+
+    async def _content_hash(self, image_path: str) -> str:
+        """Dosyanın SHA-256 özetini döndürür; dosya değişmediyse önceki hesabı kullanır."""
+        stat = os.stat(image_path)
+        cached = self._hashes.get(image_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        data = await asyncio.get_running_loop().run_in_executor(None, _read_file, image_path)
+        content_hash = hashlib.sha256(data).hexdigest()
+        self._hashes[image_path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        return content_hash
+
+    async def _lookup(self, key: tuple):
+        file_id = self._file_ids.get(key)
+        if file_id is None:
+            row = await self._db.fetchone(
+                "SELECT file_id FROM telegram_files WHERE image_path = ? AND content_hash = ?", key
+            )
+            if row:
+                file_id = self._file_ids[key] = row[0]
+        return file_id
+
+    async def _remember(self, key: tuple, file_id: str) -> None:
+        self._file_ids[key] = file_id
+        await self._db.execute(
+            "INSERT OR REPLACE INTO telegram_files (image_path, content_hash, file_id) VALUES (?, ?, ?)",
+            (*key, file_id)
+        )
+
+    async def _forget(self, key: tuple) -> None:
+        self._file_ids.pop(key, None)
+        await self._db.execute("DELETE FROM telegram_files WHERE image_path = ? AND content_hash = ?", key)
+
+    async def send_photo(self, bot, chat_id: int, image_path: str, **kwargs):
+        """
+        Resmi gönderir; önbellekte file_id varsa onu kullanır, yoksa dosyayı yükleyip
+        dönen file_id'yi kaydeder. Gönderilen Message nesnesini döndürür.
+        """
+        key = (image_path, await self._content_hash(image_path))
+        file_id = await self._lookup(key)
+        if file_id:
+            try:
+                return await bot.send_photo(chat_id=chat_id, photo=file_id, **kwargs)
+            except BadRequest as e:
+                # file_id geçersizleşmişse (ör. farklı bir bot token'ı) kaydı silip yeniden yükle
+                logger.warning(f"Önbellekteki file_id kullanılamadı ({image_path}): {e}. Resim yeniden yükleniyor.")
+                await self._forget(key)
+
+        data = await asyncio.get_running_loop().run_in_executor(None, _read_file, image_path)
+        message = await bot.send_photo(chat_id=chat_id, photo=data, **kwargs)
+        if message and message.photo:
+            # En büyük boyut listenin sonundadır
+            await self._remember(key, message.photo[-1].file_id)
+            logger.info(f"Resim yüklendi ve file_id önbelleğe alındı: {image_path}")
+        return message
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from quiz_session import option_bit
+
+# --- Klavye Önbelleği Ayarları ---
+KEYBOARD_CACHE_SIZE = 4096 # Bellekte tutulacak en fazla (soru, seçim) klavye varyantı
+
+SUBMIT_BUTTON = InlineKeyboardButton("Cevabı Onayla", callback_data="submit_answer")
+
+def option_letter(option_text: str) -> str:
+    """Şık metninden harfi ayırır (örn: "A) Manastır" -> "A")."""
+    return option_text.split(')')[0].strip()
+
+class QuestionKeyboards:
+    """
+    Soru klavyelerinin ve seçim başlıklarının önbelleği.
+    Her sorunun şık harfleri ve başlık parçaları ilk kullanımda bir kez hazırlanır; seçim
+    durumuna (bit maskesi) göre ✅ işaretli klavyeler ise gerektikçe üretilip sınırlı bir LRU'da
+    tutulur. InlineKeyboardMarkup değiştirilemez olduğu için aynı nesne tüm kullanıcılarca paylaşılır.
+    Önbellek yalnızca olay döngüsünden kullanılır.
+    """
+
+    def __init__(self, size: int = KEYBOARD_CACHE_SIZE):
+        self._size = size
+        self._layouts = {} # question_id -> (şıklar, harfler, başlık başı, başlık sonu)
+        self._markups = OrderedDict() # (question_id, maske) -> InlineKeyboardMarkup
+        self._labels = {} # maske -> "A, C"
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Soru bankası yeniden yüklendiğinde tüm önbelleği boşaltır."""
+        self._layouts.clear()
+        self._markups.clear()
+
+    def _layout(self, question) -> tuple:
+        layout = self._layouts.get(question.id)
+        if layout is None:
+            letters = tuple(option_letter(option) for option in question.options)
+            layout = (
+                question.options, letters,
+                f"**{question.sinav_turu} Sınavı - Soru ",
+                f":**\n{question.text}\n\nSeçilen: *",
+            )
+            self._layouts[question.id] = layout
+        return layout
+
+    def markup(self, question, selected: int = 0) -> InlineKeyboardMarkup:
+        """Sorunun, 'selected' maskesindeki şıkları ✅ ile işaretlenmiş klavyesi."""
+        key = (question.id, selected)
+        markup = self._markups.get(key)
+        if markup is not None:
+            self._markups.move_to_end(key)
+            self.hits += 1
+            return markup
+
+        self.misses += 1
+        options, letters, _, _ = self._layout(question)
+        rows = []
+        for option_text, letter in zip(options, letters):
+            button_text = "✅ " + option_text if selected & option_bit(letter) else option_text
+            rows.append([InlineKeyboardButton(button_text, callback_data=f"select_option_{letter}")])
+        rows.append([SUBMIT_BUTTON])
+        markup = InlineKeyboardMarkup(rows)
+        self._markups[key] = markup
+        if len(self._markups) > self._size:
+            self._markups.popitem(last=False)
+        return markup
+
+    def selection_caption(self, question, question_no: int, quiz_length: int, selected: int) -> str:
+        """Şık seçimi sonrası düzenlenen mesajın başlığı."""
+        _, _, head, tail = self._layout(question)
+        label = self._labels.get(selected)
+        if label is None:
+            label = ", ".join(chr(ord('A') + bit) for bit in range(selected.bit_length()) if selected >> bit & 1) or "Hiçbiri"
+            self._labels[selected] = label
+        return f"{head}{question_no}/{quiz_length}{tail}{label}*"
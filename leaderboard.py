@@ -0,0 +1,71 @@
+import asyncio
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# --- Lider Tablosu Ayarları ---
+LEADERBOARD_SIZE = 10 # /liderler komutunda gösterilen kullanıcı sayısı
+LEADERBOARD_RECONCILE_INTERVAL = 300 # Bellekteki tablonun 'user_stats' ile kaç saniyede bir eşitleneceği
+
+TOP_USERS_SQL = """
+    SELECT user_id, answered, correct FROM user_stats
+    WHERE correct > 0
+    ORDER BY correct DESC, answered ASC, user_id ASC
+    LIMIT ?
+"""
+
+class Leaderboard:
+    """
+    En iyi K kullanıcının bellekte sıralı tutulan kopyası; kalıcı kaynağı 'user_stats' tablosudur.
+    Cevap kaydı her commit'ten sonra etkilenen kullanıcıların güncel toplamlarını update() ile
+    bildirir. Toplamlar yalnızca artar, bu yüzden ilk K her zaman doğrudur; bir kullanıcının
+    geçmişi silindiğinde boşalan yer bir sonraki okumada tablodan yeniden doldurulur.
+    """
+
+    def __init__(self, size: int = LEADERBOARD_SIZE):
+        self._size = size
+        self._lock = threading.Lock()
+        self._ranking = [] # (-correct, answered, user_id) anahtarları, sıralı
+        self._keys = {} # user_id -> anahtar
+        self.needs_reload = True
+
+    def load(self, conn) -> None:
+        """İlk K kullanıcıyı 'user_stats' tablosundan yeniden yükler."""
+        rows = conn.execute(TOP_USERS_SQL, (self._size,)).fetchall()
+        with self._lock:
+            self._ranking = [(-correct, answered, user_id) for user_id, answered, correct in rows]
+            self._keys = {key[2]: key for key in self._ranking}
+            self.needs_reload = False
+
+    def update(self, totals) -> None:
+        """(user_id, answered, correct) biçimindeki güncel toplamları sıralamaya işler."""
+        with self._lock:
+            for user_id, answered, correct in totals:
+                old_key = self._keys.pop(user_id, None)
+                if old_key is not None:
+                    del self._ranking[bisect.bisect_left(self._ranking, old_key)]
+                if correct > 0:
+                    key = (-correct, answered, user_id)
+                    bisect.insort(self._ranking, key)
+                    self._keys[user_id] = key
+                elif old_key is not None:
+                    # Listeden biri düştü; yerine gelecek kullanıcı yalnızca tabloda bilinir
+                    self.needs_reload = True
+                if len(self._ranking) > self._size:
+                    del self._keys[self._ranking.pop()[2]]
+
+    def top(self) -> list:
+        """Sıralamayı (user_id, correct, answered) listesi olarak döndürür."""
+        with self._lock:
+            return [(user_id, -neg_correct, answered) for neg_correct, answered, user_id in self._ranking]
+
+    async def reconcile_forever(self, db, interval: float = LEADERBOARD_RECONCILE_INTERVAL) -> None:
+        """Bellekteki sıralamayı düzenli aralıklarla tabloyla eşitler."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await db.run(self.load)
+            except Exception as e:
+                logger.error(f"Lider tablosu eşitlenemedi: {e}", exc_info=True)
@@ -1,12 +1,31 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler
+from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler, TypeHandler
 from telegram.error import BadRequest
+from telegram.request import HTTPXRequest
 import logging
-import sqlite3
-import json
 import time
 import os
 import string 
+import asyncio
+from database import Database, get_db_connection
+from migrations import migrate
+from question_bank import QuestionBank, answer_mask, answer_text
+from image_cache import TelegramFileCache
+from answer_log import AnswerLogWriter, aggregate_stats
+from user_cache import UserCache
+from leaderboard import Leaderboard, LEADERBOARD_RECONCILE_INTERVAL
+from quiz_session import QuizSession, SessionSweeper, SESSION_KEY
+from question_selector import AdaptiveSelector, HISTORY_SQL
+from review_pages import WrongAnswerPages, encode_cursor, decode_cursor
+from quiz_archive import archive_forever
+from persistence import SQLitePersistence
+from keyboards import QuestionKeyboards
+from edit_coalescer import EditCoalescer
+from send_scheduler import SendScheduler, PRIORITY_BULK, GLOBAL_RATE
+from update_processor import PerUserUpdateProcessor
+from webhook import run_webhook
+from workers import run_sharded
+import metrics
 
 # --- Temel Yapılandırma ---
 
@@ -23,114 +42,135 @@ TOKEN = '7637232124:AAFEttWDFijHYXbNdp4ZZGbxfQ3I85pY-xE'
 # ÖNEMLİ: Geri bildirim almak için kendi Telegram Kullanıcı ID'niz ile değiştirin.
 FEEDBACK_ADMIN_ID = 946918816 
 
+# --- Güncelleme Alma (Transport) Ayarları ---
+TRANSPORT_MODE = 'polling' # 'polling' (uzun yoklama) veya 'webhook' (gömülü HTTP sunucusu)
+WEBHOOK_URL = '' # Telegram'ın erişebildiği genel adres, ör. 'https://ornek.com'. Boşsa setWebhook yapılmaz (yerel test).
+WEBHOOK_LISTEN = '127.0.0.1' # Sunucunun dinleyeceği adres (genelde bir ters vekil sunucunun arkasında)
+WEBHOOK_PORT = 8443
+WEBHOOK_PATH = '/telegram'
+# ÖNEMLİ: Webhook isteklerini doğrulamak için tahmin edilemez bir değerle değiştirin!
+WEBHOOK_SECRET_TOKEN = 'degistir-beni'
+
+# İşleyicilerin gerçekten kullandığı güncelleme türleri; diğerleri Telegram'dan hiç istenmez.
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+# --- Çok Süreçli Çalışma Ayarları ---
+# 1'den büyükse bir ön dağıtıcı güncellemeleri kullanıcı ID'sine göre bu kadar işçi sürece dağıtır (workers.py).
+WORKER_COUNT = 1
+SHARDED_LEADERBOARD_RECONCILE_INTERVAL = 30 # İşçi modunda diğer işçilerin toplamları lider tablosuna en geç bu kadar saniyede yansır
+
+# --- Ölçüm (Metrics) Ayarları ---
+# İşleyici, SQL ve Bot API ölçümleri http://METRICS_LISTEN:METRICS_PORT/metrics adresinde Prometheus
+# biçiminde sunulur. METRICS_PORT = 0 uç noktayı kapatır; ölçümler /metrikler komutuyla yine okunabilir.
+METRICS_LISTEN = '127.0.0.1'
+METRICS_PORT = 9100
+
 # --- Quiz Ayarları ---
 QUIZ_LENGTH = 10 # Bir quiz oturumunun kaç sorudan oluşacağı
 
 # --- Veritabanı Yardımcı Fonksiyonları ---
 
-def get_db_connection():
-    """SQLite veritabanına bir bağlantı döndürür."""
-    return sqlite3.connect('art_history_quiz.db')
+# Tüm işleyiciler veritabanına bu havuz üzerinden erişir; sorgular olay döngüsünü bloklamaz.
+db = Database()
+
+# Soru tablosunun bellekteki kopyası; bot başlarken post_init içinde yüklenir.
+question_bank = QuestionBank()
+
+# Resimli soruların Telegram file_id önbelleği; her resim bot başına bir kez yüklenir.
+telegram_files = TelegramFileCache(db)
+
+# Lider tablosu bellekte tutulur ve cevap kaydı her commit'ten sonra onu günceller.
+leaderboard = Leaderboard()
+leaderboard_reconcile_interval = LEADERBOARD_RECONCILE_INTERVAL
+
+# Eski quizler bu süreçte arşivlenir mi (işçi modunda yalnızca ilk işçi arşivler)
+run_archiver = True
+
+# Cevaplar bellekte biriktirilip toplu halde yazılır; kapanışta kalanlar diske aktarılır.
+answer_log = AnswerLogWriter(db, on_stats_changed=leaderboard.update)
+
+# Kullanıcı adları gelen güncellemelerden öğrenilir; soru akışı get_chat çağırmaz.
+user_cache = UserCache(db)
+
+# Sıradaki soru, kullanıcının yanlışlarına ve görmediği sorulara öncelik veren indeksten seçilir.
+question_selector = AdaptiveSelector(question_bank)
+
+# /yanlislarim sayfaları keyset ile okunur; kullanıcının baktığı sayfa detaydan dönüş için önbellekte durur.
+wrong_answer_pages = WrongAnswerPages(answer_log)
+
+# Soru klavyeleri ve seçim başlıkları bir kez üretilip önbellekte paylaşılır.
+question_keyboards = QuestionKeyboards()
+
+# Hızlı şık tıklamaları mesaj başına tek bir düzenlemede birleştirilir.
+edit_coalescer = EditCoalescer()
+
+# Giden mesajlar Telegram'ın genel ve sohbet başına hız sınırlarına göre sıraya alınır; None sınırlamayı kapatır.
+send_scheduler = SendScheduler()
+
+def bulk_send_args() -> dict:
+    """Toplu mesajlar için gönderim önceliği; PTB, hız sınırlayıcı yokken rate_limit_args'ı kabul etmez."""
+    return {'rate_limit_args': PRIORITY_BULK} if send_scheduler is not None else {}
+
+# Quiz oturumları context.user_data[SESSION_KEY] içinde QuizSession olarak tutulur; boşta kalanlar atılır.
+session_sweeper = SessionSweeper()
 
 def setup_database_on_startup():
     """
-    Bot başladığında kullanıcı verilerini tutan tabloların mevcut olmasını sağlar.
-    'questions' tablosu artık seed_db.py tarafından yönetilmektedir.
+    Bot başladığında veritabanı şemasını migrations.py'deki son sürüme getirir.
+    'questions' tablosunun içeriği question_importer.py (ve seed_db.py) tarafından yönetilmektedir.
     """
     conn = get_db_connection()
-    cursor = conn.cursor()
-    # users tablosu: Kullanıcı bilgilerini ve mevcut durumlarını saklar.
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            username TEXT,
-            current_question_id INTEGER,
-            state TEXT,
-            FOREIGN KEY (current_question_id) REFERENCES questions(id)
-        )
-    ''')
-    # user_answers tablosu: İstatistikler için her cevabı kaydeder.
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_answers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            question_id INTEGER NOT NULL,
-            user_answer TEXT,
-            is_correct BOOLEAN NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            answer_time_seconds INTEGER,
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (question_id) REFERENCES questions(id)
-        )
-    ''')
-    conn.commit()
+    version = migrate(conn)
     conn.close()
-    logger.info("Veritabanı tabloları doğrulandı veya oluşturuldu.")
+    logger.info(f"Veritabanı şeması doğrulandı (sürüm {version}).")
 
 # --- Durum Yönetimi & Ana Mantık ---
 
 async def update_user_state_and_question(context: ContextTypes.DEFAULT_TYPE, user_id: int, state: str, question_id: int = None, username: str = None) -> None:
     """Kullanıcının durumunu ve mevcut soru ID'sini veritabanında günceller."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     if username is None:
-        try:
-            chat_info = await context.bot.get_chat(user_id)
-            username = chat_info.username if chat_info.username else f"id_{user_id}"
-        except Exception as e:
-            logger.error(f"Kullanıcı ID'si için kullanıcı adı alınamadı: {user_id}. Hata: {e}", exc_info=True)
-            username = f"id_{user_id}"
+        username = await user_cache.username(context.bot, user_id)
             
-    cursor.execute("INSERT OR REPLACE INTO users (id, username, state, current_question_id) VALUES (?, ?, ?, ?)",
-                   (user_id, username, state, question_id))
-    conn.commit()
-    conn.close()
+    await db.execute("INSERT OR REPLACE INTO users (id, username, state, current_question_id) VALUES (?, ?, ?, ?)",
+                     (user_id, username, state, question_id))
     logger.debug(f"Kullanıcı {user_id} veritabanı durumu '{state}', Soru ID: {question_id} olarak güncellendi.")
 
-async def check_answer(question_id: int, user_answer: str, user_id: int, start_time: float) -> tuple[bool, str]:
-    """Kullanıcının cevabını doğru olanla karşılaştırır ve veritabanına kaydeder."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    # correct_answer artık şık metni olarak saklanıyor
-    cursor.execute("SELECT correct_answer, explanation FROM questions WHERE id = ?", (question_id,))
-    question_info = cursor.fetchone()
+async def check_answer(question_id: int, selected: int, user_id: int, start_time: float, session_id: int = None) -> tuple[bool, str]:
+    """Kullanıcının seçtiği şıkların bit maskesini doğru cevabın maskesiyle karşılaştırır ve cevap kaydına ekler."""
+    question = question_bank.get(question_id)
 
-    if not question_info:
+    if not question:
         logger.error(f"check_answer: ID'si {question_id} olan soru veritabanında bulunamadı.")
-        conn.close()
         return False, "Bu soru veritabanında bulunamadı."
 
-    correct_answer_text_db, explanation = question_info
-    
-    # Çoklu doğru cevapları ve kullanıcının cevaplarını setlere dönüştürerek karşılaştır
-    # Sıra önemli olmadığı için set kullanmak daha güvenli
-    correct_answers_set = set(correct_answer_text_db.split(','))
-    user_answers_set = set(user_answer.split(',')) # user_answer zaten metin olarak gelecek
-
-    is_correct = (user_answers_set == correct_answers_set)
+    explanation = question.explanation
+    # Çoklu doğru cevaplarda da sıra önemsizdir; iki maske aynıysa seçim tam olarak doğrudur
+    is_correct = selected == question.correct_mask
+    question_selector.record(user_id, question_id, is_correct)
+    if not is_correct:
+        wrong_answer_pages.invalidate(user_id)
     answer_time_seconds = int(time.time() - start_time) if start_time else None
+    # Cevap kaydı (ve /yanlislarim) şık metinlerini gösterir; metin yalnızca burada üretilir
+    user_answer = answer_text(question.options, selected)
 
     try:
-        cursor.execute(
-            "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, answer_time_seconds) VALUES (?, ?, ?, ?, ?)",
-            (user_id, question_id, user_answer, is_correct, answer_time_seconds)
-        )
-        conn.commit()
-        logger.debug(f"Kullanıcı {user_id} Soru {question_id} için cevabı ('{user_answer}') {'doğru' if is_correct else 'yanlış'} idi. Veritabanına kaydedildi.")
+        await answer_log.record(user_id, question_id, user_answer, is_correct, answer_time_seconds, question.sinav_turu, session_id)
+        logger.debug(f"Kullanıcı {user_id} Soru {question_id} için cevabı ('{user_answer}') {'doğru' if is_correct else 'yanlış'} idi. Cevap kaydına eklendi.")
     except Exception as e:
         logger.error(f"Kullanıcı {user_id} için cevap veritabanına kaydedilemedi: {e}", exc_info=True)
-    finally:
-        conn.close()
 
     return is_correct, explanation
 
 # --- Komut İşleyicileri ---
 
+async def remember_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Her güncellemede gönderenin kullanıcı adını önbelleğe alır."""
+    await user_cache.remember(update.effective_user)
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Kullanıcı /start komutunu gönderdiğinde sınav seçimi menüsünü gösterir."""
     user = update.effective_user
-    await update_user_state_and_question(context, user.id, 'main_menu', username=user.username)
+    await update_user_state_and_question(context, user.id, 'main_menu')
 
     keyboard = [
         [InlineKeyboardButton("Vize Sınavı", callback_data="start_quiz_Vize")],
@@ -144,61 +184,52 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         reply_markup=reply_markup
     )
 
+async def load_selection_index(user_id: int) -> None:
+    """Kullanıcının seçim indeksi bellekte yoksa, tablodaki ve henüz yazılmamış cevaplarından kurar."""
+    if question_selector.is_loaded(user_id):
+        return
+    history, pending = await answer_log.read_for_user(user_id, lambda conn: conn.execute(HISTORY_SQL, (user_id,)).fetchall())
+    question_selector.load(user_id, history + [(row.question_id, row.is_correct) for row in pending])
+
 async def ask_question(user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Kullanıcının seçtiği sınav türüne göre rastgele bir soru gönderir."""
+    """Kullanıcıya uyarlanan seçim indeksinden sıradaki soruyu seçip gönderir."""
     logger.info(f"ask_question fonksiyonu kullanıcı {user_id} için çağrıldı. (Başlangıç)")
 
-    if user_id not in context.user_data:
-        context.user_data[user_id] = {}
-
-    # Kullanıcının hangi sınavı seçtiğini kontrol et
-    sinav_turu = context.user_data[user_id].get('sinav_turu')
-    if not sinav_turu:
-        logger.warning(f"Kullanıcı {user_id} için sınav türü bulunamadı, /start komutuna yönlendiriliyor.")
+    # Kullanıcının devam eden bir quizi (ve seçtiği sınav türü) olup olmadığını kontrol et
+    session = context.user_data.get(SESSION_KEY)
+    if session is None:
+        logger.warning(f"Kullanıcı {user_id} için quiz oturumu bulunamadı, /start komutuna yönlendiriliyor.")
         await context.bot.send_message(chat_id=chat_id, text="Lütfen önce bir sınav türü seçmek için /start komutunu kullanın.")
         return
+    sinav_turu = session.sinav_turu
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    # Sadece seçilen sınav türüne ait soruları getir
-    cursor.execute("SELECT id, text, image_path, options FROM questions WHERE sinav_turu = ? ORDER BY RANDOM() LIMIT 1", (sinav_turu,))
-    question_data = cursor.fetchone()
-    conn.close()
+    # Sıradaki soru seçim indeksinden gelir (bu quizde sorulanlar hariç). İndeks yalnızca quiz başında
+    # değil, geri yüklenen bir quizde veya kullanıcı önbellekten atıldıysa da geçmişten kurulur
+    await load_selection_index(user_id)
+    question_id = session.next_question_id(lambda asked: question_selector.next_question(user_id, sinav_turu, asked))
+    question = question_bank.get(question_id) if question_id is not None else None
 
-    if not question_data:
-        logger.warning(f"Kullanıcı {user_id} için '{sinav_turu}' türünde soru bulunamadı. Quiz durduruluyor.")
-        await context.bot.send_message(chat_id=chat_id, text=f"Üzgünüm, '{sinav_turu}' sınavı için şu anda mevcut bir soru yok. Quiz tamamlandı.")
-        # Eğer soru kalmadıysa, quiz'i tamamla ve özeti göster
-        context.user_data[user_id]['current_quiz_questions_answered'] = QUIZ_LENGTH # Quiz'i bitirmek için sayıyı QUIZ_LENGTH'e eşitle
-        # show_quiz_summary Update objesi beklediği için, burada doğrudan çağrılmıyor.
-        # Akış, quiz_summary'nin çağrıldığı yerden (submit_answer) devam edecek.
-        # Bu durumda, kullanıcının quiz'i bitmiş sayılır ve yeni bir başlangıç yapması gerekir.
+    if not question:
+        logger.warning(f"Kullanıcı {user_id} için '{sinav_turu}' destesinde soru kalmadı. Quiz durduruluyor.")
+        await context.bot.send_message(chat_id=chat_id, text=f"Üzgünüm, '{sinav_turu}' sınavı için sorulacak soru kalmadı. Yeni bir quiz için /start yaz.")
         return
 
-    question_id, question_text, image_path, options_json = question_data
+    question_id, question_text, image_path = question.id, question.text, question.image_path
     logger.info(f"Kullanıcı {user_id} için Soru ID {question_id} başarıyla çekildi.")
-    options = json.loads(options_json) if options_json else []
 
     await update_user_state_and_question(context, user_id, 'waiting_for_answer', question_id)
 
-    keyboard = []
-    for option_text in options:
-        # Şık metninden harfi ayırıyoruz (örn: "A) Manastır" -> "A")
-        option_letter = option_text.split(')')[0].strip()
-        keyboard.append([InlineKeyboardButton(option_text, callback_data=f"select_option_{option_letter}")])
-    
-    keyboard.append([InlineKeyboardButton("Cevabı Onayla", callback_data="submit_answer")])
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = question_keyboards.markup(question)
 
-    current_q_count = context.user_data[user_id].get('current_quiz_questions_answered', 0) + 1
-    question_display_text = f"**Soru {current_q_count}/{QUIZ_LENGTH}:**\n" + question_text
+    current_q_count = session.answered + 1
+    question_display_text = f"**Soru {current_q_count}/{session.quiz_length}:**\n" + question_text
 
     sent_message = None
     try:
         if image_path and os.path.exists(image_path):
             logger.info(f"Kullanıcı {user_id} için resimli soru gönderiliyor. Soru ID: {question_id}")
-            sent_message = await context.bot.send_photo(
-                chat_id=chat_id, photo=open(image_path, 'rb'), caption=question_display_text,
+            sent_message = await telegram_files.send_photo(
+                context.bot, chat_id, image_path, caption=question_display_text,
                 reply_markup=reply_markup, parse_mode='Markdown'
             )
         else:
@@ -215,7 +246,7 @@ async def ask_question(user_id: int, chat_id: int, context: ContextTypes.DEFAULT
         return
 
     if sent_message:
-        context.user_data[user_id]['last_question_message_id'] = sent_message.message_id
+        session.message_id = sent_message.message_id
         logger.info(f"Soru ID {question_id}, kullanıcı {user_id}'e gönderildi. Mesaj ID: {sent_message.message_id}")
 
 async def soru_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -240,24 +271,27 @@ async def select_quiz_type(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     chat_id = query.message.chat.id # chat_id'yi buradan al
     sinav_turu = query.data.split('_')[2] # "start_quiz_Vize" -> "Vize"
 
-    await query.edit_message_text(f"Harika! **{sinav_turu} Sınavı** başlatılıyor...")
+    # Quiz, sınavdaki soru sayısını aşmayacak uzunlukta olur; sorular ilerledikçe seçilir
+    quiz_length = min(QUIZ_LENGTH, len(question_bank.ids_for_exam(sinav_turu)))
+    if not quiz_length:
+        logger.warning(f"Kullanıcı {user_id} için '{sinav_turu}' türünde soru bulunamadı. Quiz başlatılmadı.")
+        await query.edit_message_text(f"Üzgünüm, '{sinav_turu}' sınavı için şu anda mevcut bir soru yok.")
+        return
+
+    start_text = f"Harika! **{sinav_turu} Sınavı** başlatılıyor..."
+    if quiz_length < QUIZ_LENGTH:
+        start_text += f"\nBu sınavda şimdilik yalnızca {quiz_length} soru var."
+    await query.edit_message_text(start_text)
 
-    # Kullanıcıya ait geçmiş cevapları sıfırla
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM user_answers WHERE user_id = ?", (user_id,))
-    conn.commit()
-    conn.close()
-    logger.info(f"Kullanıcı {user_id} için geçmiş cevaplar sıfırlandı.")
-
-    # Quiz için kullanıcı verilerini sıfırla ve sınav türünü kaydet
-    context.user_data[user_id] = {
-        'sinav_turu': sinav_turu,
-        'current_quiz_questions_answered': 0,
-        'current_quiz_correct_answers': 0,
-        'current_quiz_start_time': time.time(),
-        'start_time': time.time()
-    }
+    # Geçmiş cevaplar silinmez; quiz 'quiz_sessions' tablosuna tek satır olarak eklenir ve
+    # bu quizin cevapları onun ID'siyle kaydedilir
+    session_id = await db.insert(
+        "INSERT INTO quiz_sessions (user_id, sinav_turu, quiz_length) VALUES (?, ?, ?)", (user_id, sinav_turu, quiz_length)
+    )
+    logger.info(f"Kullanıcı {user_id} için {session_id} numaralı quiz başlatıldı.")
+
+    # Yeni quiz oturumunu başlat (önceki oturum varsa yerini alır)
+    context.user_data[SESSION_KEY] = QuizSession(sinav_turu, (), length=quiz_length, session_id=session_id)
     
     # İlk soruyu sor
     await ask_question(user_id, chat_id, context) # ask_question'ı yeni parametrelerle çağır
@@ -301,11 +335,31 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
         )
         return
 
-    if data == "review_wrong_answers" or data == "review_wrong_answers_list":
-        if query.message:
-            await query.edit_message_text("Yanlış cevapların getiriliyor...", reply_markup=None)
+    if data == "review_wrong_answers":
         await review_wrong_answers(update, context)
         return
+
+    if data == "review_wrong_answers_list":
+        # Detaydan dönüşte kullanıcının baktığı sayfa önbellekten gösterilir (veritabanına gidilmez)
+        await review_wrong_answers(update, context, wrong_answer_pages.current(user_id))
+        return
+
+    if data.startswith("review_quiz_wrong_"):
+        # Quiz özetinden: yalnızca o quizin yanlışları
+        page = await wrong_answer_pages.newest(user_id, int(data[len("review_quiz_wrong_"):]))
+        await review_wrong_answers(update, context, page)
+        return
+
+    if data.startswith(("review_wrong_older_", "review_wrong_newer_")):
+        # "review_wrong_older_<quiz ID veya 0>_<imleç>"
+        scope, cursor = data[len("review_wrong_older_"):].split('_', 1)
+        session_id = int(scope) or None
+        if data.startswith("review_wrong_older_"):
+            page = await wrong_answer_pages.older(user_id, decode_cursor(cursor), session_id)
+        else:
+            page = await wrong_answer_pages.newer(user_id, decode_cursor(cursor), session_id)
+        await review_wrong_answers(update, context, page)
+        return
         
     if data.startswith("review_wrong_detail_"):
         await handle_wrong_question_review_detail(update, context)
@@ -316,14 +370,16 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
         return
 
     # --- Ana Quiz Cevaplama Mantığı ---
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT current_question_id, state FROM users WHERE id = ?", (user_id,))
-    user_db_info = cursor.fetchone()
-    conn.close()
-
-    # Kullanıcının durumu 'waiting_for_answer' değilse veya soru ID'si yoksa
-    if not user_db_info or user_db_info[1] != 'waiting_for_answer' or user_db_info[0] is None:
+    user_db_info = await db.fetchone("SELECT current_question_id, state FROM users WHERE id = ?", (user_id,))
+    session = context.user_data.get(SESSION_KEY)
+    if session is None and context.application.persistence is not None:
+        # Boşta kaldığı için bellekten atılan oturum kayıtlı satırından geri yüklenir
+        session = await context.application.persistence.load_session(user_id)
+        if session is not None:
+            context.user_data[SESSION_KEY] = session
+
+    # Kullanıcının durumu 'waiting_for_answer' değilse, soru ID'si yoksa veya oturum bitmiş ya da terk edildiyse
+    if session is None or not user_db_info or user_db_info[1] != 'waiting_for_answer' or user_db_info[0] is None:
         logger.warning(f"Kullanıcı {user_id} bir quiz butonuna tıkladı ama 'waiting_for_answer' durumunda değil. Data: {data}")
         
         # Kullanıcının tıkladığı mesajı silmeye çalış (eğer hala varsa)
@@ -343,91 +399,53 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
         return
 
     question_id = user_db_info[0]
+    session.touch()
 
     # Seçenek seçimi
     if data.startswith("select_option_"):
         selected_option_letter = data.split('_')[2]
-        selected_options = context.user_data[user_id].setdefault("selected_options", [])
-        
         # Tüm sorular çoktan seçmeli olduğu için tekli/çoklu seçim ayrımı kaldırıldı
-        if selected_option_letter in selected_options:
-            selected_options.remove(selected_option_letter)
-        else:
-            selected_options.append(selected_option_letter)
+        session.toggle(selected_option_letter)
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT text, options, sinav_turu FROM questions WHERE id = ?", (question_id,))
-        q_text, q_options_json, sinav_turu = cursor.fetchone()
-        conn.close()
-        original_options_with_letters = json.loads(q_options_json) # Şıklar A) B) C) formatında
-
-        updated_keyboard = []
-        for opt_text in original_options_with_letters:
-            opt_letter = opt_text.split(')')[0].strip()
-            btn_text = "✅ " + opt_text if opt_letter in selected_options else opt_text
-            updated_keyboard.append([InlineKeyboardButton(btn_text, callback_data=f"select_option_{opt_letter}")])
-        
-        updated_keyboard.append([InlineKeyboardButton("Cevabı Onayla", callback_data="submit_answer")])
-        
-        current_q_count = context.user_data[user_id].get('current_quiz_questions_answered', 0) + 1
-        q_text_edit = f"**{sinav_turu} Sınavı - Soru {current_q_count}/{QUIZ_LENGTH}:**\n{q_text}"
-        selected_str = ", ".join(sorted(selected_options)) or "Hiçbiri" # Burada hala harfleri gösteriyoruz
-        full_caption = f"{q_text_edit}\n\nSeçilen: *{selected_str}*"
-
-        try:
-            last_message_id = context.user_data[user_id].get('last_question_message_id')
-            if query.message.photo:
-                await context.bot.edit_message_caption(chat_id=user_id, message_id=last_message_id, caption=full_caption, reply_markup=InlineKeyboardMarkup(updated_keyboard), parse_mode='Markdown')
-            else:
-                await context.bot.edit_message_text(chat_id=user_id, message_id=last_message_id, text=full_caption, reply_markup=InlineKeyboardMarkup(updated_keyboard), parse_mode='Markdown')
-        except BadRequest as e:
-            if "message is not modified" not in str(e):
-                logger.error(f"Seçenek seçimi sırasında mesaj düzenlenemedi: {e}")
+        question = question_bank.get(question_id)
+        last_message_id = session.message_id
+        is_photo = bool(query.message.photo)
+
+        async def edit_selection():
+            # Klavye ve başlık, gönderim anındaki seçim durumuna göre önbellekten gelir
+            updated_markup = question_keyboards.markup(question, session.selected)
+            full_caption = question_keyboards.selection_caption(question, session.answered + 1, session.quiz_length, session.selected)
+            try:
+                if is_photo:
+                    await context.bot.edit_message_caption(chat_id=user_id, message_id=last_message_id, caption=full_caption, reply_markup=updated_markup, parse_mode='Markdown')
+                else:
+                    await context.bot.edit_message_text(chat_id=user_id, message_id=last_message_id, text=full_caption, reply_markup=updated_markup, parse_mode='Markdown')
+            except BadRequest as e:
+                if "message is not modified" not in str(e):
+                    logger.error(f"Seçenek seçimi sırasında mesaj düzenlenemedi: {e}")
+
+        # Art arda tıklamalarda mesaj pencere başına en fazla bir kez, son seçimle düzenlenir
+        await edit_coalescer.request((user_id, last_message_id), edit_selection)
         return
 
     # Cevap gönderimi
     if data == "submit_answer":
-        user_selected_letters = sorted(context.user_data[user_id].get("selected_options", []))
-        if not user_selected_letters:
+        if not session.selected:
             await query.answer("Lütfen en az bir seçenek belirle.", show_alert=True)
             return
+        # Cevap oturumdaki son seçimle değerlendirilir; bu soru için bekleyen düzenleme artık gereksizdir
+        edit_coalescer.discard((user_id, session.message_id))
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT options FROM questions WHERE id = ?", (question_id,))
-        options_json = cursor.fetchone()[0]
-        conn.close()
-        
-        all_options = json.loads(options_json)
-        
-        # Seçilen harfleri metin karşılıklarına dönüştür
-        user_answer_texts = []
-        for letter in user_selected_letters:
-            for option_full_text in all_options:
-                if option_full_text.startswith(f"{letter})"):
-                    user_answer_texts.append(option_full_text[option_full_text.find(')') + 2:].strip()) 
-                    break
-        
-        user_answer_str = ",".join(user_answer_texts)
-        start_time = context.user_data[user_id].get('start_time')
-        
-        is_correct, explanation = await check_answer(question_id, user_answer_str, user_id, start_time)
-        
-        context.user_data[user_id]['current_quiz_questions_answered'] += 1
-        if is_correct:
-            context.user_data[user_id]['current_quiz_correct_answers'] += 1
+        is_correct, explanation = await check_answer(question_id, session.selected, user_id, session.question_started_at, session.session_id)
 
-        # Kullanıcının seçili seçeneklerini temizle
-        context.user_data[user_id].pop("selected_options", None)
-        # Yeni soru için başlangıç zamanını güncelle
-        context.user_data[user_id]['start_time'] = time.time()
+        # Cevabı say, seçili seçenekleri temizle ve yeni soru için başlangıç zamanını güncelle
+        session.record_answer(is_correct)
 
-        if context.user_data[user_id]['current_quiz_questions_answered'] >= QUIZ_LENGTH:
+        if session.finished:
             logger.info(f"Kullanıcı {user_id} için quiz tamamlandı. Özet gösteriliyor.")
             await show_quiz_summary(update, context) 
         else:
-            logger.info(f"Kullanıcı {user_id} için yeni soru gönderiliyor. Mevcut soru sayısı: {context.user_data[user_id]['current_quiz_questions_answered']}")
+            logger.info(f"Kullanıcı {user_id} için yeni soru gönderiliyor. Mevcut soru sayısı: {session.answered}")
             # Sonraki soruyu sormak için user_id ve chat_id'yi kullan
             await ask_question(user_id, chat_id, context)
         return
@@ -437,15 +455,24 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
 async def show_statistics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Kullanıcının kişisel quiz istatistiklerini gösterir."""
     user_id = update.effective_user.id
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    # Toplamlar cevaplarla birlikte güncellendiği için tek satırlık okumalar yeterlidir
+    stats_rows, pending = await answer_log.read_for_user(
+        user_id,
+        lambda conn: conn.execute(
+            "SELECT NULL, answered, correct, total_time, timed_count FROM user_stats WHERE user_id = ? "
+            "UNION ALL SELECT sinav_turu, answered, correct, total_time, timed_count FROM user_exam_stats WHERE user_id = ?",
+            (user_id, user_id)
+        ).fetchall()
+    )
 
-    cursor.execute("SELECT COUNT(*), SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END), AVG(answer_time_seconds) FROM user_answers WHERE user_id = ?", (user_id,))
-    total, correct, avg_time = cursor.fetchone()
-    conn.close()
+    # Henüz diske yazılmamış cevapları da hesaba kat
+    pending_user, pending_exam = aggregate_stats(pending)
+    totals = {}
+    for sinav_turu, *values in stats_rows + [(None, *row[1:]) for row in pending_user] + [row[1:] for row in pending_exam]:
+        totals[sinav_turu] = [a + b for a, b in zip(totals.get(sinav_turu, (0, 0, 0, 0)), values)]
 
-    total = total or 0
-    correct = correct or 0
+    total, correct, time_sum, timed_count = totals.get(None, (0, 0, 0, 0))
+    avg_time = time_sum / timed_count if timed_count else None
     wrong = total - correct
     accuracy = (correct / total * 100) if total > 0 else 0
     avg_time_str = f"{avg_time:.2f} saniye" if avg_time else "Mevcut Değil"
@@ -458,38 +485,64 @@ async def show_statistics(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         f"🎯 Başarı Oranı: *{accuracy:.2f}%*\n"
         f"⏱️ Ortalama Cevap Süresi: *{avg_time_str}*\n"
     )
+    for sinav_turu in sorted(key for key in totals if key is not None):
+        exam_total, exam_correct = totals[sinav_turu][:2]
+        stats_message += f"\n{sinav_turu}: *{exam_correct}/{exam_total}* doğru"
     await update.message.reply_text(stats_message, parse_mode='Markdown')
 
-async def review_wrong_answers(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Kullanıcının yanlış cevapladığı son 10 soruyu listeler."""
+async def review_wrong_answers(update: Update, context: ContextTypes.DEFAULT_TYPE, page=None) -> None:
+    """
+    Kullanıcının yanlış cevaplarını sayfa sayfa listeler; page verilmezse en yeni sayfa okunur.
+    Butondan açıldığında liste aynı mesajda gösterilir.
+    """
     user_id = update.effective_user.id
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT q.id, q.text, q.correct_answer, ua.user_answer
-        FROM user_answers ua JOIN questions q ON ua.question_id = q.id
-        WHERE ua.user_id = ? AND ua.is_correct = 0
-        ORDER BY ua.timestamp DESC LIMIT 10
-    """, (user_id,))
-    wrong_questions = cursor.fetchall()
-    conn.close()
+    if page is None:
+        page = await wrong_answer_pages.newest(user_id)
+    # Soru metinleri ve doğru cevaplar bellekteki soru bankasından eklenir
+    wrong_questions = [
+        (q.id, q.text, q.correct_answer, user_ans)
+        for q, user_ans in ((question_bank.get(q_id), user_ans) for q_id, user_ans in page.rows)
+        if q is not None
+    ]
+    query = update.callback_query
 
-    if not wrong_questions:
-        message_text = "Henüz yanlış cevapladığın bir soru yok. Tebrikler!"
-        chat_id = update.effective_chat.id
-        await context.bot.send_message(chat_id=chat_id, text=message_text)
+    if not wrong_questions and page.newest:
+        if page.session_id:
+            message_text = "Bu quizde yanlış cevapladığın bir soru yok. Tebrikler!"
+        else:
+            message_text = "Henüz yanlış cevapladığın bir soru yok. Tebrikler!"
+        if query and query.message:
+            await query.edit_message_text(message_text)
+        else:
+            await context.bot.send_message(chat_id=update.effective_chat.id, text=message_text)
         return
 
-    response_message = "**Son 10 Yanlış Cevabın:**\n\n"
+    if page.session_id:
+        response_message = "**Bu Quizdeki Yanlış Cevapların:**\n\n"
+    elif page.newest:
+        response_message = f"**Son {len(wrong_questions)} Yanlış Cevabın:**\n\n"
+    else:
+        response_message = "**Daha Eski Yanlış Cevapların:**\n\n"
     keyboard = []
     for i, (q_id, q_text, correct_ans, user_ans) in enumerate(wrong_questions):
         summary = q_text.split('\n')[0][:50] + "..."
         # user_ans ve correct_ans zaten metin olarak saklandığı için doğrudan kullanabiliriz
         response_message += f"*{i+1}. {summary}*\n  Senin cevabın: `{user_ans}`, Doğru: `{correct_ans}`\n"
         keyboard.append([InlineKeyboardButton(f"Soruyu İncele {i+1}", callback_data=f"review_wrong_detail_{q_id}")])
-
-    chat_id = update.effective_chat.id
-    await context.bot.send_message(chat_id=chat_id, text=response_message, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+    # Sayfa imleçleri (timestamp, id) butonlarda taşınır; bot yeniden başlasa da sayfalama çalışır
+    navigation = []
+    if page.newer:
+        navigation.append(InlineKeyboardButton("⬅️ Daha Yeni", callback_data=f"review_wrong_newer_{page.session_id or 0}_{encode_cursor(page.newer)}"))
+    if page.older:
+        navigation.append(InlineKeyboardButton("Daha Eski ➡️", callback_data=f"review_wrong_older_{page.session_id or 0}_{encode_cursor(page.older)}"))
+    if navigation:
+        keyboard.append(navigation)
+
+    if query and query.message:
+        await query.edit_message_text(response_message, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+    else:
+        chat_id = update.effective_chat.id
+        await context.bot.send_message(chat_id=chat_id, text=response_message, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
 
 async def handle_wrong_question_review_detail(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Belirli bir yanlış cevaplanmış sorunun tam detaylarını gösterir."""
@@ -497,50 +550,37 @@ async def handle_wrong_question_review_detail(update: Update, context: ContextTy
     user_id = query.from_user.id
     question_id = int(query.data.split('_')[3])
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     # Şıkları da çekiyoruz
-    cursor.execute("SELECT text, correct_answer, explanation, image_path, options, answer_type FROM questions WHERE id = ?", (question_id,))
-    q_data = cursor.fetchone()
+    q_data = question_bank.get(question_id)
     
-    cursor.execute(
-        "SELECT user_answer FROM user_answers WHERE user_id = ? AND question_id = ? AND is_correct = 0 ORDER BY timestamp DESC LIMIT 1",
-        (user_id, question_id)
-    )
-    user_answer_data = cursor.fetchone()
-    
-    conn.close()
+    # Kullanıcının cevabı, baktığı liste sayfasından alınır; sayfa önbellekte yoksa tablodan okunur
+    page = wrong_answer_pages.current(user_id)
+    user_answer_data = next(((user_ans,) for q_id, user_ans in page.rows if q_id == question_id), None) if page else None
+    if user_answer_data is None:
+        user_answer_data, pending = await answer_log.read_for_user(user_id, lambda conn: conn.execute(
+            "SELECT user_answer FROM user_answers WHERE user_id = ? AND question_id = ? AND is_correct = 0 ORDER BY timestamp DESC LIMIT 1",
+            (user_id, question_id)
+        ).fetchone())
+        # Bekleyen (henüz yazılmamış) en yeni yanlış cevap varsa o kullanılır
+        pending_wrong = [row.user_answer for row in pending if row.question_id == question_id and not row.is_correct]
+        if pending_wrong:
+            user_answer_data = (pending_wrong[-1],)
 
     if not q_data:
         await query.edit_message_text("Üzgünüm, bu sorunun detayları bulunamadı.")
         return
 
-    q_text, correct_answer_text, explanation, image_path, options_json, answer_type = q_data
+    q_text, correct_answer_text, explanation, image_path = q_data.text, q_data.correct_answer, q_data.explanation, q_data.image_path
     user_answer_raw = user_answer_data[0] if user_answer_data else "Bulunamadı"
     
     # Şıkları formatlayarak mesajın içine ekliyoruz
-    options_list = json.loads(options_json)
+    options_list = q_data.options
     options_display = "\n".join(options_list)
 
-    # Kullanıcının cevabını şık formatına dönüştür
-    user_answer_formatted = []
-    user_answers_split = user_answer_raw.split(',')
-    
-    # answer_type'ı artık kontrol etmiyoruz, her zaman şık harfiyle göstermeye çalışacağız.
-    # Ancak, eğer user_answer_raw tek bir metin ve şıklarda eşleşmiyorsa, ham metni göster.
-    for ua_text in user_answers_split:
-        found = False
-        for opt_full_text in options_list:
-            opt_clean_text = opt_full_text[opt_full_text.find(')') + 2:].strip()
-            if ua_text.strip() == opt_clean_text:
-                user_answer_formatted.append(opt_full_text) # "A) Manastır" gibi
-                found = True
-                break
-        if not found:
-            user_answer_formatted.append(ua_text) # Eğer eşleşme bulunamazsa ham metni kullan
-    
-    user_answer_display = ", ".join(user_answer_formatted)
+    # Kullanıcının cevabını şık formatına ("A) Manastır" gibi) dönüştür; virgül içeren şıklar da
+    # bütün olarak eşleşir. Şıklarda eşleşme bulunamazsa ham metni göster.
+    user_answer_mask = answer_mask(options_list, user_answer_raw)
+    user_answer_display = ", ".join(opt for i, opt in enumerate(options_list) if user_answer_mask >> i & 1) or user_answer_raw
 
 
     detail_message = (
@@ -560,8 +600,7 @@ async def handle_wrong_question_review_detail(update: Update, context: ContextTy
     await query.edit_message_text(detail_message, reply_markup=reply_markup, parse_mode='Markdown')
     
     if image_path and os.path.exists(image_path):
-        with open(image_path, 'rb') as photo:
-            await context.bot.send_photo(chat_id=query.from_user.id, photo=photo)
+        await telegram_files.send_photo(context.bot, query.from_user.id, image_path)
 
 async def reset_statistics_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """İstatistikleri sıfırlamadan önce onay ister."""
@@ -578,31 +617,22 @@ async def handle_reset_confirmation(update: Update, context: ContextTypes.DEFAUL
     """İstatistikleri sıfırlama onayını işler."""
     query = update.callback_query
     if query.data == "confirm_reset":
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM user_answers WHERE user_id = ?", (query.from_user.id,))
-        conn.commit()
-        conn.close()
+        await answer_log.delete_user_answers(query.from_user.id)
+        question_selector.forget(query.from_user.id)
+        wrong_answer_pages.invalidate(query.from_user.id)
         await query.edit_message_text("İstatistiklerin başarıyla sıfırlandı! Yeni bir başlangıç için /start yaz.")
     else:
         await query.edit_message_text("İşlem iptal edildi. İstatistiklerin güvende.")
 
 async def show_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Doğru cevaplara göre en iyi 10 kullanıcıyı gösterir."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT u.username, 
-               SUM(CASE WHEN ua.is_correct = 1 THEN 1 ELSE 0 END) as correct_count,
-               COUNT(ua.question_id) as total_answered
-        FROM users u JOIN user_answers ua ON u.id = ua.user_id
-        GROUP BY u.id
-        HAVING correct_count > 0
-        ORDER BY correct_count DESC, total_answered ASC
-        LIMIT 10
-    """)
-    leaderboard_data = cursor.fetchall()
-    conn.close()
+    # Sıralama bellekte hazır tutulur; yalnızca biri listeden düştüyse tablodan yeniden yüklenir
+    if leaderboard.needs_reload:
+        await db.run(leaderboard.load)
+    leaderboard_data = [
+        (await user_cache.username(context.bot, user_id), correct, total)
+        for user_id, correct, total in leaderboard.top()
+    ]
 
     leaderboard_message = "🏆 **Sanat Bilgini Lider Tablosu** 🏆\n\n"
     if not leaderboard_data:
@@ -629,21 +659,40 @@ async def feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await context.bot.send_message(
             chat_id=FEEDBACK_ADMIN_ID,
             text=f"**Yeni Geri Bildirim:**\n\nGönderen: @{user.username} (ID: {user.id})\n\nMesaj:\n_{feedback_text}_",
-            parse_mode='Markdown'
+            parse_mode='Markdown',
+            **bulk_send_args()
         )
         await update.message.reply_text("Teşekkürler! Geri bildirimin gönderildi.")
     except Exception as e:
         logger.error(f"Yöneticiye geri bildirim gönderilemedi: {e}", exc_info=True)
         await update.message.reply_text("Üzgünüm, geri bildirimin gönderilirken bir hata oluştu.")
 
+async def show_metrics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Yöneticiye işleyici, SQL ve Bot API ölçümlerinin özetini gönderir."""
+    if update.effective_user.id != FEEDBACK_ADMIN_ID:
+        await update.message.reply_text("Bu komut yalnızca bot yöneticisi tarafından kullanılabilir.")
+        return
+    await update.message.reply_text(metrics.summary_text())
+
 async def show_quiz_summary(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Bir quiz oturumu tamamlandıktan sonra bir özet gösterir."""
     user_id = update.effective_user.id
-    data = context.user_data.get(user_id, {})
-    total_answered = data.get('current_quiz_questions_answered', 0)
-    correct = data.get('current_quiz_correct_answers', 0)
-    duration = int(time.time() - data.get('current_quiz_start_time', time.time()))
+    # Quiz oturumunu kapat; özet oturumdaki sayaçlardan hazırlanır
+    session = context.user_data.pop(SESSION_KEY, None)
+    if session is None:
+        return
+    total_answered = session.answered
+    correct = session.correct
+    duration = int(time.time() - session.quiz_started_at)
     accuracy = (correct / total_answered * 100) if total_answered > 0 else 0
+    if session.session_id:
+        try:
+            await db.execute(
+                "UPDATE quiz_sessions SET finished_at = CURRENT_TIMESTAMP, answered = ?, correct = ? WHERE id = ?",
+                (total_answered, correct, session.session_id)
+            )
+        except Exception as e:
+            logger.error(f"Kullanıcı {user_id} için {session.session_id} numaralı quiz kapatılamadı: {e}", exc_info=True)
 
     summary_message = (
         f"**Quiz Tamamlandı! 🎉**\n\n"
@@ -657,23 +706,97 @@ async def show_quiz_summary(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     keyboard = [
         [InlineKeyboardButton("Yeni Quiz Başlat", callback_data="start_new_quiz")],
-        [InlineKeyboardButton("Yanlışlarımı İncele", callback_data="review_wrong_answers")]
+        [InlineKeyboardButton(
+            "Yanlışlarımı İncele",
+            callback_data=f"review_quiz_wrong_{session.session_id}" if session.session_id else "review_wrong_answers"
+        )]
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
 
-    # Quiz oturum verilerini temizle
-    context.user_data[user_id] = {}
-
     await context.bot.send_message(
         chat_id=user_id, 
         text=summary_message, 
         reply_markup=reply_markup,
-        parse_mode='Markdown'
+        parse_mode='Markdown',
+        # Özet, sıradaki soru ve cevap onayları gibi etkileşimli yanıtların ardından gönderilebilir
+        **bulk_send_args()
     )
 
-def main() -> None:
-    """Botu başlatır ve komut işleyicilerini ayarlar."""
-    application = Application.builder().token(TOKEN).build()
+# post_init içinde başlatılan ve kapanışta durdurulan arka plan görevleri ve sunucular
+background_tasks = []
+background_servers = []
+
+async def on_startup(application: Application) -> None:
+    """Bot başlarken soru bankasını ve lider tablosunu belleğe yükler, arka plan görevlerini başlatır."""
+    await db.run(question_bank.load)
+    question_keyboards.clear()
+    question_selector.clear()
+    await db.run(leaderboard.load)
+    background_tasks.append(asyncio.create_task(leaderboard.reconcile_forever(db, leaderboard_reconcile_interval)))
+    background_tasks.append(asyncio.create_task(session_sweeper.run_forever(application)))
+    if run_archiver:
+        background_tasks.append(asyncio.create_task(archive_forever(db)))
+    if METRICS_PORT:
+        background_servers.append(await metrics.start_metrics_server(METRICS_LISTEN, METRICS_PORT))
+        logger.info(f"Ölçümler http://{METRICS_LISTEN}:{METRICS_PORT}/metrics adresinde sunuluyor.")
+
+async def on_stop(application: Application) -> None:
+    """Application durduktan sonra, Bot API bağlantısı kapanmadan bekleyen mesaj düzenlemelerini gönderir."""
+    await edit_coalescer.close()
+
+async def on_shutdown(application: Application) -> None:
+    """Bot kapanırken arka plan görevlerini durdurur, bekleyen cevapları yazar ve bağlantı havuzunu kapatır."""
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    for server in background_servers:
+        server.close()
+        await server.wait_closed()
+    background_servers.clear()
+    await answer_log.close()
+    db.close()
+
+def configure_worker(index: int, count: int) -> None:
+    """
+    Bu süreci workers.py'deki count işçiden index'incisi olarak ayarlar: Telegram'ın genel gönderim
+    sınırı işçiler arasında bölünür, ölçüm portu işçiye göre kaydırılır, eski quizleri yalnızca ilk
+    işçi arşivler ve lider tablosu diğer işçilerin cevaplarıyla daha sık eşitlenir.
+    """
+    global send_scheduler, METRICS_PORT, leaderboard_reconcile_interval, run_archiver
+    if send_scheduler is not None:
+        send_scheduler = SendScheduler(global_rate=GLOBAL_RATE / count)
+    if METRICS_PORT:
+        METRICS_PORT += 1 + index
+    leaderboard_reconcile_interval = SHARDED_LEADERBOARD_RECONCILE_INTERVAL
+    run_archiver = index == 0
+
+def build_application(request=None, shard: tuple = None) -> Application:
+    """
+    Tüm işleyicileri kayıtlı Application'ı oluşturur.
+    request verilirse (ör. yük testlerindeki sahte Bot API) tüm Bot API çağrıları onun üzerinden yapılır.
+    shard=(index, count) verilirse yalnızca bu işçiye düşen kullanıcıların oturumları geri yüklenir.
+    getUpdates dışındaki istekler ve tüm işleyiciler metrics modülü tarafından ölçülür.
+    send_scheduler tanımlıysa mesaj gönderen çağrılar onun hız sınırlarından geçer. Güncellemeler
+    kullanıcılar arasında eşzamanlı işlenir; bir sohbetin hız sınırını bekleyen işleyici diğer
+    kullanıcıları bekletmez, aynı kullanıcının güncellemeleri ise sırayla işlenir.
+    """
+    # Devam eden quiz oturumları 'active_quiz_sessions' tablosunda saklanır; yeniden başlatmada kaybolmaz
+    builder = (
+        Application.builder().token(TOKEN).persistence(SQLitePersistence(db, shard=shard))
+        .post_init(on_startup).post_stop(on_stop).post_shutdown(on_shutdown)
+        .concurrent_updates(PerUserUpdateProcessor())
+    )
+    if request is not None:
+        builder = builder.request(metrics.InstrumentedRequest(request)).get_updates_request(request)
+    else:
+        # ApplicationBuilder'ın varsayılanıyla aynı havuz boyutu
+        builder = builder.request(metrics.InstrumentedRequest(HTTPXRequest(connection_pool_size=256)))
+    if send_scheduler is not None:
+        builder = builder.rate_limiter(send_scheduler)
+    application = builder.build()
+
+    # Kullanıcı adı önbelleği diğer tüm işleyicilerden önce beslenir
+    application.add_handler(TypeHandler(Update, remember_user), group=-1)
 
     # Komut işleyicileri
     application.add_handler(CommandHandler("start", start))
@@ -683,6 +806,7 @@ def main() -> None:
     application.add_handler(CommandHandler("sifirla", reset_statistics_confirmation))
     application.add_handler(CommandHandler("liderler", show_leaderboard))
     application.add_handler(CommandHandler("geri_bildirim", feedback))
+    application.add_handler(CommandHandler("metrikler", show_metrics))
 
     # Tüm buton tıklamaları için ana callback query işleyicisi
     application.add_handler(CallbackQueryHandler(handle_callback_query))
@@ -691,8 +815,32 @@ def main() -> None:
     application.add_handler(MessageHandler(filters.COMMAND, unknown))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, unknown))
 
-    logger.info("Bot çalışıyor...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    # Kayıtlı tüm işleyicilerin süresi ve hataları ölçülür
+    metrics.instrument_handlers(application)
+    return application
+
+def main() -> None:
+    """Botu başlatır ve komut işleyicilerini ayarlar."""
+    if WORKER_COUNT > 1:
+        # Şema göçleri dağıtıcıda bir kez yapılmıştır; işçiler kendi Application'larını kurar
+        logger.info(f"Bot {WORKER_COUNT} işçi süreçle çalışıyor ({TRANSPORT_MODE})...")
+        asyncio.run(run_sharded(
+            WORKER_COUNT, TOKEN, TRANSPORT_MODE, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN,
+            url=WEBHOOK_URL, allowed_updates=ALLOWED_UPDATES
+        ))
+        return
+
+    application = build_application()
+
+    if TRANSPORT_MODE == 'webhook':
+        logger.info("Bot webhook modunda çalışıyor...")
+        asyncio.run(run_webhook(
+            application, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN,
+            url=WEBHOOK_URL, allowed_updates=ALLOWED_UPDATES
+        ))
+    else:
+        logger.info("Bot çalışıyor...")
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 if __name__ == '__main__':
     setup_database_on_startup()
@@ -0,0 +1,263 @@
+"""
+İşleyici, SQL ve Bot API ölçümleri.
+
+Her kayıtlı işleyicinin, get_db_connection() ile açılan bağlantılardaki her SQL ifadesinin ve
+her Bot API isteğinin süresi sabit kovalı histogramlarda, hataları da sayaçlarda tutulur.
+Bir ölçüm yalnızca bir perf_counter() çifti ve kilit altında birkaç tamsayı artırımıdır;
+bu yüzden ölçüm katmanı üretimde sürekli açık kalabilir.
+
+Ölçümler Prometheus metin biçiminde yerel bir HTTP uç noktasından (/metrics) ve yönetici
+komutu /metrikler ile okunur.
+"""
+import asyncio
+import functools
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from http import HTTPStatus
+
+from telegram.request import BaseRequest
+
+from http_server import HTTPResponse, start_http_server
+
+# Histogram kova üst sınırları (saniye)
+HANDLER_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+BOT_API_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SQL_LABEL_LENGTH = 120 # Etiket olarak kullanılan SQL metninin en fazla uzunluğu
+
+class Histogram:
+    """Sabit kovalı, iş parçacığı güvenli bir süre histogramı."""
+    __slots__ = ('bounds', '_counts', '_sum', '_errors', '_lock')
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self._counts = [0] * (len(bounds) + 1) # Son kova +Inf
+        self._sum = 0.0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        index = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            if error:
+                self._errors += 1
+
+    def snapshot(self) -> tuple:
+        """(kova sayıları, toplam süre, hata sayısı) kopyasını döndürür."""
+        with self._lock:
+            return list(self._counts), self._sum, self._errors
+
+def quantile(bounds: tuple, counts: list, q: float) -> float:
+    """Kova sayılarından q yüzdeliğini, kova içinde doğrusal dağılım varsayarak tahmin eder."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(counts):
+        if seen + count >= rank and count:
+            if index == len(bounds): # +Inf kovası: bilinen en büyük sınır döndürülür
+                return bounds[-1]
+            lower = bounds[index - 1] if index else 0.0
+            return lower + (bounds[index] - lower) * (rank - seen) / count
+        seen += count
+    return bounds[-1]
+
+class TimingFamily:
+    """Bir ölçümün etiket değeri (ör. işleyici adı) başına histogramları."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, key: str) -> Histogram:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, key: str, seconds: float, error: bool = False) -> None:
+        self.histogram(key).observe(seconds, error)
+
+    def snapshots(self) -> dict:
+        with self._lock:
+            items = list(self._histograms.items())
+        return {key: histogram.snapshot() for key, histogram in items}
+
+    @property
+    def bounds_with_inf(self) -> list:
+        return [str(bound) for bound in self.buckets] + ['+Inf']
+
+    def render(self) -> list:
+        """Prometheus metin biçiminde histogram ve hata sayacı satırları."""
+        duration = f"{self.name}_duration_seconds"
+        lines = [f"# HELP {duration} {self.help_text} süresi", f"# TYPE {duration} histogram"]
+        errors = [f"# HELP {self.name}_errors_total Hata ile biten {self.help_text} sayısı", f"# TYPE {self.name}_errors_total counter"]
+        for key, (counts, total, error_count) in sorted(self.snapshots().items()):
+            label = f'{self.label}="{_escape(key)}"'
+            cumulative = 0
+            for bound, count in zip(self.bounds_with_inf, counts):
+                cumulative += count
+                lines.append(f'{duration}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{duration}_sum{{{label}}} {total}")
+            lines.append(f"{duration}_count{{{label}}} {cumulative}")
+            errors.append(f"{self.name}_errors_total{{{label}}} {error_count}")
+        return lines + errors
+
+    def summary(self) -> list:
+        """Toplam süreye göre sıralı (etiket, çağrı, hata, p50, p95, toplam süre) satırları."""
+        rows = []
+        for key, (counts, total, error_count) in self.snapshots().items():
+            rows.append((key, sum(counts), error_count, quantile(self.buckets, counts, 0.5),
+                         quantile(self.buckets, counts, 0.95), total))
+        rows.sort(key=lambda row: row[5], reverse=True)
+        return rows
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+HANDLERS = TimingFamily('bot_handler', "işleyici çalışması", 'handler', HANDLER_BUCKETS)
+SQL = TimingFamily('bot_sql', "SQL ifadesi", 'statement', SQL_BUCKETS)
+BOT_API = TimingFamily('bot_api_request', "Bot API isteği", 'method', BOT_API_BUCKETS)
+FAMILIES = (HANDLERS, SQL, BOT_API)
+
+def render() -> str:
+    """Tüm ölçümleri Prometheus metin biçiminde döndürür."""
+    lines = []
+    for family in FAMILIES:
+        lines.extend(family.render())
+    return '\n'.join(lines) + '\n'
+
+def summary_text(limit: int = 8) -> str:
+    """Yönetici komutu için en çok zaman harcayan işleyici, SQL ve Bot API satırlarının özeti."""
+    sections = (("⏱️ İşleyiciler", HANDLERS), ("🗄️ SQL ifadeleri", SQL), ("📡 Bot API", BOT_API))
+    parts = []
+    for title, family in sections:
+        rows = family.summary()[:limit]
+        lines = [f"{title} (toplam süreye göre)"]
+        for key, calls, errors, p50, p95, total in rows:
+            lines.append(f"• {key[:60]}\n  {calls} çağrı, {errors} hata, p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, toplam {total:.2f} sn")
+        if not rows:
+            lines.append("Henüz ölçüm yok.")
+        parts.append('\n'.join(lines))
+    return '\n\n'.join(parts)
+
+# --- İşleyiciler ---
+
+def timed_callback(name: str, callback):
+    """Bir işleyici callback'ini süresini ve hatasını HANDLERS'a yazacak şekilde sarar."""
+    histogram = HANDLERS.histogram(name)
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        error = True
+        try:
+            result = await callback(update, context)
+            error = False
+            return result
+        finally:
+            histogram.observe(time.perf_counter() - started, error)
+    return wrapper
+
+def instrument_handlers(application) -> None:
+    """Application'a kayıtlı tüm işleyicilerin callback'lerini ölçülen sürümleriyle değiştirir."""
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            handler.callback = timed_callback(handler.callback.__name__, handler.callback)
+
+# --- SQL ---
+
+@functools.lru_cache(maxsize=1024)
+def statement_label(sql: str) -> str:
+    """SQL metnini boşlukları sadeleştirip kısaltarak etikete çevirir; sorgular parametreli olduğundan sayısı sınırlıdır."""
+    return ' '.join(sql.split())[:SQL_LABEL_LENGTH]
+
+def _timed_sql(method, sql: str, *args):
+    started = time.perf_counter()
+    error = True
+    try:
+        result = method(sql, *args)
+        error = False
+        return result
+    finally:
+        SQL.observe(statement_label(sql), time.perf_counter() - started, error)
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """execute/executemany sürelerini SQL'e yazan imleç. SELECT için süre ilk satırın hazırlanmasına kadardır."""
+
+    def execute(self, sql, parameters=()):
+        return _timed_sql(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return _timed_sql(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return _timed_sql(super().executescript, sql_script)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Tüm ifadeleri InstrumentedCursor üzerinden çalıştıran bağlantı (sqlite3.connect(factory=...))."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+# --- Bot API ---
+
+class InstrumentedRequest(BaseRequest):
+    """Başka bir BaseRequest'i sarıp her Bot API isteğinin süresini ve sonucunu BOT_API'ye yazar."""
+
+    def __init__(self, request: BaseRequest):
+        self._request = request
+
+    @property
+    def read_timeout(self):
+        return self._request.read_timeout
+
+    async def initialize(self) -> None:
+        await self._request.initialize()
+
+    async def shutdown(self) -> None:
+        await self._request.shutdown()
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        api_method = url.rsplit('/', 1)[-1]
+        started = time.perf_counter()
+        error = True
+        try:
+            status, payload = await self._request.do_request(url, method, request_data, **kwargs)
+            error = status != HTTPStatus.OK
+            return status, payload
+        finally:
+            BOT_API.observe(api_method, time.perf_counter() - started, error)
+
+# --- HTTP uç noktası ---
+
+async def _handle_http(request) -> HTTPResponse:
+    if request.path != '/metrics':
+        return HTTPResponse(HTTPStatus.NOT_FOUND)
+    if request.method != 'GET':
+        return HTTPResponse(HTTPStatus.METHOD_NOT_ALLOWED)
+    return HTTPResponse(HTTPStatus.OK, render().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+
+async def start_metrics_server(host: str, port: int) -> asyncio.Server:
+    """Ölçümleri http://host:port/metrics adresinden sunan HTTP sunucusunu başlatır."""
+    return await start_http_server(_handle_http, host, port)
@@ -0,0 +1,331 @@
+"""
+Veritabanı şemasının sürümlü göçleri (migrations).
+
+Şema yalnızca burada tanımlanır; hem bot (main.py) hem de soru yükleyiciler (seed_db.py,
+question_importer.py) başlarken
+migrate() çağırır. Uygulanan son sürüm 'schema_version' tablosunda tutulur ve her göç kendi
+işlemi içinde, sırayla ve yalnızca bir kez çalışır. Yeni bir şema değişikliği için MIGRATIONS
+listesinin sonuna yeni bir sürüm eklenir; var olan göçler değiştirilmez.
+
+Sıcak sorguların tablo taramasına düşmediğini doğrulamak için:
+    python migrations.py --check
+Aynı kontrol, deponun veritabanına dokunmadan tests/test_query_plans.py ile otomatik çalışır:
+    python -m pytest
+"""
+import hashlib
+import json
+import logging
+import sys
+
+from database import get_db_connection
+from question_bank import answer_mask
+from question_selector import HISTORY_SQL
+from quiz_archive import OLD_SESSIONS_SQL, OLD_UNSESSIONED_ANSWERS_SQL
+from review_pages import (
+    NEWEST_WRONG_SQL, OLDER_WRONG_SQL, NEWER_WRONG_SQL, NEWEST_QUIZ_WRONG_SQL, OLDER_QUIZ_WRONG_SQL, NEWER_QUIZ_WRONG_SQL,
+)
+
+logger = logging.getLogger(__name__)
+
+def _v1_base_tables(cursor) -> None:
+    # questions tablosu: Soru içeriği; question_importer.py tarafından doldurulur.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            image_path TEXT,
+            answer_type TEXT NOT NULL,
+            correct_answer TEXT NOT NULL, -- Bu sütun artık şık metnini saklayacak
+            options TEXT,
+            explanation TEXT,
+            donem TEXT,
+            sinav_turu TEXT
+        )
+    ''')
+    # users tablosu: Kullanıcı bilgilerini ve mevcut durumlarını saklar.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT,
+            current_question_id INTEGER,
+            state TEXT,
+            FOREIGN KEY (current_question_id) REFERENCES questions(id)
+        )
+    ''')
+    # user_answers tablosu: İstatistikler için her cevabı kaydeder.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            user_answer TEXT,
+            is_correct BOOLEAN NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            answer_time_seconds INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (question_id) REFERENCES questions(id)
+        )
+    ''')
+
+def _v2_telegram_files(cursor) -> None:
+    # telegram_files tablosu: Yüklenen resimlerin Telegram file_id'lerini saklar.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS telegram_files (
+            image_path TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            file_id TEXT NOT NULL,
+            PRIMARY KEY (image_path, content_hash)
+        )
+    ''')
+
+def _v3_user_stats(cursor) -> None:
+    # user_stats ve user_exam_stats tabloları: /istatistik için cevaplarla birlikte güncellenen toplamlar.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            answered INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            total_time INTEGER NOT NULL DEFAULT 0,
+            timed_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_exam_stats (
+            user_id INTEGER NOT NULL,
+            sinav_turu TEXT NOT NULL,
+            answered INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            total_time INTEGER NOT NULL DEFAULT 0,
+            timed_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, sinav_turu)
+        )
+    ''')
+    # Lider tablosu: correct DESC, answered ASC sıralaması için
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_stats_leaderboard ON user_stats (correct DESC, answered, user_id)")
+    # Toplam tabloları boşsa mevcut cevap geçmişinden bir kez doldur
+    if cursor.execute("SELECT COUNT(*) FROM user_stats").fetchone()[0] == 0:
+        cursor.execute('''
+            INSERT INTO user_stats (user_id, answered, correct, total_time, timed_count)
+            SELECT user_id, COUNT(*), SUM(is_correct = 1), COALESCE(SUM(answer_time_seconds), 0), COUNT(answer_time_seconds)
+            FROM user_answers GROUP BY user_id
+        ''')
+        cursor.execute('''
+            INSERT INTO user_exam_stats (user_id, sinav_turu, answered, correct, total_time, timed_count)
+            SELECT ua.user_id, q.sinav_turu, COUNT(*), SUM(ua.is_correct = 1), COALESCE(SUM(ua.answer_time_seconds), 0), COUNT(ua.answer_time_seconds)
+            FROM user_answers ua JOIN questions q ON ua.question_id = q.id
+            WHERE q.sinav_turu IS NOT NULL
+            GROUP BY ua.user_id, q.sinav_turu
+        ''')
+
+def _v4_query_indexes(cursor) -> None:
+    # Sınav türüne (ve döneme) göre soru filtreleme
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_questions_exam ON questions (sinav_turu, donem)")
+    # /yanlislarim listesi: kullanıcının son yanlışları, tabloya dönmeden (covering)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_answers_review
+        ON user_answers (user_id, is_correct, timestamp DESC, question_id, user_answer)
+    ''')
+    # Yanlış soru detayı: kullanıcının bir soruya verdiği en son yanlış cevap
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_answers_question
+        ON user_answers (user_id, question_id, is_correct, timestamp DESC, user_answer)
+    ''')
+
+def _v5_active_quiz_sessions(cursor) -> None:
+    # Devam eden quiz oturumları (quiz_session.QuizSession); bot yeniden başladığında buradan yüklenir
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS active_quiz_sessions (
+            user_id INTEGER PRIMARY KEY,
+            sinav_turu TEXT NOT NULL,
+            deck TEXT NOT NULL, -- Virgülle ayrılmış soru ID'leri
+            position INTEGER NOT NULL,
+            answered INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            quiz_started_at REAL NOT NULL,
+            question_started_at REAL NOT NULL,
+            last_active REAL NOT NULL,
+            selected INTEGER NOT NULL, -- Seçili şıkların bit maskesi
+            message_id INTEGER
+        )
+    ''')
+
+def question_content_hash(text: str, sinav_turu, donem) -> str:
+    """
+    Sorunun kalıcı kimliği: sınav türü, dönem ve soru metninden üretilir. Şıklar, cevap ve
+    açıklama düzeltilebilir; bunlar değiştiğinde soru aynı ID ile güncellenir.
+    """
+    key = "\x1f".join(((sinav_turu or "").strip(), (donem or "").strip(), " ".join(text.split())))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def _v6_question_content_hash(cursor) -> None:
+    # Soruların içerik hash'i; yeniden içe aktarımda mevcut satır bu sütunla bulunur ve ID korunur
+    cursor.execute("ALTER TABLE questions ADD COLUMN content_hash TEXT")
+    seen = set()
+    updates = []
+    for question_id, text, sinav_turu, donem in cursor.execute("SELECT id, text, sinav_turu, donem FROM questions ORDER BY id").fetchall():
+        content_hash = question_content_hash(text, sinav_turu, donem)
+        if content_hash in seen:
+            # Aynı sorunun eski kopyaları hash'siz kalır; içe aktarım ilk kopyayı günceller
+            logger.warning(f"Soru {question_id} daha önceki bir sorunun kopyası; içerik hash'i atanmadı.")
+            continue
+        seen.add(content_hash)
+        updates.append((content_hash, question_id))
+    cursor.executemany("UPDATE questions SET content_hash = ? WHERE id = ?", updates)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_content_hash ON questions (content_hash)")
+
+def _v7_question_correct_mask(cursor) -> None:
+    # Doğru şıkların bit maskesi; cevaplar metin yerine tek bir tamsayı karşılaştırmasıyla değerlendirilir
+    cursor.execute("ALTER TABLE questions ADD COLUMN correct_mask INTEGER")
+    rows = cursor.execute("SELECT id, options, correct_answer FROM questions").fetchall()
+    cursor.executemany(
+        "UPDATE questions SET correct_mask = ? WHERE id = ?",
+        [(answer_mask(json.loads(options or '[]'), correct_answer), question_id) for question_id, options, correct_answer in rows]
+    )
+
+def _v8_session_quiz_length(cursor) -> None:
+    # Sorular artık quiz ilerledikçe seçildiği için deste, quiz uzunluğunu tek başına belirlemez
+    cursor.execute("ALTER TABLE active_quiz_sessions ADD COLUMN quiz_length INTEGER")
+    cursor.execute("UPDATE active_quiz_sessions SET quiz_length = LENGTH(deck) - LENGTH(REPLACE(deck, ',', '')) + 1 WHERE deck != ''")
+
+def _v9_review_page_index(cursor) -> None:
+    # /yanlislarim sayfaları (timestamp, id) üzerinde keyset ile okunur; bunun için id'nin timestamp'in
+    # hemen ardından gelmesi gerekir. Yeni indeks eski liste indeksinin yerini alır (covering).
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_answers_review_page
+        ON user_answers (user_id, is_correct, timestamp, id, question_id, user_answer)
+    ''')
+    cursor.execute("DROP INDEX IF EXISTS idx_user_answers_review")
+
+def _v10_quiz_sessions(cursor) -> None:
+    # Her quiz bir satır; cevaplar quizlerine session_id ile bağlanır, geçmiş quiz başında silinmez
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quiz_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            sinav_turu TEXT NOT NULL,
+            quiz_length INTEGER NOT NULL,
+            started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            finished_at DATETIME,
+            answered INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    # Arşivleme eski quizleri başlangıç zamanına göre seçer
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_quiz_sessions_started ON quiz_sessions (started_at)")
+    cursor.execute("ALTER TABLE user_answers ADD COLUMN session_id INTEGER REFERENCES quiz_sessions(id)")
+    # Quiz bazlı görünümler (quizin yanlışları, arşivleme) tabloya dönmeden bu indeksten okunur
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_answers_session
+        ON user_answers (session_id, is_correct, timestamp, id, user_id, question_id, user_answer)
+    ''')
+    cursor.execute("ALTER TABLE active_quiz_sessions ADD COLUMN session_id INTEGER")
+
+def _v11_selection_history_index(cursor) -> None:
+    # Seçim indeksi kullanıcının cevaplarını eskiden yeniye (id sırasıyla) okur; diğer indekslerde
+    # id sıralaması is_correct/question_id'den sonra geldiği için geçici sıralama gerekiyordu (covering)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_answers_history ON user_answers (user_id, id, question_id, is_correct)")
+
+def _v12_unsessioned_answers_index(cursor) -> None:
+    # Quize bağlı olmayan (eski ya da session_id'siz) cevaplar arşivlenmek üzere zamana göre okunur;
+    # kısmi indeks yalnızca bu satırları içerir, quizlere bağlı yeni cevaplar için yazma maliyeti yoktur
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_answers_unsessioned
+        ON user_answers (timestamp, id) WHERE session_id IS NULL
+    ''')
+
+# (sürüm, açıklama, göç fonksiyonu) — sıralı ve yalnızca sona eklenerek büyür
+MIGRATIONS = [
+    (1, "Temel tablolar (questions, users, user_answers)", _v1_base_tables),
+    (2, "Telegram file_id önbelleği", _v2_telegram_files),
+    (3, "Kullanıcı istatistik toplamları ve lider tablosu indeksi", _v3_user_stats),
+    (4, "Sıcak sorgular için indeksler", _v4_query_indexes),
+    (5, "Devam eden quiz oturumları", _v5_active_quiz_sessions),
+    (6, "Soru içerik hash'i (ID koruyan içe aktarım)", _v6_question_content_hash),
+    (7, "Doğru cevap bit maskesi", _v7_question_correct_mask),
+    (8, "Quiz oturumu uzunluğu", _v8_session_quiz_length),
+    (9, "Yanlış listesi için keyset sayfalama indeksi", _v9_review_page_index),
+    (10, "Quiz oturumları tablosu ve cevaplarda session_id", _v10_quiz_sessions),
+    (11, "Seçim indeksi için cevap geçmişi indeksi", _v11_selection_history_index),
+    (12, "Quiz dışı cevapların arşivlenmesi için kısmi indeks", _v12_unsessioned_answers_index),
+]
+
+def current_version(conn) -> int:
+    """Veritabanına uygulanmış son göç sürümünü döndürür."""
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, description TEXT, applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)")
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def migrate(conn) -> int:
+    """Eksik göçleri sırayla uygular ve ulaşılan sürümü döndürür."""
+    version = current_version(conn)
+    conn.commit()
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        try:
+            apply(cursor)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)", (target, description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Şema göçü {target} ({description}) uygulanamadı.", exc_info=True)
+            raise
+        version = target
+        logger.info(f"Şema göçü uygulandı: {target} - {description}")
+    return version
+
+# --- Sorgu Planı Kontrolü ---
+
+# Botun sıcak yollarındaki sorgu biçimleri; hiçbiri tablo taramasına veya geçici sıralamaya düşmemelidir.
+HOT_QUERIES = {
+    "kullanıcı durumu": ("SELECT current_question_id, state FROM users WHERE id = ?", (1,)),
+    "kullanıcı adı": ("SELECT username FROM users WHERE id = ?", (1,)),
+    "sınav türüne göre sorular": ("SELECT id FROM questions WHERE sinav_turu = ?", ('Vize',)),
+    "yanlış listesi (en yeni)": (NEWEST_WRONG_SQL, (1, 11)),
+    "yanlış listesi (daha eski)": (OLDER_WRONG_SQL, (1, '2024-01-01 00:00:00', 1, 11)),
+    "yanlış listesi (daha yeni)": (NEWER_WRONG_SQL, (1, '2024-01-01 00:00:00', 1, 11)),
+    "quiz yanlışları (en yeni)": (NEWEST_QUIZ_WRONG_SQL, (1, 1, 11)),
+    "quiz yanlışları (daha eski)": (OLDER_QUIZ_WRONG_SQL, (1, 1, '2024-01-01 00:00:00', 1, 11)),
+    "quiz yanlışları (daha yeni)": (NEWER_QUIZ_WRONG_SQL, (1, 1, '2024-01-01 00:00:00', 1, 11)),
+    "yanlış soru detayı": (
+        "SELECT user_answer FROM user_answers WHERE user_id = ? AND question_id = ? AND is_correct = 0 ORDER BY timestamp DESC LIMIT 1", (1, 1)
+    ),
+    "istatistikler": ("SELECT answered, correct, total_time, timed_count FROM user_stats WHERE user_id = ?", (1,)),
+    "sınav türü istatistikleri": ("SELECT sinav_turu, answered, correct FROM user_exam_stats WHERE user_id = ?", (1,)),
+    "lider tablosu": (
+        "SELECT user_id, answered, correct FROM user_stats WHERE correct > 0 ORDER BY correct DESC, answered ASC, user_id ASC LIMIT 10", ()
+    ),
+    "seçim indeksi geçmişi": (HISTORY_SQL, (1,)),
+    "arşivlenecek quizler": (OLD_SESSIONS_SQL, ('2024-01-01 00:00:00', 1000)),
+    "arşivlenecek quiz dışı cevaplar": (OLD_UNSESSIONED_ANSWERS_SQL, ('2024-01-01 00:00:00', 10000)),
+    "telegram file_id": ("SELECT file_id FROM telegram_files WHERE image_path = ? AND content_hash = ?", ('a', 'b')),
+}
+
+def check_query_plans(conn) -> list:
+    """
+    HOT_QUERIES içindeki her sorgunun planını inceler.
+    İndekssiz tablo taraması veya geçici B-tree sıralaması yapan sorguları (ad, plan) listesi olarak döndürür.
+    """
+    failures = []
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        if any((step.startswith("SCAN") and "INDEX" not in step) or "TEMP B-TREE" in step for step in plan):
+            failures.append((name, plan))
+    return failures
+
+if __name__ == '__main__':
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+    conn = get_db_connection()
+    migrate(conn)
+    if '--check' in sys.argv:
+        failures = check_query_plans(conn)
+        for name, plan in failures:
+            print(f"TARAMA: {name}: {' | '.join(plan)}")
+        conn.close()
+        if failures:
+            sys.exit(1)
+        print(f"{len(HOT_QUERIES)} sıcak sorgunun tamamı indeks kullanıyor.")
+    else:
+        conn.close()
@@ -0,0 +1,219 @@
+"""
+Devam eden quiz oturumlarının SQLite'taki kalıcı kopyası.
+
+python-telegram-bot, her update_interval'da yalnızca son turdan beri güncellemesi işlenen
+kullanıcılar için update_user_data() çağırır. Bu sınıf gelen oturumu tablo satırına çevirir,
+son yazılan satırla aynıysa atlar ve değişenleri tek bir işlemde (executemany) yazar. Pickle
+kullanılmaz; her oturum 'active_quiz_sessions' tablosunda düz sütunlar olarak durur. Bot yeniden
+başladığında oturumlar get_user_data() ile geri yüklenir, böylece öğrencinin bir sonraki buton
+tıklaması quizine kaldığı yerden devam eder.
+
+SessionSweeper boşta kalan oturumları yalnızca bellekten atar (drop_user_data satırı silmez);
+atılan oturum, öğrenci döndüğünde load_session() ile tek satırdan geri yüklenir. Satır quiz
+bitince ya da sıfırlanınca (oturum user_data'dan çıkarıldığında) veya terk edilmiş sayılınca
+(delete_abandoned) silinir.
+"""
+import asyncio
+import logging
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from quiz_session import QuizSession, SESSION_KEY
+from workers import shard_of
+
+logger = logging.getLogger(__name__)
+
+# --- Kalıcılık Ayarları ---
+PERSISTENCE_UPDATE_INTERVAL = 5 # Değişen oturumların kaç saniyede bir diske yazılacağı
+
+SESSION_COLUMNS = (
+    "sinav_turu, deck, position, answered, correct, quiz_started_at, question_started_at, last_active, selected, message_id, quiz_length, session_id"
+)
+UPSERT_SESSION_SQL = f"""
+    INSERT INTO active_quiz_sessions (user_id, {SESSION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        sinav_turu = excluded.sinav_turu, deck = excluded.deck, position = excluded.position,
+        answered = excluded.answered, correct = excluded.correct, quiz_started_at = excluded.quiz_started_at,
+        question_started_at = excluded.question_started_at, last_active = excluded.last_active,
+        selected = excluded.selected, message_id = excluded.message_id, quiz_length = excluded.quiz_length,
+        session_id = excluded.session_id
+"""
+DELETE_SESSION_SQL = "DELETE FROM active_quiz_sessions WHERE user_id = ?"
+LOAD_SESSION_SQL = f"SELECT {SESSION_COLUMNS} FROM active_quiz_sessions WHERE user_id = ?"
+DELETE_ABANDONED_SQL = "DELETE FROM active_quiz_sessions WHERE last_active < ? RETURNING user_id"
+
+class SQLitePersistence(BasePersistence):
+    """
+    Yalnızca user_data'daki quiz oturumlarını saklayan BasePersistence uygulaması.
+    Değişen oturumlar bekleyenler sözlüğünde (user_id -> satır, silme için None) birikir ve
+    aynı turda gelen tüm değişiklikler yazıcı iş parçacığında tek bir commit ile yazılır.
+    shard=(index, count) verilirse (workers.py) yalnızca bu işçiye düşen kullanıcıların oturumları
+    yüklenir; böylece bir işçi başka bir işçinin oturumunu silmez veya ezmez.
+    """
+
+    def __init__(self, db, update_interval: float = PERSISTENCE_UPDATE_INTERVAL, shard: tuple = None):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self._db = db
+        self._shard = shard
+        self._pending = {}
+        self._writing = {} # Yazıcı iş parçacığında yazılmakta olan parti
+        self._written = {} # user_id -> diskteki satırın hash'i
+        self._write_task = None
+
+    async def get_user_data(self) -> dict:
+        rows = await self._db.fetchall(f"SELECT user_id, {SESSION_COLUMNS} FROM active_quiz_sessions")
+        user_data = {}
+        for user_id, *row in rows:
+            if self._shard is not None and shard_of(user_id, self._shard[1]) != self._shard[0]:
+                continue
+            try:
+                user_data[user_id] = {SESSION_KEY: QuizSession.from_row(row)}
+            except ValueError as e:
+                logger.warning(f"Kullanıcı {user_id} için kayıtlı quiz oturumu okunamadı: {e}")
+                continue
+            self._written[user_id] = hash(tuple(row))
+        logger.info(f"{len(user_data)} devam eden quiz oturumu geri yüklendi.")
+        return user_data
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        session = data.get(SESSION_KEY)
+        if session is None:
+            if user_id in self._written:
+                self._stage(user_id, None)
+            return
+        row = session.to_row()
+        if self._written.get(user_id) != hash(row):
+            self._stage(user_id, row)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        # Application.drop_user_data yalnızca SessionSweeper'dan çağrılır: oturum bellekten atılır ama
+        # kayıtlı satırı (ve bekleyen yazımı) kalır. Biten quizlerin satırları update_user_data'da silinir.
+        pass
+
+    def keep_session(self, user_id: int, session) -> None:
+        """Bellekten atılacak oturumun son halini, diskteki satırdan farklıysa yazıma alır."""
+        row = session.to_row()
+        if self._written.get(user_id) != hash(row):
+            self._stage(user_id, row)
+
+    async def load_session(self, user_id: int):
+        """Bellekten atılmış oturumu kayıtlı satırından geri yükler; satır yoksa None."""
+        # Henüz yazılmamış (veya yazılmakta olan) son hal diskteki satırdan yenidir
+        for staged in (self._pending, self._writing):
+            if user_id in staged:
+                row = staged[user_id]
+                break
+        else:
+            row = await self._db.fetchone(LOAD_SESSION_SQL, (user_id,))
+            if row is not None:
+                self._written.setdefault(user_id, hash(tuple(row)))
+        if row is None:
+            return None
+        try:
+            return QuizSession.from_row(tuple(row))
+        except ValueError as e:
+            logger.warning(f"Kullanıcı {user_id} için kayıtlı quiz oturumu okunamadı: {e}")
+            return None
+
+    async def delete_abandoned(self, before: float) -> int:
+        """Son etkinliği before'dan eski (terk edilmiş) kayıtlı oturumları siler; silinen sayısını döndürür."""
+        def _delete(conn):
+            with conn:
+                return [user_id for user_id, in conn.execute(DELETE_ABANDONED_SQL, (before,)).fetchall()]
+        user_ids = await self._db.run_write(_delete)
+        for user_id in user_ids:
+            self._written.pop(user_id, None)
+        return len(user_ids)
+
+    def _stage(self, user_id: int, row) -> None:
+        self._pending[user_id] = row
+        # update_persistence aynı turdaki tüm update_user_data çağrılarını gather ile çalıştırır;
+        # yazım görevi bunlardan sonra sıraya girdiği için turun tamamı tek işlemde yazılır.
+        if self._write_task is None:
+            self._write_task = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self) -> None:
+        """Bekleyen değişiklikleri, yazım sırasında gelenler de dahil tükenene kadar yazar."""
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                if not await self._write_batch(batch):
+                    break
+        finally:
+            self._write_task = None
+
+    async def _write_batch(self, batch: dict) -> bool:
+        upserts = [(user_id, *row) for user_id, row in batch.items() if row is not None]
+        deletes = [(user_id,) for user_id, row in batch.items() if row is None]
+
+        def _write(conn):
+            with conn:
+                conn.executemany(UPSERT_SESSION_SQL, upserts)
+                conn.executemany(DELETE_SESSION_SQL, deletes)
+        self._writing = batch
+        try:
+            await self._db.run_write(_write)
+        except Exception as e:
+            # Yazılamayan değişiklikler, daha yenileri gelmediyse bir sonraki yazıma bırakılır
+            for user_id, row in batch.items():
+                self._pending.setdefault(user_id, row)
+            logger.error(f"{len(batch)} quiz oturumu kaydedilemedi: {e}", exc_info=True)
+            return False
+        finally:
+            self._writing = {}
+        for user_id, row in batch.items():
+            if row is None:
+                self._written.pop(user_id, None)
+            else:
+                self._written[user_id] = hash(row)
+        logger.debug(f"{len(upserts)} quiz oturumu kaydedildi, {len(deletes)} oturum silindi.")
+        return True
+
+    async def flush(self) -> None:
+        """Süren yazımı bekler ve kalan değişiklikleri kapanıştan önce diske aktarır."""
+        if self._write_task is not None:
+            await self._write_task
+        if self._pending:
+            batch, self._pending = self._pending, {}
+            await self._write_batch(batch)
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass
+
+    # Oturumlar dışındaki veriler saklanmaz (store_data ile kapalıdır)
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name: str) -> dict:
+        return {}
+
+    async def update_conversation(self, name: str, key, new_state) -> None:
+        pass
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
@@ -0,0 +1,94 @@
+import json
+import logging
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+class Question(NamedTuple):
+    """'questions' tablosundaki bir satırın değiştirilemez, şıkları ayrıştırılmış hali."""
+    id: int
+    text: str
+    image_path: Optional[str]
+    answer_type: str
+    correct_answer: str
+    options: tuple # ("A) Manastır", "B) Narteks", ...)
+    explanation: str
+    donem: Optional[str]
+    sinav_turu: Optional[str]
+    correct_mask: int # Doğru şıkların bit maskesi; bit i = options[i] (quiz_session.option_bit ile aynı düzen)
+
+def option_text(option: str) -> str:
+    """Şık metnini harfinden ayırır ("A) Manastır" -> "Manastır")."""
+    return option[option.find(')') + 2:].strip()
+
+def answer_mask(options, answer_text: str) -> int:
+    """
+    Virgülle birleştirilmiş cevap metnini şıkların bit maskesine çevirir.
+    Şık metinleri virgül içerebildiği için metin bölünmez; her şıkkın metni cevapta virgüllerle
+    sınırlanmış tam bir parça olarak aranır. Cevabın şıklarla eşleşmeyen bir parçası kalırsa 0
+    döner; boş seçim onaylanamadığı için böyle bir soru hiçbir seçimle doğru sayılmaz.
+    """
+    padded = unmatched = f",{answer_text},"
+    mask = 0
+    for index, option in enumerate(options):
+        part = f",{option_text(option)},"
+        if part in padded:
+            mask |= 1 << index
+            unmatched = unmatched.replace(part, ",", 1)
+    return 0 if unmatched.strip(',') else mask
+
+def answer_text(options, mask: int) -> str:
+    """Bit maskesindeki şıkların metinlerini şık sırasıyla virgülle birleştirir; yalnızca gösterim ve kayıt içindir."""
+    return ",".join(option_text(option) for index, option in enumerate(options) if mask >> index & 1)
+
+class QuestionBank:
+    """
+    Soru tablosunun bellekteki kopyası. Tablo yalnızca soru içe aktarımında (seed_db.py, question_importer.py) değiştiği için
+    bot başlarken bir kez yüklenir; okuma yolları SQL sorgusu ve json.loads yapmadan buradan beslenir.
+    load() yeni bir anlık görüntü oluşturup tek adımda değiştirir, bu yüzden okuyucular her zaman
+    tutarlı bir görüntü görür.
+    """
+
+    def __init__(self):
+        self._by_id = MappingProxyType({})
+        self._by_sinav_turu = MappingProxyType({})
+        self._by_donem = MappingProxyType({})
+
+    def load(self, conn) -> int:
+        """Tüm soruları verilen bağlantıdan okuyup indeksleri yeniden kurar; soru sayısını döndürür."""
+        rows = conn.execute(
+            "SELECT id, text, image_path, answer_type, correct_answer, options, explanation, donem, sinav_turu, correct_mask FROM questions ORDER BY id"
+        ).fetchall()
+
+        by_id = {}
+        by_sinav_turu = {}
+        by_donem = {}
+        for q_id, text, image_path, answer_type, correct_answer, options_json, explanation, donem, sinav_turu, mask in rows:
+            options = tuple(json.loads(options_json)) if options_json else ()
+            if mask is None:
+                mask = answer_mask(options, correct_answer)
+            by_id[q_id] = Question(q_id, text, image_path, answer_type, correct_answer, options, explanation, donem, sinav_turu, mask)
+            by_sinav_turu.setdefault(sinav_turu, []).append(q_id)
+            by_donem.setdefault(donem, []).append(q_id)
+
+        self._by_id = MappingProxyType(by_id)
+        self._by_sinav_turu = MappingProxyType({key: tuple(ids) for key, ids in by_sinav_turu.items()})
+        self._by_donem = MappingProxyType({key: tuple(ids) for key, ids in by_donem.items()})
+        logger.info(f"Soru bankası belleğe yüklendi: {len(by_id)} soru.")
+        return len(by_id)
+
+    def get(self, question_id: int) -> Optional[Question]:
+        """ID'ye göre soruyu döndürür; yoksa None."""
+        return self._by_id.get(question_id)
+
+    def ids_for_exam(self, sinav_turu: str) -> tuple:
+        """Verilen sınav türüne ait soru ID'lerini döndürür."""
+        return self._by_sinav_turu.get(sinav_turu, ())
+
+    def ids_for_donem(self, donem: str) -> tuple:
+        """Verilen döneme ait soru ID'lerini döndürür."""
+        return self._by_donem.get(donem, ())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
@@ -0,0 +1,332 @@
+"""
+Soruları JSONL veya CSV dosyalarından akış halinde okuyup 'questions' tablosuna yazan içe aktarıcı.
+
+Dosyalar satır satır okunur; her soru doğrulanır, process_question_options() ile normalize edilir
+ve içerik hash'ine (migrations.question_content_hash: sınav türü, dönem ve soru metni) göre
+upsert edilir. Tüm dosyalar tek bir işlemde, IMPORT_BATCH_SIZE'lık executemany gruplarıyla yazılır.
+Daha önce içe aktarılmış bir soru aynı ID ile güncellenir; şıklar hash'ten tohumlanan bir
+karıştırmayla dizildiği için değişmeyen sorular yeniden yazılmaz. Dosyalarda olmayan sorular
+silinmez, böylece user_answers geçmişi hiçbir zaman sahipsiz kalmaz. Bot, soru bankasını
+açılışta yüklediğinden değişiklikler bir sonraki başlatmada görünür.
+
+JSONL: her satır bir JSON nesnesi; 'options' ve 'correct_answer' liste veya metin olabilir.
+CSV: başlık satırında alan adları; 'options' JSON listesi ya da '|' ile ayrılmış metin,
+'correct_answer' virgülle ayrılmış şık harfleri veya şık metinleri.
+Zorunlu alanlar: text, options, correct_answer, sinav_turu. İsteğe bağlı: image_path, explanation, donem.
+
+'Hiçbiri' cevabını belirleyen açıklama ifadeleri hicbiri_ifadeleri.txt dosyasından (veya --phrases)
+okunur ve tek bir derlenmiş desende aranır. Büyük içe aktarımlarda --workers ile normalizasyon
+bir süreç havuzuna dağıtılır; veritabanına yazım yine ana süreçte, tek işlemde yapılır.
+
+Kullanım: python question_importer.py sorular.jsonl [diger.csv ...] [--dry-run] [--workers 4] [--phrases ifadeler.txt]
+"""
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import string
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from database import get_db_connection
+from migrations import migrate, question_content_hash
+from question_bank import answer_mask
+
+logger = logging.getLogger(__name__)
+
+# --- İçe Aktarım Ayarları ---
+IMPORT_BATCH_SIZE = 1000 # Bir executemany çağrısında yazılan soru sayısı
+CSV_OPTION_SEPARATOR = '|'
+IMPORT_WORKERS = 1 # Normalizasyon için süreç sayısı; 1 ise ana süreçte yapılır
+NORMALIZE_CHUNK_SIZE = 500 # Süreç havuzuna tek seferde gönderilen soru sayısı
+NONE_ANSWER_PHRASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hicbiri_ifadeleri.txt')
+
+REQUIRED_FIELDS = ('text', 'options', 'correct_answer', 'sinav_turu')
+QUESTION_COLUMNS = "content_hash, text, image_path, answer_type, correct_answer, options, explanation, donem, sinav_turu, correct_mask"
+UPDATED_COLUMNS = ('text', 'image_path', 'answer_type', 'correct_answer', 'options', 'explanation', 'correct_mask')
+UPSERT_QUESTION_SQL = f"""
+    INSERT INTO questions ({QUESTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(content_hash) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column in UPDATED_COLUMNS)}
+    WHERE {' OR '.join(f'questions.{column} IS NOT excluded.{column}' for column in UPDATED_COLUMNS)}
+"""
+
+class QuestionImportError(ValueError):
+    """Kaynak dosyadaki bir soru doğrulanamadığında fırlatılır."""
+
+def load_none_answer_phrases(path: str = NONE_ANSWER_PHRASES_PATH) -> tuple:
+    """İfade dosyasını okur; boş satırlar ve '#' ile başlayan satırlar atlanır."""
+    with open(path, encoding='utf-8') as f:
+        phrases = {line.strip().lower() for line in f if line.strip() and not line.lstrip().startswith('#')}
+    return tuple(sorted(phrases))
+
+def _trie_pattern(node: dict) -> str:
+    """İfade ağacının bir düğümünü desene çevirir; '' anahtarı bir ifadenin burada bittiğini gösterir."""
+    if '' in node:
+        # Daha kısa bir ifade burada tamamlandı; devamı eşleşmenin varlığını değiştirmez
+        return ''
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items())]
+    return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+def compile_none_answer_matcher(phrases) -> re.Pattern:
+    """
+    Tüm ifadeleri tek geçişte arayan derlenmiş bir desen.
+    İfadeler önce bir önek ağacında (trie) birleştirilir; böylece re modülü her konumda ifadeleri
+    tek tek denemek yerine ortak önekleri bir kez okur ve süre ifade sayısıyla neredeyse büyümez.
+    """
+    if not phrases:
+        return re.compile(r'(?!)') # Hiçbir şeyle eşleşmez
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return re.compile(_trie_pattern(trie))
+
+_none_answer_matcher = None
+
+def none_answer_matcher() -> re.Pattern:
+    """Varsayılan ifade dosyasından derlenen desen; ilk kullanımda bir kez yüklenir."""
+    global _none_answer_matcher
+    if _none_answer_matcher is None:
+        _none_answer_matcher = compile_none_answer_matcher(load_none_answer_phrases())
+    return _none_answer_matcher
+
+def use_none_answer_phrases(path: str) -> None:
+    """Bu süreçteki içe aktarımların 'Hiçbiri' ifadelerini verilen dosyadan almasını sağlar."""
+    global _none_answer_matcher
+    _none_answer_matcher = compile_none_answer_matcher(load_none_answer_phrases(path))
+
+def process_question_options(question, rng=random, matcher: re.Pattern = None):
+    """
+    Her soruya 'F) Hiçbiri' seçeneğini ekler ve şıkları büyük harf A) B) şeklinde yeniden düzenler.
+    Ayrıca, açıklaması 'doğru cevap yoktu' anlamına gelen soruların doğru cevabını 'Hiçbiri' olarak ayarlar;
+    bu ifadeler NONE_ANSWER_PHRASES_PATH dosyasından derlenen tek bir desenle aranır.
+    Son olarak, correct_answer'ı şık harfinden şık metnine dönüştürür.
+    Şıkları rastgele karıştırır; aynı sırayı yeniden üretmek için tohumlu bir random.Random verilebilir.
+    """
+    original_options_list = json.loads(question["options"])
+
+    # Mevcut şıklardaki harfleri temizle ve sadece metni al; harf -> metin haritası da bir kez kurulur.
+    # Kaynakta küçük harfli şıklar da var ("d) Karolenj"); ilk eşleşen şık geçerlidir.
+    cleaned_options_text = []
+    original_letter_map = {}
+    for opt in original_options_list:
+        close = opt.find(')')
+        if close == -1:
+            cleaned_options_text.append(opt)
+            continue
+        cleaned_options_text.append(opt[close + 2:])
+        if close == 1:
+            original_letter_map.setdefault(opt[0].upper(), opt[close + 2:].strip())
+
+    # Eğer 'Hiçbiri' seçeneği yoksa ekle
+    if "Hiçbiri" not in cleaned_options_text:
+        cleaned_options_text.append("Hiçbiri")
+
+    # Şıkları karıştır ve A) B) C) ... şeklinde yeniden etiketle
+    rng.shuffle(cleaned_options_text)
+    question["options"] = json.dumps([f"{string.ascii_uppercase[i]}) {opt_text}" for i, opt_text in enumerate(cleaned_options_text)])
+
+    # Açıklamada "doğru cevap yoktur" veya "bulunmamaktadır" gibi ifadeler varsa,
+    # correct_answer'ı "Hiçbiri" olarak ayarla.
+    if (matcher or none_answer_matcher()).search(question["explanation"].lower()):
+        question["correct_answer"] = "Hiçbiri"
+
+    # correct_answer hala harf içeriyorsa (eski veriden kalma) metne dönüştür; "F" her zaman "Hiçbiri"dir.
+    # Bulunamayan harfler olduğu gibi bırakılır.
+    converted_answers = []
+    for ans_part in question["correct_answer"].split(','):
+        if ans_part == 'F':
+            converted_answers.append("Hiçbiri")
+        elif len(ans_part) == 1 and ans_part in string.ascii_uppercase:
+            converted_answers.append(original_letter_map.get(ans_part) or ans_part)
+        else: # Zaten metin formatındaysa
+            converted_answers.append(ans_part)
+    question["correct_answer"] = ",".join(converted_answers)
+
+    # Tüm soruları double_choice olarak ayarla
+    question["answer_type"] = "double_choice"
+
+    return question
+
+def _as_list(value, separator: str) -> list:
+    """Liste, JSON listesi metni veya ayraçla bölünmüş metni temizlenmiş metin listesine çevirir."""
+    if isinstance(value, str):
+        value = value.strip()
+        value = json.loads(value) if value.startswith('[') else value.split(separator)
+    if not isinstance(value, list):
+        raise QuestionImportError(f"liste bekleniyordu: {value!r}")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def prepare_question(raw: dict) -> tuple:
+    """
+    Kaynaktan okunan bir soruyu doğrular ve normalize eder.
+    UPSERT_QUESTION_SQL parametre sırasıyla bir satır döndürür; geçersizse QuestionImportError fırlatır.
+    """
+    missing = [field for field in REQUIRED_FIELDS if not raw.get(field)]
+    if missing:
+        raise QuestionImportError(f"eksik alan(lar): {', '.join(missing)}")
+    try:
+        options = _as_list(raw['options'], CSV_OPTION_SEPARATOR)
+        correct = _as_list(raw['correct_answer'], ',')
+    except json.JSONDecodeError as e:
+        raise QuestionImportError(f"şıklar okunamadı: {e}") from None
+    if not 2 <= len(options) < len(string.ascii_uppercase):
+        raise QuestionImportError(f"şık sayısı geçersiz: {len(options)}")
+    if not correct:
+        raise QuestionImportError("doğru cevap boş")
+
+    text = str(raw['text']).strip()
+    sinav_turu = str(raw['sinav_turu']).strip()
+    donem = str(raw['donem']).strip() if raw.get('donem') else None
+    content_hash = question_content_hash(text, sinav_turu, donem)
+    question = process_question_options({
+        "options": json.dumps(options, ensure_ascii=False),
+        "correct_answer": ",".join(correct),
+        "explanation": str(raw.get('explanation') or ""),
+    }, rng=random.Random(content_hash))
+
+    # Doğru cevap, şık sırasındaki bit maskesi olarak da saklanır; her parçası bir şıkla eşleşmelidir
+    correct_mask = answer_mask(json.loads(question["options"]), question["correct_answer"])
+    if not correct_mask:
+        raise QuestionImportError(f"doğru cevap şıklarda yok: {question['correct_answer']}")
+
+    return (
+        content_hash, text, raw.get('image_path') or None, question["answer_type"], question["correct_answer"],
+        question["options"], question["explanation"], donem, sinav_turu, correct_mask,
+    )
+
+def read_questions(path: str):
+    """Dosyadaki soruları (konum, ham sözlük) çiftleri olarak tek tek üretir."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if extension == '.csv':
+            reader = csv.DictReader(f)
+            for raw in reader:
+                yield f"{path}:{reader.line_num}", raw
+        elif extension in ('.jsonl', '.ndjson'):
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raw = e
+                yield f"{path}:{line_no}", raw
+        else:
+            raise ValueError(f"Desteklenmeyen soru dosyası türü: {path} (.jsonl veya .csv bekleniyor)")
+
+def _prepare_record(record: tuple) -> tuple:
+    location, raw = record
+    try:
+        if not isinstance(raw, dict):
+            raise QuestionImportError(f"soru nesnesi okunamadı: {raw}")
+        return location, prepare_question(raw), None
+    except QuestionImportError as e:
+        return location, None, str(e)
+
+def _prepare_chunk(chunk: list) -> list:
+    return [_prepare_record(record) for record in chunk]
+
+def _init_worker(phrases_path) -> None:
+    if phrases_path:
+        use_none_answer_phrases(phrases_path)
+
+def normalize_records(records, workers: int = IMPORT_WORKERS, phrases_path: str = None):
+    """
+    İçe aktarımın normalizasyon aşaması: (konum, ham sözlük) akışından (konum, satır, hata) üretir.
+    workers > 1 ise kayıtlar NORMALIZE_CHUNK_SIZE'lık parçalar halinde süreç havuzuna dağıtılır;
+    çıktı sırası korunur ve bellekte en fazla workers * 2 parça bekler.
+    """
+    if workers <= 1:
+        _init_worker(phrases_path)
+        for record in records:
+            yield _prepare_record(record)
+        return
+    records = iter(records)
+    chunks = iter(lambda: list(itertools.islice(records, NORMALIZE_CHUNK_SIZE)), [])
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(phrases_path,)) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_prepare_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def import_questions(conn, records, batch_size: int = IMPORT_BATCH_SIZE, dry_run: bool = False,
+                     workers: int = IMPORT_WORKERS, phrases_path: str = None) -> Counter:
+    """
+    (konum, ham sözlük) çiftlerini normalize_records() ile işleyip tek bir işlemde upsert eder.
+    Geçersiz sorular atlanıp loglanır. 'inserted', 'updated', 'unchanged', 'duplicate' ve
+    'invalid' sayılarını döndürür; dry_run ise işlem geri alınır.
+    """
+    stats = Counter()
+    known = {content_hash for (content_hash,) in conn.execute("SELECT content_hash FROM questions WHERE content_hash IS NOT NULL")}
+    seen = set()
+    batch = []
+    conn.commit()
+    conn.execute("BEGIN")
+    changes_before = conn.total_changes
+    try:
+        for location, row, error in normalize_records(records, workers, phrases_path):
+            if error is not None:
+                stats['invalid'] += 1
+                logger.warning(f"{location}: soru atlandı, {error}")
+                continue
+            if row[0] in seen:
+                stats['duplicate'] += 1
+                logger.warning(f"{location}: aynı soru bu içe aktarımda zaten var, atlandı.")
+                continue
+            seen.add(row[0])
+            if row[0] not in known:
+                stats['inserted'] += 1
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.executemany(UPSERT_QUESTION_SQL, batch)
+                batch.clear()
+        if batch:
+            conn.executemany(UPSERT_QUESTION_SQL, batch)
+        stats['updated'] = conn.total_changes - changes_before - stats['inserted']
+        stats['unchanged'] = len(seen) - stats['inserted'] - stats['updated']
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return stats
+
+def import_files(conn, paths: list, dry_run: bool = False, workers: int = IMPORT_WORKERS, phrases_path: str = None) -> Counter:
+    """Dosyaları sırayla okuyup import_questions() ile tek işlemde içe aktarır."""
+    records = itertools.chain.from_iterable(read_questions(path) for path in paths)
+    return import_questions(conn, records, dry_run=dry_run, workers=workers, phrases_path=phrases_path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help=".jsonl veya .csv soru dosyaları")
+    parser.add_argument('--dry-run', action='store_true', help="Doğrula ve say, veritabanına yazma")
+    parser.add_argument('--workers', type=int, default=IMPORT_WORKERS, help="Normalizasyon için süreç sayısı")
+    parser.add_argument('--phrases', default=None, help="'Hiçbiri' ifade dosyası (varsayılan: hicbiri_ifadeleri.txt)")
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+    conn = get_db_connection()
+    migrate(conn)
+    started = time.perf_counter()
+    stats = import_files(conn, args.paths, dry_run=args.dry_run, workers=args.workers, phrases_path=args.phrases)
+    conn.close()
+    print(
+        f"{'(deneme, yazılmadı) ' if args.dry_run else ''}{stats['inserted']} yeni, {stats['updated']} güncellenen, "
+        f"{stats['unchanged']} değişmeyen soru; {stats['duplicate']} tekrar, {stats['invalid']} geçersiz satır "
+        f"({time.perf_counter() - started:.2f} sn)."
+    )
+    if stats['invalid']:
+        raise SystemExit(1)
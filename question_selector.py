@@ -0,0 +1,169 @@
+"""
+Kullanıcıya göre uyarlanan soru seçimi.
+
+Her kullanıcı ve sınav türü için bir seçim indeksi (SelectionIndex) tutulur:
+  - Görülmüş sorular, tekrar sorulabilecekleri cevap sırasına (due) göre bir yığında (heap) durur.
+    Yanlış cevaplanan soru WRONG_RETRY_GAP cevap sonra, doğru cevaplanan ise CORRECT_RETRY_GAP
+    cevap sonra yeniden sorulabilir; art arda doğru cevaplar bu aralığı ikiye katlar.
+  - Görülmemiş sorular, sınav türünün paylaşılan karışık sırası üzerinde kullanıcıya özgü bir
+    başlangıçtan ilerleyen bir imleçle bulunur; imleç görülmüş soruları bir kez atlar ve geri dönmez.
+Sıradaki soru: vakti gelmiş bir tekrar varsa o, yoksa görülmemiş bir soru, o da yoksa vakti en
+yakın tekrar. Seçim yığının tepesinden O(log n) ile yapılır ve user_answers tablosuna dokunmaz;
+indeks cevap kaydı yolundan (record) artımlı olarak güncellenir. Tablo yalnızca bellekte indeksi
+olmayan bir kullanıcıya soru sorulacağında (quiz başı, yeniden başlatmadan sonra geri yüklenen quiz
+ya da önbellekten atılmış bir kullanıcı), kullanıcının cevaplarını bir kez okumak için kullanılır.
+İndeks yalnızca olay döngüsünden kullanılır.
+"""
+import heapq
+import logging
+import random
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# --- Uyarlanabilir Seçim Ayarları ---
+WRONG_RETRY_GAP = 3 # Yanlış cevaplanan soru en erken bu kadar cevap sonra yeniden sorulur
+CORRECT_RETRY_GAP = 20 # Doğru cevaplanan soru en erken bu kadar cevap sonra; her art arda doğru aralığı ikiye katlar
+MAX_RETRY_DOUBLINGS = 6
+MAX_TRACKED_USERS = 5000 # Bellekte indeksi tutulan en fazla kullanıcı; aşılırsa en uzun süredir kullanılmayan atılır
+
+HISTORY_SQL = "SELECT question_id, is_correct FROM user_answers WHERE user_id = ? ORDER BY id"
+
+class SelectionIndex:
+    """Bir kullanıcının bir sınav türündeki soru seçim indeksi."""
+    __slots__ = ('order', 'offset', 'visited', 'seen', 'heap')
+
+    def __init__(self, order: tuple, offset: int):
+        self.order = order # Sınav türünün paylaşılan karışık soru sırası
+        self.offset = offset
+        self.visited = 0 # İmlecin order üzerinde ilerlediği adım sayısı
+        self.seen = {} # question_id -> (due, art arda doğru sayısı)
+        self.heap = [] # (due, question_id); seen ile uyuşmayan girdiler eskimiştir
+
+    def record(self, question_id: int, is_correct: bool, seq: int) -> None:
+        _, streak = self.seen.get(question_id, (0, 0))
+        if is_correct:
+            streak += 1
+            due = seq + (CORRECT_RETRY_GAP << min(streak - 1, MAX_RETRY_DOUBLINGS))
+        else:
+            streak = 0
+            due = seq + WRONG_RETRY_GAP
+        self.seen[question_id] = (due, streak)
+        heapq.heappush(self.heap, (due, question_id))
+        # Eskimiş girdiler yığını şişirmesin diye ara ara yığın yeniden kurulur
+        if len(self.heap) > 2 * len(self.seen) + 32:
+            self.heap = [(due, q_id) for q_id, (due, _) in self.seen.items()]
+            heapq.heapify(self.heap)
+
+    def _top(self, exclude):
+        """Eskimemiş ve dışlanmamış en erken tekrarı (due, question_id) olarak döndürür; yoksa None."""
+        heap, seen, skipped, top = self.heap, self.seen, [], None
+        while heap:
+            due, question_id = heap[0]
+            if seen.get(question_id, (None,))[0] != due:
+                heapq.heappop(heap)
+            elif question_id in exclude:
+                skipped.append(heapq.heappop(heap))
+            else:
+                top = heap[0]
+                break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return top
+
+    def _next_unseen(self, exclude):
+        order, n = self.order, len(self.order)
+        while self.visited < n:
+            question_id = order[(self.offset + self.visited) % n]
+            self.visited += 1
+            if question_id not in self.seen and question_id not in exclude:
+                return question_id
+        return None
+
+    def next_question(self, seq: int, exclude=()):
+        """Sıradaki soruyu seçer; exclude (ör. bu quizde sorulmuş sorular) atlanır. Soru yoksa None."""
+        top = self._top(exclude)
+        if top is not None and top[0] <= seq:
+            return top[1]
+        question_id = self._next_unseen(exclude)
+        if question_id is not None:
+            return question_id
+        return top[1] if top is not None else None
+
+class UserSelection:
+    """Bir kullanıcının tüm sınav türlerindeki indeksleri ve toplam cevap sayacı."""
+    __slots__ = ('seq', 'exams')
+
+    def __init__(self):
+        self.seq = 0
+        self.exams = {} # sinav_turu -> SelectionIndex
+
+class AdaptiveSelector:
+    """Kullanıcı başına seçim indekslerini tutan, sınırlı (LRU) bellek içi önbellek."""
+
+    def __init__(self, question_bank, max_users: int = MAX_TRACKED_USERS):
+        self._bank = question_bank
+        self._max_users = max_users
+        self._users = OrderedDict() # user_id -> UserSelection
+        self._orders = {} # sinav_turu -> karışık soru sırası
+
+    def clear(self) -> None:
+        """Soru bankası yeniden yüklendiğinde tüm indeksleri atar."""
+        self._users.clear()
+        self._orders.clear()
+
+    def forget(self, user_id: int) -> None:
+        """Kullanıcının indeksini atar (ör. istatistikleri sıfırlandığında)."""
+        self._users.pop(user_id, None)
+
+    def is_loaded(self, user_id: int) -> bool:
+        return user_id in self._users
+
+    def _index(self, user: UserSelection, sinav_turu: str) -> SelectionIndex:
+        index = user.exams.get(sinav_turu)
+        if index is None:
+            order = self._orders.get(sinav_turu)
+            if order is None:
+                order = list(self._bank.ids_for_exam(sinav_turu))
+                random.shuffle(order)
+                order = self._orders[sinav_turu] = tuple(order)
+            index = user.exams[sinav_turu] = SelectionIndex(order, random.randrange(len(order)) if order else 0)
+        return index
+
+    def _user(self, user_id: int) -> UserSelection:
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = UserSelection()
+            if len(self._users) > self._max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return user
+
+    def load(self, user_id: int, history) -> None:
+        """Kullanıcının indeksini (question_id, is_correct) geçmişinden, eskiden yeniye kurar."""
+        self._users.pop(user_id, None)
+        user = self._user(user_id)
+        for question_id, is_correct in history:
+            self._record(user, question_id, is_correct)
+
+    def record(self, user_id: int, question_id: int, is_correct: bool) -> None:
+        """Onaylanan bir cevabı indekse işler; indeksi bellekte olmayan kullanıcılar atlanır."""
+        user = self._users.get(user_id)
+        if user is not None:
+            self._record(user, question_id, is_correct)
+
+    def _record(self, user: UserSelection, question_id: int, is_correct: bool) -> None:
+        question = self._bank.get(question_id)
+        if question is None:
+            return
+        user.seq += 1
+        self._index(user, question.sinav_turu).record(question_id, bool(is_correct), user.seq)
+
+    def next_question(self, user_id: int, sinav_turu: str, exclude=()):
+        """
+        Kullanıcı için sınav türünden sıradaki soruyu seçer; soru yoksa None. Kullanıcının indeksi
+        önce load() ile geçmişinden kurulmalıdır; kurulmamışsa boş bir indeks geçmişi yok sayar.
+        """
+        user = self._user(user_id)
+        return self._index(user, sinav_turu).next_question(user.seq, exclude)
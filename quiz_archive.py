@@ -0,0 +1,172 @@
+"""
+Eski quiz oturumlarını sıkıştırılmış arşiv dosyalarına taşır.
+
+Başlangıcı ARCHIVE_AFTER_DAYS günden eski quizler, cevaplarıyla birlikte ARCHIVE_DIR altındaki
+gzip'li JSONL dosyalarına (her satır bir quiz) yazılır ve ardından 'quiz_sessions' ile
+'user_answers' tablolarından silinir; böylece sıcak tablolar küçük kalır. 'user_stats' toplamları
+silinmez, /istatistik ve /liderler arşivlenen quizleri saymaya devam eder.
+
+Her parti ARCHIVE_BATCH_SESSIONS quizdir ve dosya adı partideki ilk ve son quiz ID'sini taşır.
+Dosya, satırlar silinmeden önce diske yazılır; silme başarısız olursa aynı parti bir sonraki
+çalışmada aynı dosyanın üzerine yeniden yazılır.
+
+Hiçbir quize bağlı olmayan (session_id'si boş) cevaplar da (quiz oturumlarından önceki geçmiş,
+session_id'siz geri yüklenen quizler) aynı sınırla, ARCHIVE_BATCH_ANSWERS cevaplık partiler halinde
+kullanıcıya göre gruplanarak ayrı dosyalara (her satır bir kullanıcı) arşivlenir.
+
+Kullanım: python quiz_archive.py [--days 90] [--dir arsiv]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# --- Quiz Arşivi Ayarları ---
+ARCHIVE_DIR = 'arsiv' # Arşiv dosyalarının yazılacağı klasör
+ARCHIVE_AFTER_DAYS = 90 # Başlangıcı bu kadar günden eski quizler arşivlenir
+ARCHIVE_BATCH_SESSIONS = 1000 # Bir arşiv dosyasına (ve bir silme işlemine) giren en fazla quiz
+ARCHIVE_BATCH_ANSWERS = 10000 # Bir arşiv dosyasına giren en fazla quiz dışı cevap
+ARCHIVE_INTERVAL = 24 * 60 * 60 # Botun arşivlemeyi kaç saniyede bir çalıştıracağı
+
+SESSION_FIELDS = ('id', 'user_id', 'sinav_turu', 'quiz_length', 'started_at', 'finished_at', 'answered', 'correct')
+ANSWER_FIELDS = ('id', 'question_id', 'user_answer', 'is_correct', 'timestamp', 'answer_time_seconds')
+
+OLD_SESSIONS_SQL = f"""
+    SELECT {', '.join(SESSION_FIELDS)} FROM quiz_sessions
+    WHERE started_at < ? ORDER BY started_at, id LIMIT ?
+"""
+# Kısmi indeks yalnızca session_id'si boş satırları (timestamp, id) sırasıyla içerir; planlayıcı aksi
+# halde idx_user_answers_session'ı seçip tüm eski satırları geçici bir B-tree'de sıralıyordu
+OLD_UNSESSIONED_ANSWERS_SQL = f"""
+    SELECT user_id, {', '.join(ANSWER_FIELDS)} FROM user_answers INDEXED BY idx_user_answers_unsessioned
+    WHERE session_id IS NULL AND timestamp < ? ORDER BY timestamp, id LIMIT ?
+"""
+
+def archive_cutoff(days: float = ARCHIVE_AFTER_DAYS) -> str:
+    """SQLite'ın CURRENT_TIMESTAMP biçiminde (UTC) arşivleme sınırı."""
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+def _chunks(values: list, size: int = 500):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _write_archive(path: str, records) -> None:
+    temp_path = path + '.tmp'
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def _session_records(sessions: list, answers: dict):
+    for session in sessions:
+        record = dict(zip(SESSION_FIELDS, session))
+        record['answers'] = [dict(zip(ANSWER_FIELDS, row)) for row in answers.get(session[0], ())]
+        yield record
+
+def archive_batch(conn, cutoff: str, directory: str = ARCHIVE_DIR, batch_size: int = ARCHIVE_BATCH_SESSIONS) -> int:
+    """Sınırdan eski en fazla batch_size quizi arşivler ve siler; arşivlenen quiz sayısını döndürür."""
+    sessions = conn.execute(OLD_SESSIONS_SQL, (cutoff, batch_size)).fetchall()
+    if not sessions:
+        return 0
+    session_ids = [session[0] for session in sessions]
+    answers = {}
+    for chunk in _chunks(session_ids):
+        rows = conn.execute(
+            f"SELECT session_id, {', '.join(ANSWER_FIELDS)} FROM user_answers "
+            f"WHERE session_id IN ({','.join('?' * len(chunk))}) ORDER BY session_id, id", chunk
+        ).fetchall()
+        for session_id, *row in rows:
+            answers.setdefault(session_id, []).append(row)
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"quiz_oturumlari_{min(session_ids):08d}-{max(session_ids):08d}.jsonl.gz")
+    _write_archive(path, _session_records(sessions, answers))
+    with conn:
+        for chunk in _chunks(session_ids):
+            placeholders = ','.join('?' * len(chunk))
+            conn.execute(f"DELETE FROM user_answers WHERE session_id IN ({placeholders})", chunk)
+            conn.execute(f"DELETE FROM quiz_sessions WHERE id IN ({placeholders})", chunk)
+    logger.info(f"{len(sessions)} quiz ve {sum(map(len, answers.values()))} cevap {path} dosyasına arşivlendi.")
+    return len(sessions)
+
+def archive_unsessioned_batch(conn, cutoff: str, directory: str = ARCHIVE_DIR,
+                              batch_size: int = ARCHIVE_BATCH_ANSWERS) -> int:
+    """Sınırdan eski, quize bağlı olmayan en fazla batch_size cevabı arşivler ve siler; cevap sayısını döndürür."""
+    rows = conn.execute(OLD_UNSESSIONED_ANSWERS_SQL, (cutoff, batch_size)).fetchall()
+    if not rows:
+        return 0
+    by_user = {}
+    for user_id, *row in rows:
+        by_user.setdefault(user_id, []).append(row)
+    answer_ids = [row[1] for row in rows]
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"quiz_disi_cevaplar_{min(answer_ids):08d}-{max(answer_ids):08d}.jsonl.gz")
+    _write_archive(path, (
+        {'user_id': user_id, 'answers': [dict(zip(ANSWER_FIELDS, row)) for row in sorted(user_rows)]}
+        for user_id, user_rows in sorted(by_user.items())
+    ))
+    with conn:
+        for chunk in _chunks(answer_ids):
+            conn.execute(f"DELETE FROM user_answers WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+    logger.info(f"{len(by_user)} kullanıcının quiz dışı {len(rows)} cevabı {path} dosyasına arşivlendi.")
+    return len(rows)
+
+def archive_sessions(conn, days: float = ARCHIVE_AFTER_DAYS, directory: str = ARCHIVE_DIR,
+                     batch_size: int = ARCHIVE_BATCH_SESSIONS) -> int:
+    """Sınırdan eski tüm quizleri partiler halinde arşivler; toplam arşivlenen quiz sayısını döndürür."""
+    cutoff = archive_cutoff(days)
+    total = 0
+    while True:
+        archived = archive_batch(conn, cutoff, directory, batch_size)
+        if not archived:
+            return total
+        total += archived
+
+def archive_unsessioned_answers(conn, days: float = ARCHIVE_AFTER_DAYS, directory: str = ARCHIVE_DIR,
+                                batch_size: int = ARCHIVE_BATCH_ANSWERS) -> int:
+    """Sınırdan eski, quize bağlı olmayan tüm cevapları partiler halinde arşivler; toplam cevap sayısını döndürür."""
+    cutoff = archive_cutoff(days)
+    total = 0
+    while True:
+        archived = archive_unsessioned_batch(conn, cutoff, directory, batch_size)
+        if not archived:
+            return total
+        total += archived
+
+async def archive_forever(db, interval: float = ARCHIVE_INTERVAL, days: float = ARCHIVE_AFTER_DAYS,
+                          directory: str = ARCHIVE_DIR) -> None:
+    """Eski quizleri düzenli aralıklarla arşivler; her parti yazıcı iş parçacığında ayrı çalışır."""
+    while True:
+        await asyncio.sleep(interval)
+        cutoff = archive_cutoff(days)
+        try:
+            for archive in (archive_batch, archive_unsessioned_batch):
+                while await db.run_write(archive, cutoff, directory):
+                    pass
+        except Exception as e:
+            logger.error(f"Eski quizler arşivlenemedi: {e}", exc_info=True)
+
+if __name__ == '__main__':
+    # migrations, sorgu planı kontrolü için bu modülün sorgularını içe aktarır
+    from migrations import migrate
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=float, default=ARCHIVE_AFTER_DAYS, help="Başlangıcı bu kadar günden eski quizleri arşivle")
+    parser.add_argument('--dir', default=ARCHIVE_DIR, help="Arşiv dosyalarının klasörü")
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+    conn = get_db_connection()
+    migrate(conn)
+    archived = archive_sessions(conn, args.days, args.dir)
+    unsessioned = archive_unsessioned_answers(conn, args.days, args.dir)
+    conn.close()
+    print(f"{archived} quiz ve quiz dışı {unsessioned} cevap arşivlendi.")
@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- Oturum Ayarları ---
+SESSION_KEY = 'quiz' # Oturumun context.user_data içindeki anahtarı
+SESSION_IDLE_TTL = 30 * 60 # Bu kadar saniye dokunulmayan oturum bellekten atılır (kayıtlı kopyası kalır)
+SESSION_ABANDON_TTL = 7 * 24 * 60 * 60 # Bu kadar saniye dokunulmayan quiz terk edilmiş sayılır ve kayıtlı kopyası da silinir
+MAX_ACTIVE_SESSIONS = 5000 # Bellekte tutulacak en fazla oturum; aşılırsa en uzun süredir boşta olanlar atılır
+SESSION_SWEEP_INTERVAL = 60 # Temizlik taramasının kaç saniyede bir çalışacağı
+
+def option_bit(letter: str) -> int:
+    """Şık harfinin seçim maskesindeki bitini döndürür ('A' -> 1, 'B' -> 2, 'C' -> 4...)."""
+    return 1 << (ord(letter) - ord('A'))
+
+class QuizSession:
+    """
+    Bir kullanıcının devam eden quizinin durumu. Serbest biçimli sözlük yerine sabit alanlı
+    (__slots__) bir nesnedir; seçili şıklar tek bir tamsayıda bit maskesi olarak tutulur.
+    """
+    __slots__ = (
+        'sinav_turu', 'deck', 'position', 'answered', 'correct',
+        'quiz_started_at', 'question_started_at', 'last_active', 'selected', 'message_id', 'length', 'session_id',
+    )
+
+    def __init__(self, sinav_turu: str, deck: tuple, now: float = None, length: int = None, session_id: int = None):
+        now = time.time() if now is None else now
+        self.sinav_turu = sinav_turu
+        self.deck = tuple(deck) # Sorulan (ve önceden çekildiyse sorulacak) soru ID'leri
+        self.length = len(self.deck) if length is None else length # Quizdeki toplam soru sayısı
+        self.session_id = session_id # 'quiz_sessions' satırı; cevaplar bu ID ile kaydedilir
+        self.position = 0 # Destede sıradaki sorunun indeksi
+        self.answered = 0
+        self.correct = 0
+        self.quiz_started_at = now
+        self.question_started_at = now
+        self.last_active = now
+        self.selected = 0 # Seçili şıkların bit maskesi
+        self.message_id = None # Son gönderilen soru mesajı
+
+    @property
+    def quiz_length(self) -> int:
+        return self.length
+
+    @property
+    def finished(self) -> bool:
+        return self.answered >= self.length
+
+    def next_question_id(self, choose=None):
+        """
+        Destedeki sıradaki soru ID'sini verir. Deste bittiyse ve quiz sürüyorsa soru choose(deck)
+        ile seçilip desteye eklenir; soru kalmadıysa None.
+        """
+        if self.position >= len(self.deck):
+            if choose is None or self.position >= self.length:
+                return None
+            question_id = choose(self.deck)
+            if question_id is None:
+                return None
+            self.deck += (question_id,)
+        question_id = self.deck[self.position]
+        self.position += 1
+        return question_id
+
+    def toggle(self, letter: str) -> None:
+        self.selected ^= option_bit(letter)
+
+    def is_selected(self, letter: str) -> bool:
+        return bool(self.selected & option_bit(letter))
+
+    def selected_letters(self) -> list:
+        """Seçili şık harflerini alfabetik sırayla döndürür."""
+        letters = []
+        mask, index = self.selected, 0
+        while mask:
+            if mask & 1:
+                letters.append(chr(ord('A') + index))
+            mask >>= 1
+            index += 1
+        return letters
+
+    def record_answer(self, is_correct: bool, now: float = None) -> None:
+        """Onaylanan cevabı sayar, seçimi temizler ve sıradaki sorunun süresini başlatır."""
+        self.answered += 1
+        if is_correct:
+            self.correct += 1
+        self.selected = 0
+        self.question_started_at = time.time() if now is None else now
+
+    def touch(self, now: float = None) -> None:
+        self.last_active = time.time() if now is None else now
+
+    def to_row(self) -> tuple:
+        """'active_quiz_sessions' tablosundaki satır karşılığı (user_id hariç)."""
+        return (
+            self.sinav_turu, ','.join(map(str, self.deck)), self.position, self.answered, self.correct,
+            self.quiz_started_at, self.question_started_at, self.last_active, self.selected, self.message_id, self.length, self.session_id,
+        )
+
+    @classmethod
+    def from_row(cls, row) -> 'QuizSession':
+        """to_row() çıktısından oturumu yeniden kurar."""
+        sinav_turu, deck, position, answered, correct, quiz_started_at, question_started_at, last_active, selected, message_id, length, session_id = row
+        # quiz_length boşsa (eski oturumlar) quiz uzunluğu deste boyudur
+        session = cls(sinav_turu, tuple(int(q_id) for q_id in deck.split(',') if q_id), quiz_started_at, length, session_id)
+        session.position = position
+        session.answered = answered
+        session.correct = correct
+        session.question_started_at = question_started_at
+        session.last_active = last_active
+        session.selected = selected
+        session.message_id = message_id
+        return session
+
+class SessionSweeper:
+    """
+    Application.user_data içindeki boşta kalmış quiz oturumlarını düzenli aralıklarla bellekten atar.
+    Süresi dolan oturumlar ve MAX_ACTIVE_SESSIONS sınırını aşan en eski oturumlar düşürülür.
+    Oturumu olmayan (ör. yalnızca /liderler yazan kullanıcıların) boş kayıtlar, o sırada işlenen
+    bir güncellemenin sözlüğünü elinden almamak için ancak art arda iki taramada boş görülürse atılır.
+
+    Atma yalnızca bellekteki nesneyi bırakır: oturumun son hali kalıcılık katmanına (persistence.py)
+    yazılır ve satırı silinmez; öğrenci döndüğünde quiz bir sonraki tıklamada geri yüklenir. Kayıtlı
+    oturumlar ancak abandon_ttl boyunca dokunulmazsa terk edilmiş sayılıp silinir.
+    """
+
+    def __init__(self, ttl: float = SESSION_IDLE_TTL, max_sessions: int = MAX_ACTIVE_SESSIONS,
+                 abandon_ttl: float = SESSION_ABANDON_TTL):
+        self._ttl = ttl
+        self._max_sessions = max_sessions
+        self._abandon_ttl = abandon_ttl
+        self._empty_seen = set()
+        self.evicted = 0
+
+    def select(self, user_data, now: float = None) -> list:
+        """Atılması gereken kullanıcı ID'lerini döndürür; user_data: user_id -> kullanıcı sözlüğü."""
+        now = time.time() if now is None else now
+        evict, empty, active = [], set(), []
+        for user_id, data in user_data.items():
+            session = data.get(SESSION_KEY)
+            if session is None:
+                if not data:
+                    empty.add(user_id)
+                    if user_id in self._empty_seen:
+                        evict.append(user_id)
+            elif now - session.last_active > self._ttl:
+                evict.append(user_id)
+            else:
+                active.append((session.last_active, user_id))
+        self._empty_seen = empty.difference(evict)
+
+        excess = len(active) - self._max_sessions
+        if excess > 0:
+            evict.extend(user_id for _, user_id in heapq.nsmallest(excess, active))
+        return evict
+
+    def sweep(self, application, now: float = None) -> int:
+        """Seçilen oturumları kalıcı kopyalarını koruyarak Application'dan düşürür ve sayısını döndürür."""
+        user_ids = self.select(application.user_data, now)
+        persistence = application.persistence
+        for user_id in user_ids:
+            session = application.user_data[user_id].get(SESSION_KEY)
+            # Son tıklamadan beri diske yazılmamış değişiklikler, kullanıcı düşürülmeden önce yazıma alınır
+            if session is not None and persistence is not None:
+                persistence.keep_session(user_id, session)
+            application.drop_user_data(user_id)
+        self.evicted += len(user_ids)
+        return len(user_ids)
+
+    async def run_forever(self, application, interval: float = SESSION_SWEEP_INTERVAL) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                dropped = self.sweep(application)
+                if dropped:
+                    logger.info(f"{dropped} boşta kalan quiz oturumu bellekten atıldı.")
+                if application.persistence is not None:
+                    abandoned = await application.persistence.delete_abandoned(time.time() - self._abandon_ttl)
+                    if abandoned:
+                        logger.info(f"{abandoned} terk edilmiş quiz oturumu silindi.")
+            except Exception as e:
+                logger.error(f"Quiz oturumları temizlenemedi: {e}", exc_info=True)
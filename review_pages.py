@@ -0,0 +1,132 @@
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+# --- Yanlış Listesi Ayarları ---
+REVIEW_PAGE_SIZE = 10 # /yanlislarim listesinde bir sayfada gösterilen yanlış sayısı
+REVIEW_PAGE_CACHE_SIZE = 5000 # Bellekte son görüntülenen sayfası tutulan en fazla kullanıcı
+
+def _page_queries(where: str) -> tuple:
+    """Verilen filtre için (en yeni, daha eski, daha yeni) sayfa sorguları."""
+    select = f"SELECT timestamp, id, question_id, user_answer FROM user_answers WHERE {where} AND is_correct = 0"
+    return (
+        f"{select} ORDER BY timestamp DESC, id DESC LIMIT ?",
+        f"{select} AND (timestamp, id) < (?, ?) ORDER BY timestamp DESC, id DESC LIMIT ?",
+        f"{select} AND (timestamp, id) > (?, ?) ORDER BY timestamp ASC, id ASC LIMIT ?",
+    )
+
+# Sayfalar (timestamp, id) üzerinde keyset ile okunur; OFFSET yoktur ve her sayfa tabloya dönmeden
+# bir indeksten gelir: kullanıcının tüm yanlışları idx_user_answers_review_page, bir quizin
+# yanlışları idx_user_answers_session üzerinden.
+NEWEST_WRONG_SQL, OLDER_WRONG_SQL, NEWER_WRONG_SQL = _page_queries("user_id = ?")
+NEWEST_QUIZ_WRONG_SQL, OLDER_QUIZ_WRONG_SQL, NEWER_QUIZ_WRONG_SQL = _page_queries("session_id = ? AND user_id = ?")
+
+class WrongAnswerPage(NamedTuple):
+    """Yanlış listesinin bir sayfası; satırlar yeniden eskiye (question_id, user_answer)."""
+    rows: tuple
+    newest: bool # En yeni sayfa mı (henüz yazılmamış yanlışlar yalnızca burada görünür)
+    older: Optional[tuple] # Daha eski sayfa için (timestamp, id) imleci; yoksa None
+    newer: Optional[tuple] # Daha yeni sayfa için imleç; en yeni sayfada None
+    session_id: Optional[int] = None # Yalnızca bir quizin yanlışları listeleniyorsa quizin ID'si
+
+def encode_cursor(cursor: tuple) -> str:
+    """İmleci callback_data içine yazılabilecek biçime çevirir."""
+    return f"{cursor[0]}|{cursor[1]}"
+
+def decode_cursor(text: str) -> Optional[tuple]:
+    """encode_cursor() çıktısını çözer; boş metin en yeni kaydı (None) gösterir."""
+    if not text:
+        return None
+    timestamp, row_id = text.rsplit('|', 1)
+    return timestamp, int(row_id)
+
+class WrongAnswerPages:
+    """
+    /yanlislarim sayfalarını okur ve her kullanıcının o an baktığı sayfayı sınırlı bir LRU'da tutar.
+    Detaydan listeye dönüş ve detayda kullanıcının cevabı bu önbellekten karşılanır. Kullanıcı yeni
+    bir yanlış yaptığında veya geçmişi silindiğinde sayfası atılır. Yalnızca olay döngüsünden kullanılır.
+    """
+
+    def __init__(self, answer_log, page_size: int = REVIEW_PAGE_SIZE, max_users: int = REVIEW_PAGE_CACHE_SIZE):
+        self._answer_log = answer_log
+        self._page_size = page_size
+        self._max_users = max_users
+        self._pages = OrderedDict() # user_id -> WrongAnswerPage
+
+    def current(self, user_id: int) -> Optional[WrongAnswerPage]:
+        """Kullanıcının son görüntülediği sayfa; önbellekte yoksa None."""
+        page = self._pages.get(user_id)
+        if page is not None:
+            self._pages.move_to_end(user_id)
+        return page
+
+    def invalidate(self, user_id: int) -> None:
+        self._pages.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+    @staticmethod
+    def _queries(user_id: int, session_id: Optional[int]) -> tuple:
+        """Kapsama göre (sorgular, filtre parametreleri)."""
+        if session_id is None:
+            return (NEWEST_WRONG_SQL, OLDER_WRONG_SQL, NEWER_WRONG_SQL), (user_id,)
+        return (NEWEST_QUIZ_WRONG_SQL, OLDER_QUIZ_WRONG_SQL, NEWER_QUIZ_WRONG_SQL), (session_id, user_id)
+
+    def _remember(self, user_id: int, page: WrongAnswerPage) -> WrongAnswerPage:
+        self._pages[user_id] = page
+        self._pages.move_to_end(user_id)
+        if len(self._pages) > self._max_users:
+            self._pages.popitem(last=False)
+        return page
+
+    async def newest(self, user_id: int, session_id: Optional[int] = None) -> WrongAnswerPage:
+        """En yeni yanlışları, henüz diske yazılmamış olanlarla birlikte okur; session_id verilirse yalnızca o quizinkileri."""
+        size = self._page_size
+        (sql, _, _), key = self._queries(user_id, session_id)
+        rows, pending = await self._answer_log.read_for_user(
+            user_id, lambda conn: conn.execute(sql, (*key, size + 1)).fetchall()
+        )
+        # Bekleyen yanlışlar tablodakilerden yenidir ve imleçleri yoktur; sayfanın başına eklenir
+        pending_wrong = [
+            (row.question_id, row.user_answer) for row in reversed(pending)
+            if not row.is_correct and (session_id is None or row.session_id == session_id)
+        ]
+        shown_rows = rows[:max(size - len(pending_wrong), 0)]
+        older = None
+        if len(pending_wrong) + len(rows) > size:
+            # Sayfa yalnızca bekleyen yanlışlardan oluşuyorsa eski sayfa tablonun en yenisinden başlar
+            older = (shown_rows[-1][0], shown_rows[-1][1]) if shown_rows else ('', 0)
+        page_rows = tuple(pending_wrong[:size]) + tuple((q_id, answer) for _, _, q_id, answer in shown_rows)
+        return self._remember(user_id, WrongAnswerPage(page_rows, True, older, None, session_id))
+
+    async def older(self, user_id: int, cursor: Optional[tuple], session_id: Optional[int] = None) -> WrongAnswerPage:
+        """İmleçten daha eski yanlışları okur; imleç boşsa tablonun en yeni kaydından başlar."""
+        size = self._page_size
+        (newest_sql, older_sql, _), key = self._queries(user_id, session_id)
+        if cursor is None or not cursor[0]:
+            sql, params = newest_sql, (*key, size + 1)
+        else:
+            sql, params = older_sql, (*key, *cursor, size + 1)
+        rows, _ = await self._answer_log.read_for_user(user_id, lambda conn: conn.execute(sql, params).fetchall())
+        if not rows:
+            return await self.newest(user_id, session_id)
+        shown_rows = rows[:size]
+        older = (shown_rows[-1][0], shown_rows[-1][1]) if len(rows) > size else None
+        newer = (shown_rows[0][0], shown_rows[0][1])
+        page_rows = tuple((q_id, answer) for _, _, q_id, answer in shown_rows)
+        return self._remember(user_id, WrongAnswerPage(page_rows, False, older, newer, session_id))
+
+    async def newer(self, user_id: int, cursor: tuple, session_id: Optional[int] = None) -> WrongAnswerPage:
+        """İmleçten daha yeni yanlışları okur; en yeni sayfaya ulaşıldıysa en yeni sayfayı döndürür."""
+        size = self._page_size
+        (_, _, sql), key = self._queries(user_id, session_id)
+        rows, _ = await self._answer_log.read_for_user(
+            user_id, lambda conn: conn.execute(sql, (*key, *cursor, size + 1)).fetchall()
+        )
+        if len(rows) <= size:
+            return await self.newest(user_id, session_id)
+        shown_rows = rows[:size][::-1]
+        page_rows = tuple((q_id, answer) for _, _, q_id, answer in shown_rows)
+        return self._remember(user_id, WrongAnswerPage(
+            page_rows, False, (shown_rows[-1][0], shown_rows[-1][1]), (shown_rows[0][0], shown_rows[0][1]), session_id
+        ))
@@ -1,8 +1,8 @@
-import sqlite3
 import json
 import logging
-import string
-import random 
+from database import get_db_connection
+from migrations import migrate
+from question_importer import import_questions
 
 # Loglama ayarları
 logging.basicConfig(
@@ -12,139 +12,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def setup_database():
-    """Veritabanı bağlantısı kurar ve sorular tablosunu temizleyip yeniden oluşturur."""
-    conn = sqlite3.connect('art_history_quiz.db')
-    cursor = conn.cursor()
-    
-    # Her çalıştığında temiz bir başlangıç yapmak için eski soruları siler.
-    cursor.execute("DROP TABLE IF EXISTS questions")
-    
-    # 'donem' ve 'sinav_turu' sütunları ile yeni tablo oluştur
-    cursor.execute('''
-        CREATE TABLE questions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            text TEXT NOT NULL,
-            image_path TEXT,
-            answer_type TEXT NOT NULL,
-            correct_answer TEXT NOT NULL, -- Bu sütun artık şık metnini saklayacak
-            options TEXT,
-            explanation TEXT,
-            donem TEXT,
-            sinav_turu TEXT
-        )
-    ''')
-    
-    # Diğer tabloların varlığını kontrol et (bunları silmiyoruz)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            username TEXT,
-            current_question_id INTEGER,
-            state TEXT,
-            FOREIGN KEY (current_question_id) REFERENCES questions(id)
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_answers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            question_id INTEGER NOT NULL,
-            user_answer TEXT,
-            is_correct BOOLEAN NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            answer_time_seconds INTEGER,
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (question_id) REFERENCES questions(id)
-        )
-    ''')
-    conn.commit()
+    """Veritabanı şemasını günceller."""
+    # Sorular artık silinmez; içe aktarım mevcut soruları ID'lerini koruyarak günceller.
+    conn = get_db_connection()
+    migrate(conn)
     conn.close()
     logger.info("Veritabanı tabloları kontrol edildi/oluşturuldu.")
 
-def process_question_options(question):
-    """
-    Her soruya 'F) Hiçbiri' seçeneğini ekler ve şıkları büyük harf A) B) şeklinde yeniden düzenler.
-    Ayrıca, açıklaması 'doğru cevap yoktu' anlamına gelen soruların doğru cevabını 'F' olarak ayarlar.
-    Son olarak, correct_answer'ı şık harfinden şık metnine dönüştürür.
-    Şıkları rastgele karıştırır.
-    """
-    original_options_list = json.loads(question["options"])
-    
-    # Mevcut şıklardaki harfleri temizle ve sadece metni al
-    cleaned_options_text = [opt[opt.find(')') + 2:] if ')' in opt else opt for opt in original_options_list]
-    
-    # Eğer 'Hiçbiri' seçeneği yoksa ekle
-    if "Hiçbiri" not in cleaned_options_text:
-        cleaned_options_text.append("Hiçbiri")
-
-    # Şıkları karıştır
-    random.shuffle(cleaned_options_text)
-
-    # Şıkları A) B) C) ... şeklinde yeniden etiketle ve geçici bir harf-metin haritası oluştur
-    new_options_with_letters = []
-    letter_to_option_map = {}
-    for i, opt_text in enumerate(cleaned_options_text):
-        current_letter = string.ascii_uppercase[i]
-        new_options_with_letters.append(f"{current_letter}) {opt_text}")
-        letter_to_option_map[current_letter] = opt_text
-    
-    question["options"] = json.dumps(new_options_with_letters)
-
-    # Açıklamada "doğru cevap yoktur" veya "bulunmamaktadır" gibi ifadeler varsa,
-    # correct_answer'ı "F" olarak ayarla.
-    explanation_lower = question["explanation"].lower()
-    if any(phrase in explanation_lower for phrase in [
-        "seçeneklerde romanesk dönem bulunmamaktadır",
-        "seçeneklerde gotik dönemi yer almamaktadır",
-        "seçeneklerde bizans dönemi yer almamaktadır",
-        "seçeneklerde antik roma dönemi verilmemiştir",
-        "seçeneklerde rönesans dönemi verilmemiştir",
-        "verilen şıklardan hiçbiri doğru değildir",
-        "leonardo da vinci seçenekler arasında yer almamaktadır",
-        "verilen sanatçılardan hiçbiri maniyerist dönemin tipik temsilcilerinden değildir",
-        "şıklar arasında bu sanatçılar yer almamaktadır",
-        "en uygun cevap olan maniyerizm şıklarda yer almadığı için doğru cevap yoktur",
-        "verilen seçeneklerde doğru eşleştirme yoktur"
-    ]):
-        question["correct_answer"] = "Hiçbiri" # Metin olarak "Hiçbiri" olarak ayarla
-    
-    # Şimdi correct_answer'ı şık harfinden şık metnine dönüştür (eğer daha önce harf olarak ayarlanmışsa)
-    # Bu adım, correct_answer zaten metin olarak ayarlandığı için genellikle gereksizdir,
-    # ancak orijinal veride harf varsa uyumluluk için tutulmuştur.
-    current_correct_answers_texts = question["correct_answer"].split(',')
-    
-    # Eğer correct_answer hala harf içeriyorsa (eski veriden kalma), bunu metne dönüştür
-    # "F" zaten "Hiçbiri" metnine dönüştürüldüğü için bu kontrol daha çok diğer harfler içindir.
-    # Bu kısım, correct_answer'ın artık doğrudan metin olarak saklanması nedeniyle basitleştirilebilir.
-    # Ancak, mevcut yapıyı koruyarak sadece "F" durumunu ele alalım.
-    converted_answers = []
-    for ans_part in current_correct_answers_texts:
-        if ans_part == 'F':
-            converted_answers.append("Hiçbiri")
-        elif len(ans_part) == 1 and ans_part in string.ascii_uppercase: # Hala harf formatında gelirse
-            found_text = None
-            for original_opt in original_options_list: # Orijinal şık listesinde ara
-                if original_opt.startswith(ans_part + ')'):
-                    found_text = original_opt[original_opt.find(')') + 2:].strip()
-                    break
-            if found_text:
-                converted_answers.append(found_text)
-            else:
-                converted_answers.append(ans_part) # Bulamazsa olduğu gibi bırak
-        else: # Zaten metin formatındaysa
-            converted_answers.append(ans_part)
-            
-    question["correct_answer"] = ",".join(converted_answers)
-
-    # Tüm soruları double_choice olarak ayarla
-    question["answer_type"] = "double_choice"
-
-    return question
-
 def insert_sample_questions():
-    """Veritabanına sadece belirtilen soruları ekler."""
-    conn = sqlite3.connect('art_history_quiz.db')
-    cursor = conn.cursor()
+    """Belirtilen soruları veritabanına ekler; daha önce eklenmiş olanları günceller."""
+    conn = get_db_connection()
 
     questions_to_insert = [
         # --- 2. DÖNEM - GÜNCEL VİZE SORULARI ---
@@ -607,18 +484,10 @@ def insert_sample_questions():
         }
     ]
 
-    # Her soruyu işle
-    processed_questions = [process_question_options(q) for q in questions_to_insert]
-
-    for q in processed_questions:
-        cursor.execute(
-            "INSERT INTO questions (text, image_path, answer_type, correct_answer, options, explanation, donem, sinav_turu) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (q["text"], q["image_path"], q["answer_type"], q["correct_answer"], q["options"], q["explanation"], q["donem"], q["sinav_turu"])
-        )
-    
-    conn.commit()
+    # Her soru doğrulanıp process_question_options ile işlenir ve içerik hash'ine göre upsert edilir
+    stats = import_questions(conn, ((f"seed_db.py soru {i}", q) for i, q in enumerate(questions_to_insert, 1)))
     conn.close()
-    logger.info(f"{len(processed_questions)} adet soru (vize ve final) veritabanına eklendi.")
+    logger.info(f"{len(questions_to_insert)} adet soru (vize ve final) işlendi: {stats['inserted']} yeni, {stats['updated']} güncellenen.")
 
 if __name__ == '__main__':
     setup_database()
@@ -0,0 +1,183 @@
+"""
+Telegram hız sınırlarına uyan merkezi giden mesaj zamanlayıcısı.
+
+Bot API'nin mesaj gönderen ve düzenleyen tüm çağrıları (SCHEDULED_ENDPOINTS) iki token
+kovasından geçer: sohbet başına kova (özel sohbette saniyede ~1, grupta dakikada ~20 mesaj) ve
+tüm bot için genel kova (saniyede ~30 mesaj). Genel kovadan jeton bekleyen istekler önceliğe göre
+sıralanır: etkileşimli yanıtlar (sıradaki soru, cevap onayı) toplu mesajlardan (quiz özeti,
+duyurular) önce gönderilir. Öncelik, ExtBot yöntemlerine rate_limit_args=PRIORITY_BULK
+verilerek belirtilir; verilmezse istek etkileşimli sayılır.
+
+Telegram yine de 429 (RetryAfter) döndürürse tüm gönderimler retry_after süresince durdurulur
+ve istek MAX_SEND_RETRIES kez yeniden denenir.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import timedelta
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# --- Gönderim Hızı Ayarları ---
+# Bir kova herhangi bir pencerede en fazla 'burst + rate * pencere' jeton verir; değerler bu toplam
+# Telegram SSS'deki sınırları (genel 30/sn, özel sohbet ~1/sn, grup 20/dk) aşmayacak şekilde seçilmiştir.
+GLOBAL_RATE = 28.0 # Tüm sohbetlere toplam mesaj / saniye
+GLOBAL_BURST = 2
+PRIVATE_CHAT_RATE = 1.0 # Bir özel sohbete mesaj / saniye
+PRIVATE_CHAT_BURST = 2 # Kısa süreli patlamalara (ör. onay + sıradaki soru) izin verilir
+GROUP_CHAT_RATE = 19 / 60 # Bir gruba mesaj / saniye
+GROUP_CHAT_BURST = 1
+MAX_SEND_RETRIES = 3 # 429 sonrası en fazla yeniden deneme
+CHAT_BUCKET_LIMIT = 10000 # Bu kadar sohbet kovası birikince dolmuş (boşta) kovalar atılır
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# Telegram'ın mesaj sınırlarına tabi yöntemler; diğerleri (answerCallbackQuery, getChat...) beklemeden geçer
+SCHEDULED_ENDPOINTS = frozenset({
+    'sendMessage', 'sendPhoto', 'sendDocument', 'sendMediaGroup', 'copyMessage', 'forwardMessage',
+    'editMessageText', 'editMessageCaption', 'editMessageReplyMarkup', 'editMessageMedia',
+})
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    value = error.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+class TokenBucket:
+    """Saniyede 'rate' jetonla dolan, en fazla 'capacity' jeton tutan kova."""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Bir jeton için beklenecek süre; jeton hazırsa 0."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+class SendScheduler(BaseRateLimiter):
+    """
+    Genel ve sohbet başına token kovalarıyla öncelikli gönderim yapan hız sınırlayıcı.
+    Aynı sohbete giden istekler sohbet kilidiyle sırayı korur; sohbet jetonu alan istek genel
+    kuyruğa (öncelik, sıra) anahtarıyla girer ve tek bir dağıtıcı görev genel jetonları öncelik
+    sırasıyla dağıtır. Yalnızca olay döngüsünden kullanılır.
+    """
+
+    def __init__(self, global_rate: float = GLOBAL_RATE, global_burst: float = GLOBAL_BURST,
+                 private_rate: float = PRIVATE_CHAT_RATE, private_burst: float = PRIVATE_CHAT_BURST,
+                 group_rate: float = GROUP_CHAT_RATE, group_burst: float = GROUP_CHAT_BURST,
+                 max_retries: int = MAX_SEND_RETRIES):
+        self._global = TokenBucket(global_rate, global_burst, time.monotonic())
+        self._private = (private_rate, private_burst)
+        self._group = (group_rate, group_burst)
+        self._max_retries = max_retries
+        self._chats = {} # chat_id -> [TokenBucket, asyncio.Lock]
+        self._waiters = [] # (öncelik, sıra, future) yığını
+        self._sequence = itertools.count()
+        self._dispatcher = None
+        self._paused_until = 0.0
+        self.retries = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+    def _chat(self, chat_id, now: float) -> list:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            if len(self._chats) >= CHAT_BUCKET_LIMIT:
+                self._prune(now)
+            # Grupların ve kanalların ID'leri negatiftir
+            rate, burst = self._group if isinstance(chat_id, int) and chat_id < 0 else self._private
+            chat = self._chats[chat_id] = [TokenBucket(rate, burst, now), asyncio.Lock()]
+        return chat
+
+    def _prune(self, now: float) -> None:
+        for chat_id, (bucket, lock) in list(self._chats.items()):
+            if not lock.locked() and bucket.is_full(now):
+                del self._chats[chat_id]
+
+    async def _acquire(self, priority: int, chat_id) -> None:
+        if chat_id is None:
+            await self._acquire_global(priority)
+            return
+        bucket, lock = self._chat(chat_id, time.monotonic())
+        async with lock:
+            while (wait := bucket.delay(time.monotonic())) > 0:
+                await asyncio.sleep(wait)
+            bucket.take(time.monotonic())
+            # Sohbet kilidi genel kuyruğa girene kadar tutulur; aynı sohbetin mesajları sırasını korur
+            await self._acquire_global(priority)
+
+    async def _acquire_global(self, priority: int) -> None:
+        now = time.monotonic()
+        if not self._waiters and now >= self._paused_until and self._global.delay(now) == 0:
+            self._global.take(now)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        try:
+            while self._waiters:
+                now = time.monotonic()
+                wait = max(self._global.delay(now), self._paused_until - now)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                _, _, future = heapq.heappop(self._waiters)
+                if not future.done():
+                    self._global.take(now)
+                    future.set_result(None)
+        finally:
+            self._dispatcher = None
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if endpoint not in SCHEDULED_ENDPOINTS:
+            return await callback(*args, **kwargs)
+        priority = rate_limit_args if isinstance(rate_limit_args, int) else PRIORITY_INTERACTIVE
+        chat_id = data.get('chat_id')
+        attempt = 0
+        while True:
+            await self._acquire(priority, chat_id)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt >= self._max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                seconds = retry_after_seconds(e)
+                self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+                logger.warning(f"{endpoint} için Telegram hız sınırı (429): {seconds} sn sonra yeniden denenecek ({attempt}/{self._max_retries}).")
+                await asyncio.sleep(seconds)
@@ -0,0 +1,17 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrations import migrate
+
+@pytest.fixture
+def migrated_db(tmp_path):
+    """Son şemaya getirilmiş boş bir veritabanına bağlantı; deponun veritabanına dokunulmaz."""
+    conn = sqlite3.connect(tmp_path / 'test.db')
+    migrate(conn)
+    yield conn
+    conn.close()
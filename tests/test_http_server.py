@@ -0,0 +1,63 @@
+"""http_server'ın yavaş veya boşta kalan istemcilere karşı zaman aşımları."""
+import asyncio
+
+import pytest
+
+import http_server
+from http_server import HTTPResponse, start_http_server
+
+async def ok_handler(request):
+    return HTTPResponse(200, b'ok')
+
+async def open_connection(server):
+    port = server.sockets[0].getsockname()[1]
+    return await asyncio.open_connection('127.0.0.1', port)
+
+@pytest.fixture
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(http_server, 'HTTP_READ_TIMEOUT', 0.2)
+    monkeypatch.setattr(http_server, 'HTTP_IDLE_TIMEOUT', 0.3)
+
+def test_complete_request_is_served(short_timeouts):
+    async def scenario():
+        server = await start_http_server(ok_handler, '127.0.0.1', 0)
+        reader, writer = await open_connection(server)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        response = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.startswith(b"HTTP/1.1 200 OK") and response.endswith(b"ok")
+
+def test_half_sent_request_times_out(short_timeouts):
+    async def scenario():
+        server = await start_http_server(ok_handler, '127.0.0.1', 0)
+        reader, writer = await open_connection(server)
+        # İstek satırı ve yarım bir başlık gönderilir, istek hiç tamamlanmaz
+        writer.write(b"POST /telegram HTTP/1.1\r\nContent-Le")
+        response = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    assert asyncio.run(scenario()).startswith(b"HTTP/1.1 408 Request Timeout")
+
+def test_idle_keep_alive_connection_is_closed(short_timeouts):
+    async def scenario():
+        server = await start_http_server(ok_handler, '127.0.0.1', 0)
+        reader, writer = await open_connection(server)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+        await writer.drain()
+        # Yanıttan sonra yeni istek gönderilmez; sunucu bağlantıyı kendisi kapatmalıdır
+        response = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.startswith(b"HTTP/1.1 200 OK") and b"keep-alive" in response
@@ -0,0 +1,76 @@
+"""Dağıtıcının getUpdates döngüsünün Bot API hatalarına tepkisi."""
+import asyncio
+
+import pytest
+from telegram.error import Conflict, NetworkError, RetryAfter
+
+import workers
+from workers import poll_updates, stop_on_failure
+
+class FakeBot:
+    """Sıradaki cevabı ya da hatayı döndüren getUpdates; liste bitince yoklamayı iptal eder."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    async def delete_webhook(self):
+        pass
+
+    async def do_api_request(self, endpoint, api_kwargs=None, read_timeout=None):
+        if not self.responses:
+            raise asyncio.CancelledError
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    async def fake_sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(workers.asyncio, 'sleep', fake_sleep)
+    return delays
+
+def run_polling(responses):
+    delivered = []
+    async def deliver(data):
+        delivered.append(data['update_id'])
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(poll_updates(FakeBot(responses), deliver))
+    return delivered
+
+@pytest.mark.filterwarnings("ignore::telegram.warnings.PTBDeprecationWarning")
+def test_retry_after_and_errors_back_off(sleeps):
+    delivered = run_polling([
+        RetryAfter(7),
+        Conflict("terminated by other getUpdates request"),
+        Conflict("terminated by other getUpdates request"),
+        NetworkError("bağlantı koptu"),
+        [{'update_id': 1}],
+        NetworkError("bağlantı koptu"),
+        [{'update_id': 2}],
+    ])
+    assert delivered == [1, 2]
+    assert sleeps == [7, 1, 2, 4, 1]
+
+def test_failed_task_sets_stop_event():
+    async def scenario():
+        stop_event = asyncio.Event()
+        async def fail():
+            raise ValueError("beklenmeyen")
+        async def cancelled():
+            await asyncio.sleep(10)
+        waiting = asyncio.create_task(cancelled())
+        waiting.add_done_callback(stop_on_failure(stop_event))
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert not stop_event.is_set()
+
+        failing = asyncio.create_task(fail())
+        failing.add_done_callback(stop_on_failure(stop_event))
+        await asyncio.wait_for(stop_event.wait(), 1)
+        assert isinstance(failing.exception(), ValueError)
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+"""Sıcak sorguların (migrations.HOT_QUERIES) indekslerden okunduğunu doğrular; `migrations.py --check` ile aynı kontrol."""
+import random
+
+from migrations import HOT_QUERIES, check_query_plans
+
+def test_hot_queries_use_indexes(migrated_db):
+    assert check_query_plans(migrated_db) == []
+
+def test_hot_queries_use_indexes_after_analyze(migrated_db):
+    # İstatistikler toplandıktan sonra planlayıcı farklı bir plan seçebilir
+    conn = migrated_db
+    conn.executemany(
+        "INSERT INTO user_answers (user_id, question_id, user_answer, is_correct, timestamp, answer_time_seconds, session_id) "
+        "VALUES (?, ?, 'A', ?, ?, 10, ?)",
+        [(i % 50, i % 60 + 1, i % 3 == 0, f"2026-01-{i % 28 + 1:02} 12:00:00", None if i % 4 == 0 else i // 10)
+         for i in range(5000)]
+    )
+    conn.executemany(
+        "INSERT INTO user_stats (user_id, answered, correct) VALUES (?, ?, ?)",
+        [(user_id, 100, random.randint(0, 100)) for user_id in range(50)]
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    assert check_query_plans(conn) == []
+
+def test_plan_check_reports_missing_index(migrated_db):
+    migrated_db.execute("DROP INDEX idx_user_answers_review_page")
+    failed = {name for name, _ in check_query_plans(migrated_db)}
+    assert "yanlış listesi (en yeni)" in failed
+    assert set(failed) <= set(HOT_QUERIES)
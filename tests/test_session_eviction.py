@@ -0,0 +1,97 @@
+"""Boşta kalan quiz oturumlarının bellekten atılıp kayıtlı kopyadan geri yüklenmesi."""
+import asyncio
+import time
+
+import pytest
+
+import database
+from database import Database
+from persistence import SQLitePersistence
+from quiz_session import QuizSession, SessionSweeper, SESSION_KEY
+
+@pytest.fixture
+def persistence(migrated_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'test.db'))
+    db = Database()
+    yield SQLitePersistence(db)
+    db.close()
+
+class FakeApplication:
+    """SessionSweeper'ın kullandığı kadar Application: user_data, persistence ve drop_user_data."""
+
+    def __init__(self, persistence):
+        self.user_data = {}
+        self.persistence = persistence
+        self.dropped = []
+
+    def drop_user_data(self, user_id):
+        self.user_data.pop(user_id, None)
+        self.dropped.append(user_id)
+        # Application bunu bir sonraki update_persistence turunda persistence'a iletir
+        return asyncio.ensure_future(self.persistence.drop_user_data(user_id))
+
+def make_session(answered: int, last_active: float) -> QuizSession:
+    session = QuizSession('Vize', (3, 5, 8), now=last_active, length=10, session_id=7)
+    session.position = answered + 1
+    session.answered = answered
+    session.correct = answered - 1
+    return session
+
+def test_evicted_session_is_kept_on_disk_and_restored(persistence):
+    async def scenario():
+        idle_since = time.time() - 3600
+        session = make_session(2, idle_since)
+        await persistence.update_user_data(42, {SESSION_KEY: session})
+        await persistence.flush()
+
+        # Kayıttan sonra bir cevap daha verilmiş ama henüz diske yazılmamış olsun
+        session.answered = 3
+        application = FakeApplication(persistence)
+        application.user_data[42] = {SESSION_KEY: session}
+        assert SessionSweeper(ttl=60).sweep(application) == 1
+        await asyncio.sleep(0)
+        await persistence.flush()
+        assert application.dropped == [42] and 42 not in application.user_data
+
+        restored = await persistence.load_session(42)
+        return session, restored
+
+    session, restored = asyncio.run(scenario())
+    assert restored is not None
+    assert restored.to_row() == session.to_row()
+
+def test_restart_still_sees_evicted_session(persistence):
+    async def scenario():
+        await persistence.update_user_data(42, {SESSION_KEY: make_session(4, time.time() - 3600)})
+        await persistence.flush()
+        application = FakeApplication(persistence)
+        application.user_data[42] = {SESSION_KEY: make_session(4, time.time() - 3600)}
+        SessionSweeper(ttl=60).sweep(application)
+        await asyncio.sleep(0)
+        await persistence.flush()
+        return await persistence.get_user_data()
+
+    assert asyncio.run(scenario())[42][SESSION_KEY].answered == 4
+
+def test_abandoned_sessions_are_deleted(persistence):
+    async def scenario():
+        now = time.time()
+        await persistence.update_user_data(1, {SESSION_KEY: make_session(1, now - 10 * 86400)})
+        await persistence.update_user_data(2, {SESSION_KEY: make_session(1, now - 60)})
+        await persistence.flush()
+        deleted = await persistence.delete_abandoned(now - 7 * 86400)
+        return deleted, await persistence.load_session(1), await persistence.load_session(2)
+
+    deleted, abandoned, recent = asyncio.run(scenario())
+    assert deleted == 1 and abandoned is None and recent is not None
+
+def test_finished_quiz_row_is_deleted(persistence):
+    async def scenario():
+        await persistence.update_user_data(42, {SESSION_KEY: make_session(2, time.time())})
+        await persistence.flush()
+        # Quiz bitince oturum user_data'dan çıkarılır
+        await persistence.update_user_data(42, {})
+        await persistence.flush()
+        return await persistence.load_session(42)
+
+    assert asyncio.run(scenario()) is None
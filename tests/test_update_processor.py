@@ -0,0 +1,53 @@
+"""PerUserUpdateProcessor: kullanıcı başına sıra ve kullanıcılar arası eşzamanlılık."""
+import asyncio
+import time
+
+from telegram import CallbackQuery, Update, User
+
+from update_processor import PerUserUpdateProcessor
+
+def callback_update(update_id: int, user_id: int) -> Update:
+    user = User(user_id, f'öğrenci {user_id}', is_bot=False)
+    return Update(update_id, callback_query=CallbackQuery(str(update_id), user, chat_instance='x'))
+
+def test_one_users_burst_does_not_delay_another_user():
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_concurrent_updates=2)
+        finished = {}
+
+        async def handler(update_id, delay):
+            await asyncio.sleep(delay)
+            finished[update_id] = time.monotonic()
+
+        start = time.monotonic()
+        # Kullanıcı 1 art arda beş yavaş tıklama gönderir, ardından kullanıcı 2 tek bir tıklama
+        burst = [asyncio.create_task(processor.process_update(callback_update(i, 1), handler(i, 0.2)))
+                 for i in range(5)]
+        await asyncio.sleep(0)
+        other = asyncio.create_task(processor.process_update(callback_update(99, 2), handler(99, 0)))
+        await asyncio.gather(other, *burst)
+        return start, finished
+
+    start, finished = asyncio.run(scenario())
+    assert finished[99] - start < 0.1
+    assert [update_id for update_id in sorted(finished, key=finished.get) if update_id != 99] == list(range(5))
+
+def test_concurrency_limit_applies_across_users():
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_concurrent_updates=2)
+        running = peak = 0
+
+        async def handler():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        await asyncio.gather(*(processor.process_update(callback_update(i, i), handler())
+                               for i in range(6)))
+        return peak, processor._locks
+
+    peak, locks = asyncio.run(scenario())
+    assert peak == 2
+    assert locks == {}
@@ -0,0 +1,71 @@
+"""
+Farklı kullanıcıların güncellemelerini eşzamanlı, aynı kullanıcınınkileri geliş sırasıyla işleyen
+güncelleme işlemcisi.
+
+PTB varsayılan olarak güncellemeleri tek tek işler; bir işleyici SendScheduler'da bir sohbetin
+jetonunu beklerken diğer tüm öğrencilerin tıklamaları da bekler. Bu işlemciyle Application en
+fazla CONCURRENT_UPDATES güncellemeyi aynı anda işler; yalnızca aynı kullanıcının güncellemeleri
+kullanıcı kilidinde sıraya girer. Böylece bir kullanıcının oturumu, seçimleri ve quiz akışı
+sıralı işlemeyle aynı kalır.
+
+Bir güncelleme önce kullanıcı kilidini, ancak sonra eşzamanlılık yuvasını alır. Tersi olsaydı
+aynı kullanıcının kilit bekleyen güncellemeleri yuvaları boşuna tutar ve tıklamalarını art arda
+gönderen tek bir öğrenci diğer herkesi bekletirdi. BaseUpdateProcessor'ın kendi semaforu
+(process_update içinde, kullanıcı kilidinden önce alınır) bu yüzden yalnızca bekleyenler dahil
+toplam güncelleme sayısına bir üst sınır koyar: MAX_PENDING_UPDATES.
+"""
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+# --- Eşzamanlı İşleme Ayarları ---
+CONCURRENT_UPDATES = 256 # Aynı anda işlenen en fazla güncelleme (kilit bekleyenler hariç)
+MAX_PENDING_UPDATES = 10000 # Bekleyenler dahil bellekte tutulan en fazla güncelleme
+
+def update_key(update):
+    """Sıralamanın anahtarı: gönderen, yoksa sohbet; ikisi de yoksa None (sırasız işlenir)."""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_user is not None:
+        return update.effective_user.id
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    return None
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Güncellemeleri kullanıcı başına sıralı, kullanıcılar arasında eşzamanlı işler."""
+    __slots__ = ('_locks', '_slots')
+
+    def __init__(self, max_concurrent_updates: int = CONCURRENT_UPDATES,
+                 max_pending_updates: int = MAX_PENDING_UPDATES):
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates pozitif olmalı")
+        super().__init__(max(max_pending_updates, max_concurrent_updates))
+        self._locks = {} # anahtar -> [asyncio.Lock, bekleyen güncelleme sayısı]
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+
+    async def do_process_update(self, update, coroutine) -> None:
+        key = update_key(update)
+        if key is None:
+            async with self._slots:
+                await coroutine
+            return
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            # asyncio.Lock bekleyenleri geliş sırasıyla uyandırır; yuva ancak sıra gelince alınır
+            async with entry[0], self._slots:
+                await coroutine
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
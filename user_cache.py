@@ -0,0 +1,51 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+def display_name(user_id: int, username) -> str:
+    """Kullanıcı adı yoksa 'id_<ID>' biçiminde bir yedek ad döndürür."""
+    return username if username else f"id_{user_id}"
+
+class UserCache:
+    """
+    Kullanıcı adlarının bellekteki önbelleği; kalıcı kopyası 'users' tablosundadır.
+    Gelen her güncellemedeki effective_user ile doldurulur, böylece soru akışı kullanıcı adı
+    için Bot API'ye (get_chat) gitmez. Önbellekte olmayan bir kullanıcı önce tablodan okunur;
+    yalnızca hiç görülmemiş kullanıcılar için bir kez get_chat yapılır.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._usernames = {}
+
+    async def remember(self, user) -> None:
+        """Bir Telegram User nesnesinin adını önbelleğe alır; ad değiştiyse tabloya yazar."""
+        if user is None:
+            return
+        username = display_name(user.id, user.username)
+        if self._usernames.get(user.id) == username:
+            return
+        self._usernames[user.id] = username
+        await self._db.execute(
+            "INSERT INTO users (id, username) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET username = excluded.username",
+            (user.id, username)
+        )
+
+    async def username(self, bot, user_id: int) -> str:
+        """Kullanıcı adını önbellekten, yoksa tablodan, o da yoksa Bot API'den getirir."""
+        username = self._usernames.get(user_id)
+        if username is not None:
+            return username
+
+        row = await self._db.fetchone("SELECT username FROM users WHERE id = ?", (user_id,))
+        if row and row[0]:
+            username = row[0]
+        else:
+            try:
+                chat_info = await bot.get_chat(user_id)
+                username = display_name(user_id, chat_info.username)
+            except Exception as e:
+                logger.error(f"Kullanıcı ID'si için kullanıcı adı alınamadı: {user_id}. Hata: {e}", exc_info=True)
+                username = display_name(user_id, None)
+        self._usernames[user_id] = username
+        return username
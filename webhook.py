@@ -0,0 +1,114 @@
+"""
+Telegram güncellemelerini webhook ile alan gömülü HTTP sunucusu.
+
+Telegram her güncellemeyi POST ile gönderir; sunucu gizli anahtarı
+(X-Telegram-Bot-Api-Secret-Token başlığı) doğrular, yalnızca izin verilen güncelleme türlerini
+kabul eder ve güncellemeyi doğrudan Application'ın kuyruğuna koyar. Uzun yoklama (long polling)
+gecikmesi olmaz ve güncellemeler birden çok süreçten tüketilebilir.
+
+Yerel test için WEBHOOK_URL boş bırakılır (setWebhook yapılmaz) ve kayıtlı bir güncelleme
+elle gönderilir:
+    curl -X POST -H 'X-Telegram-Bot-Api-Secret-Token: <gizli anahtar>' \\
+         -H 'Content-Type: application/json' --data @update.json http://127.0.0.1:8443/telegram
+"""
+import asyncio
+import hmac
+import json
+import logging
+import signal
+from http import HTTPStatus
+
+from telegram import Update
+
+from http_server import HTTPResponse, start_http_server
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = 'x-telegram-bot-api-secret-token'
+
+def update_type(data: dict):
+    """Bir güncelleme JSON'unun türünü ('message', 'callback_query'...) döndürür."""
+    for key in data:
+        if key != 'update_id':
+            return key
+    return None
+
+class WebhookReceiver:
+    """Webhook isteklerini doğrulayıp güncellemeleri bir hedefe (varsayılan: Application kuyruğu) iletir."""
+
+    def __init__(self, application, secret_token: str, path: str = '/telegram', allowed_updates=None, deliver=None):
+        self._application = application
+        self._secret_token = secret_token
+        self._path = path
+        self._allowed_updates = frozenset(allowed_updates) if allowed_updates else None
+        # deliver(update_json) verilmezse güncelleme Update nesnesine çevrilip Application kuyruğuna konur
+        self._deliver = deliver or self._put_in_queue
+        self.received = 0
+        self.rejected = 0
+
+    async def _put_in_queue(self, data: dict) -> None:
+        await self._application.update_queue.put(Update.de_json(data, self._application.bot))
+
+    async def handle(self, request) -> HTTPResponse:
+        if request.path != self._path:
+            return HTTPResponse(HTTPStatus.NOT_FOUND)
+        if request.method != 'POST':
+            return HTTPResponse(HTTPStatus.METHOD_NOT_ALLOWED)
+        if self._secret_token and not hmac.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ''), self._secret_token):
+            self.rejected += 1
+            logger.warning("Webhook isteği geçersiz gizli anahtar nedeniyle reddedildi.")
+            return HTTPResponse(HTTPStatus.FORBIDDEN)
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return HTTPResponse(HTTPStatus.BAD_REQUEST)
+        if not isinstance(data, dict) or 'update_id' not in data:
+            return HTTPResponse(HTTPStatus.BAD_REQUEST)
+
+        # İşleyicilerin kullanmadığı türler onaylanır ama işlenmez; Telegram tekrar göndermez
+        if self._allowed_updates is not None and update_type(data) not in self._allowed_updates:
+            return HTTPResponse(HTTPStatus.OK)
+        self.received += 1
+        await self._deliver(data)
+        return HTTPResponse(HTTPStatus.OK)
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        server = await start_http_server(self.handle, host, port)
+        logger.info(f"Webhook sunucusu {host}:{port}{self._path} adresinde dinliyor.")
+        return server
+
+async def run_webhook(application, listen: str, port: int, path: str, secret_token: str, url: str = '', allowed_updates=None) -> None:
+    """
+    Application'ı webhook modunda çalıştırır ve SIGINT/SIGTERM gelene kadar bekler.
+    run_polling gibi post_init, post_stop ve post_shutdown kancalarını da çağırır.
+    """
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError: # Windows
+            pass
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    server = None
+    try:
+        if url:
+            await application.bot.set_webhook(url=url + path, secret_token=secret_token, allowed_updates=allowed_updates)
+        await application.start()
+        receiver = WebhookReceiver(application, secret_token, path, allowed_updates)
+        server = await receiver.start(listen, port)
+        await stop_event.wait()
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        if application.running:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
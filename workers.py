@@ -0,0 +1,261 @@
+"""
+Güncellemeleri kullanıcı ID'sine göre N işçi sürece dağıtan çok süreçli çalışma modu.
+
+Tek bir Application tek bir çekirdekte çalışır; yoğun anlarda JSON ayrıştırma, klavye üretimi ve
+Markdown biçimlendirme o çekirdeği doldurur. Bu modda:
+  - Ön dağıtıcı güncellemeleri webhook (webhook.WebhookReceiver'ın deliver kancası) ya da uzun
+    yoklama ile alır, Update nesnesi kurmadan yalnızca gönderenin ID'sini okur ve güncellemeyi
+    shard_of(user_id) işçisinin kuyruğuna koyar. Bir kullanıcının tüm güncellemeleri aynı işçiye,
+    geliş sırasıyla gider; oturum, seçim indeksi ve önbellekler o işçinin belleğinde kalır.
+  - Her işçi main.build_application() ile kurulan kendi Application'ını çalıştırır. İşçiler aynı
+    SQLite veritabanını WAL modunda paylaşır; yazıcılar dosya kilidinde busy_timeout kadar bekler.
+    Şema göçleri işçiler başlamadan önce dağıtıcı süreçte bir kez yapılır.
+  - Dağıtıcı işçileri izler; ölen ya da SIGTERM ile kapatılan işçi aynı kuyrukla yeniden başlatılır.
+    Kuyrukta bekleyen güncellemeler kaybolmaz, yeni işçi kaldığı yerden devam eder. Tek bir işçi
+    `kill -TERM <pid>` ile diğerlerine dokunmadan yeniden başlatılabilir.
+"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+import warnings
+
+from telegram import Bot, Update
+from telegram.error import NetworkError, RetryAfter, TelegramError
+
+from send_scheduler import retry_after_seconds
+from webhook import WebhookReceiver, update_type
+
+logger = logging.getLogger(__name__)
+
+# --- Çok Süreçli Çalışma Ayarları ---
+WORKER_CHECK_INTERVAL = 1.0 # Dağıtıcının işçilerin yaşayıp yaşamadığına kaç saniyede bir baktığı
+WORKER_RESTART_DELAY = 1.0 # Ölen bir işçinin yeniden başlatılmadan önce beklenen süre (saniye)
+WORKER_STOP_TIMEOUT = 30 # Kapanışta işçilerin kuyruklarını bitirmesi için beklenen en uzun süre
+WORKER_POLL_TIMEOUT = 0.5 # İşçinin kuyruğu beklerken SIGTERM'i kontrol etme aralığı
+POLLING_TIMEOUT = 30 # Dağıtıcının getUpdates uzun yoklama süresi
+POLLING_ERROR_DELAY = 1.0 # Başarısız getUpdates sonrası ilk bekleme (saniye); hata sürdükçe ikiye katlanır
+POLLING_MAX_ERROR_DELAY = 60.0 # Hata sonrası beklemenin üst sınırı (saniye)
+
+def update_user_id(data: dict) -> int:
+    """Güncelleme JSON'undan gönderenin (yoksa sohbetin) ID'sini okur; bulunamazsa 0."""
+    payload = data.get(update_type(data))
+    if not isinstance(payload, dict):
+        return 0
+    sender = payload.get('from') or payload.get('user') or payload.get('chat')
+    if isinstance(sender, dict):
+        return sender.get('id', 0)
+    return 0
+
+def shard_of(user_id: int, workers: int) -> int:
+    """Kullanıcının güncellemelerini işleyen işçinin sırası."""
+    return user_id % workers
+
+class WorkerPool:
+    """İşçi süreçlerini, her birinin güncelleme kuyruğunu ve yeniden başlatmalarını yönetir."""
+
+    def __init__(self, count: int, **worker_options):
+        # İşçiler, dağıtıcının iş parçacıklarını ve olay döngüsünü miras almasın diye 'spawn' ile başlar
+        self._context = multiprocessing.get_context('spawn')
+        self._count = count
+        self._options = worker_options
+        self._inboxes = [self._context.Queue() for _ in range(count)]
+        self._processes = [None] * count
+        self._stopping = False
+        self.delivered = [0] * count
+        self.restarts = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=worker_main, args=(index, self._count, self._inboxes[index]), kwargs=self._options,
+            name=f"quiz-isci-{index}",
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info(f"İşçi {index} başlatıldı (pid {process.pid}).")
+
+    def start(self) -> None:
+        for index in range(self._count):
+            self._spawn(index)
+
+    async def deliver(self, data: dict) -> None:
+        """Güncellemeyi gönderenin işçisinin kuyruğuna koyar (WebhookReceiver deliver kancası)."""
+        index = shard_of(update_user_id(data), self._count)
+        self._inboxes[index].put(data)
+        self.delivered[index] += 1
+
+    async def supervise(self) -> None:
+        """Ölen işçileri aynı kuyrukla yeniden başlatır."""
+        while not self._stopping:
+            await asyncio.sleep(WORKER_CHECK_INTERVAL)
+            for index, process in enumerate(self._processes):
+                if self._stopping or process is None or process.is_alive():
+                    continue
+                logger.warning(f"İşçi {index} (pid {process.pid}) {process.exitcode} koduyla çıktı, yeniden başlatılıyor.")
+                process.join()
+                await asyncio.sleep(WORKER_RESTART_DELAY)
+                if not self._stopping:
+                    self._spawn(index)
+                    self.restarts += 1
+
+    def restart(self, index: int) -> None:
+        """İşçiye kuyruğundaki güncellemeleri bitirip çıkmasını söyler; supervise() onu yeniden başlatır."""
+        self._inboxes[index].put(None)
+
+    async def stop(self, timeout: float = WORKER_STOP_TIMEOUT) -> None:
+        """Tüm işçilere kuyruklarını bitirip çıkmalarını söyler ve bekler."""
+        self._stopping = True
+        for inbox in self._inboxes:
+            inbox.put(None)
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.error(f"İşçi {index} zamanında kapanmadı, sonlandırılıyor.")
+                process.terminate()
+                process.join()
+        for inbox in self._inboxes:
+            inbox.close()
+        logger.info("Tüm işçiler kapatıldı.")
+
+def worker_main(index: int, count: int, inbox, db_path: str = None, request_factory=None, overrides: dict = None,
+                ready=None) -> None:
+    """
+    İşçi sürecinin giriş noktası. Kıyaslamalar için: request_factory verilirse (ör. sahte Bot API)
+    Bot API çağrıları onun döndürdüğü istek nesnesi üzerinden yapılır, overrides main modülündeki
+    ayarların üzerine yazılır ve ready kuyruğuna Application başladığında işçinin sırası konur.
+    """
+    # Ctrl+C tüm süreç grubuna gider; işçi kuyruğu yarıda bırakmasın diye dağıtıcının None'unu bekler
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import database
+    if db_path:
+        database.DB_PATH = db_path
+    import main
+
+    main.configure_worker(index, count)
+    for name, value in (overrides or {}).items():
+        setattr(main, name, value)
+    application = main.build_application(request=request_factory() if request_factory else None, shard=(index, count))
+    asyncio.run(run_worker(application, inbox, lambda: ready.put(index) if ready is not None else None))
+
+async def run_worker(application, inbox, on_started=None) -> None:
+    """
+    Application'ı güncelleme almadan başlatır ve güncellemeleri kuyruktan sırayla besler.
+    None gelince ya da SIGTERM alınca kalan güncellemeleri işleyip kapanır.
+    """
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    try:
+        await application.start()
+        if on_started is not None:
+            on_started()
+        while not stop_event.is_set():
+            try:
+                data = await loop.run_in_executor(None, inbox.get, True, WORKER_POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+            if data is None:
+                break
+            await application.update_queue.put(Update.de_json(data, application.bot))
+    finally:
+        # stop(), kuyruğa alınmış güncellemelerin işlenmesini bekler
+        if application.running:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+async def poll_updates(bot: Bot, deliver, allowed_updates=None) -> None:
+    """getUpdates ile uzun yoklama yapar ve her güncellemeyi Update nesnesi kurmadan deliver'a verir."""
+    # Ham JSON için do_api_request kullanılır; PTB bunun yerine get_updates önerir
+    warnings.filterwarnings('ignore', message=r"Please use 'Bot\.getUpdates'")
+    await bot.delete_webhook()
+    offset = None
+    error_delay = POLLING_ERROR_DELAY
+    while True:
+        params = {'timeout': POLLING_TIMEOUT, 'allowed_updates': allowed_updates}
+        if offset is not None:
+            params['offset'] = offset
+        try:
+            updates = await bot.do_api_request('getUpdates', api_kwargs=params, read_timeout=POLLING_TIMEOUT + 10)
+        except RetryAfter as e:
+            delay = retry_after_seconds(e)
+            logger.warning(f"getUpdates hız sınırına takıldı, {delay:.0f} saniye sonra yeniden denenecek.")
+            await asyncio.sleep(delay)
+            continue
+        except TelegramError as e:
+            # NetworkError geçicidir; Conflict, InvalidToken gibi hatalar sürebilir, aralık büyütülür
+            level = logging.WARNING if isinstance(e, NetworkError) else logging.ERROR
+            logger.log(level, f"getUpdates başarısız oldu, {error_delay:.0f} saniye sonra yeniden denenecek: {e!r}")
+            await asyncio.sleep(error_delay)
+            error_delay = min(error_delay * 2, POLLING_MAX_ERROR_DELAY)
+            continue
+        error_delay = POLLING_ERROR_DELAY
+        for data in updates:
+            offset = data['update_id'] + 1
+            await deliver(data)
+
+def stop_on_failure(stop_event: asyncio.Event):
+    """Görev hatayla biterse hatayı günlüğe yazıp stop_event'i kuran done-callback döndürür."""
+    def callback(task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(f"Dağıtıcı görevi hatayla sonlandı, kapatılıyor: {task.get_name()}",
+                     exc_info=task.exception())
+        stop_event.set()
+    return callback
+
+async def run_sharded(count: int, token: str, transport: str, listen: str, port: int, path: str, secret_token: str,
+                      url: str = '', allowed_updates=None) -> None:
+    """Dağıtıcıyı ve count işçiyi çalıştırır; SIGINT/SIGTERM gelene kadar bekler."""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError: # Windows
+            pass
+
+    pool = WorkerPool(count)
+    pool.start()
+    tasks = [asyncio.create_task(pool.supervise())]
+    server = None
+    bot = Bot(token)
+    try:
+        async with bot:
+            if transport == 'webhook':
+                if url:
+                    await bot.set_webhook(url=url + path, secret_token=secret_token, allowed_updates=allowed_updates)
+                receiver = WebhookReceiver(None, secret_token, path, allowed_updates, deliver=pool.deliver)
+                server = await receiver.start(listen, port)
+            else:
+                tasks.append(asyncio.create_task(poll_updates(bot, pool.deliver, allowed_updates)))
+            for task in tasks:
+                task.add_done_callback(stop_on_failure(stop_event))
+            logger.info(f"Dağıtıcı çalışıyor: {count} işçi, {transport} modu.")
+            await stop_event.wait()
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await pool.stop()
+        logger.info(f"İşçilere dağıtılan güncellemeler: {pool.delivered}; yeniden başlatma: {pool.restarts}.")